@@ -0,0 +1,10 @@
+"""
+Performance benchmarks for rtv's hot paths, from building the comment list to
+painting a frame. Everything runs offline against threads that are generated
+by tests/synthetic.py.
+
+Usage:
+    $ python -m benchmarks run -o baseline.json
+    $ python -m benchmarks run -o results.json
+    $ python -m benchmarks compare baseline.json results.json --threshold 10
+"""
@@ -0,0 +1,72 @@
+from __future__ import print_function
+
+import sys
+import argparse
+
+# The suite registers the benchmarks when it's imported
+from . import runner, suite  # noqa
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description='Run the rtv benchmarks.')
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser(
+        'run', help='run the benchmarks and save the results')
+    run_parser.add_argument(
+        'patterns', nargs='*', metavar='PATTERN',
+        help='only run benchmarks matching these globs, e.g. "content.*"')
+    run_parser.add_argument('-o', '--output', help='JSON file for the results')
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument(
+        '--min-time', type=float, default=0.2,
+        help='minimum seconds for each repeat, fast benchmarks are called '
+             'many times in a row')
+    run_parser.add_argument(
+        '--baseline', help='compare the results against this file')
+    run_parser.add_argument('--threshold', type=float, default=10.0)
+
+    compare_parser = subparsers.add_parser(
+        'compare', help='compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('results')
+    compare_parser.add_argument(
+        '--threshold', type=float, default=10.0,
+        help='percent slowdown that counts as a regression')
+
+    subparsers.add_parser('list', help='list the benchmarks')
+
+    args = parser.parse_args()
+    if args.command == 'list':
+        for name in runner.BENCHMARKS:
+            print(name)
+        return 0
+
+    if args.command == 'compare':
+        baseline = runner.load(args.baseline)
+        results = runner.load(args.results)
+    elif args.command == 'run':
+        results = runner.run(args.patterns, args.repeat, args.min_time)
+        if args.output:
+            runner.save(results, args.output)
+        if not args.baseline:
+            return 0
+        baseline = runner.load(args.baseline)
+        print('')
+    else:
+        parser.print_help()
+        return 1
+
+    slower = runner.compare(baseline, results, args.threshold)
+    if slower:
+        print('')
+        print('{0} benchmarks are more than {1}% slower'.format(
+            len(slower), args.threshold))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
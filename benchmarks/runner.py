@@ -0,0 +1,159 @@
+"""
+Timing, result files and comparisons for the benchmark suite.
+"""
+from __future__ import unicode_literals, print_function, division
+
+import os
+import json
+import time
+import codecs
+import fnmatch
+import platform
+import subprocess
+from collections import OrderedDict
+from timeit import default_timer
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(name):
+    """
+    Register a benchmark. The decorated function does the setup, and returns
+    the function that is timed. The timed function is called many times in a
+    row, so it needs to leave everything the way that it found it.
+
+    The timed function can have an `info` attribute, a function that returns
+    a dict of counters to save with the results, e.g. the number of items
+    drawn in each frame.
+    """
+
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+def time_function(func, repeat=5, min_time=0.2):
+    """
+    Time a single call of `func`. The number of calls in each repeat is scaled
+    up until a repeat takes at least `min_time` seconds, so that fast
+    functions are measured over many calls. The calls made while scaling up
+    also warm up any caches, and aren't included in the results.
+
+    Returns a dict with the min, median and mean seconds per call.
+    """
+
+    number = 1
+    while True:
+        start = default_timer()
+        for _ in range(number):
+            func()
+        elapsed = default_timer() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    timings = []
+    for _ in range(repeat):
+        start = default_timer()
+        for _ in range(number):
+            func()
+        timings.append((default_timer() - start) / number)
+
+    timings.sort()
+    return OrderedDict([
+        ('min', timings[0]),
+        ('median', timings[len(timings) // 2]),
+        ('mean', sum(timings) / len(timings)),
+        ('number', number),
+        ('repeat', repeat)])
+
+
+def run(patterns=None, repeat=5, min_time=0.2, out=None):
+    """
+    Run every benchmark that matches one of the glob `patterns`, and return
+    the results in the format that is written by `save()`.
+    """
+
+    out = out or print
+    results = OrderedDict()
+    for name, setup in BENCHMARKS.items():
+        if patterns and not any(fnmatch.fnmatch(name, p) for p in patterns):
+            continue
+        func = setup()
+        results[name] = time_function(func, repeat, min_time)
+        line = '{0:<45} {1}'.format(name, format_time(results[name]['min']))
+        if hasattr(func, 'info'):
+            results[name]['info'] = func.info()
+            line += '  ' + ', '.join(
+                '{0}={1:g}'.format(k, v)
+                for k, v in sorted(results[name]['info'].items()))
+        out(line)
+
+    return OrderedDict([
+        ('time', time.time()),
+        ('commit', get_commit()),
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('results', results)])
+
+
+def compare(baseline, current, threshold=10.0, out=None):
+    """
+    Compare the fastest time of each benchmark against the baseline. Returns
+    the names of the benchmarks that got slower by more than `threshold`
+    percent.
+    """
+
+    out = out or print
+    slower = []
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            out('{0:<45} {1:>10}  (new)'.format(
+                name, format_time(result['min'])))
+            continue
+
+        before = baseline['results'][name]['min']
+        after = result['min']
+        change = (after - before) / before * 100
+        flag = ''
+        if change > threshold:
+            flag = '  SLOWER'
+            slower.append(name)
+        elif change < -threshold:
+            flag = '  faster'
+        out('{0:<45} {1:>10} -> {2:>10} {3:+7.1f}%{4}'.format(
+            name, format_time(before), format_time(after), change, flag))
+
+    if baseline['python'] != current['python']:
+        out('Warning: the baseline was run on python {0}'.format(
+            baseline['python']))
+    return slower
+
+
+def format_time(seconds):
+
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return '{0:.2f} {1}'.format(seconds / scale, unit)
+    return '{0:.0f} ns'.format(seconds / 1e-9)
+
+
+def get_commit():
+    try:
+        with open(os.devnull, 'w') as null:
+            output = subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'], stderr=null)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('ascii').strip()
+
+
+def save(results, filename):
+    with codecs.open(filename, 'w', encoding='utf-8') as fp:
+        json.dump(results, fp, indent=2)
+
+
+def load(filename):
+    with codecs.open(filename, encoding='utf-8') as fp:
+        return json.load(fp, object_pairs_hook=OrderedDict)
@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+"""
+The benchmarks. Threads are generated once and shared, so the first benchmark
+that uses each one takes a few seconds longer to set up.
+"""
+from __future__ import unicode_literals, division
+
+import curses
+
+from rtv.config import Config
+from rtv.content import Content, SubmissionContent
+from rtv.objects import Completer, Navigator
+from rtv.oauth import OAuthHelper
+from rtv.submission import SubmissionPage
+from rtv.terminal import Terminal
+from tests import synthetic
+
+from .runner import benchmark
+
+N_COMMENTS = 5000
+LINES, COLUMNS = 40, 120
+
+# Only defined by curses after initscr() has been called
+if not hasattr(curses, 'ACS_VLINE'):
+    curses.ACS_VLINE = ord('|')
+
+_reddit = synthetic.get_reddit()
+_threads = {}
+
+
+def get_thread(shape='balanced', n_comments=N_COMMENTS):
+    """
+    Return the flattened comments of a generated thread.
+    """
+
+    key = (shape, n_comments)
+    if key not in _threads:
+        submission = synthetic.generate(_reddit, shape, n_comments=n_comments)
+        _threads[key] = (
+            submission, Content.flatten_comments(submission.comments))
+    return _threads[key]
+
+
+def get_content(shape='balanced', n_comments=N_COMMENTS):
+    submission, _ = get_thread(shape, n_comments)
+    return SubmissionContent(submission, NullLoader())
+
+
+class NullLoader(object):
+    "Stand-in for the terminal's LoadScreen, no comments are loaded"
+
+    exception = None
+    depth = 1
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, e, exc_tb):
+        pass
+
+
+class Window(object):
+    """
+    A curses window that doesn't draw anything, so that only the time spent
+    by rtv is measured and not the time spent by curses and the terminal.
+    """
+
+    def __init__(self, nlines, ncols):
+        self.nlines, self.ncols = nlines, ncols
+        self.y, self.x = 0, 0
+
+    def getmaxyx(self):
+        return self.nlines, self.ncols
+
+    def getyx(self):
+        return self.y, self.x
+
+    def derwin(self, nlines, ncols, begin_y, begin_x):
+        return Window(nlines, ncols)
+
+    def addstr(self, y, x, text, attr=None):
+        self.y, self.x = y, x + len(text)
+
+    def addch(self, y, x, ch, attr=None):
+        self.y, self.x = y, x + 1
+
+    def chgat(self, y, x, num, attr):
+        pass
+
+    def erase(self):
+        self.y, self.x = 0, 0
+
+    clear = erase
+
+    def bkgd(self, ch, attr):
+        pass
+
+    def border(self):
+        pass
+
+    def refresh(self):
+        pass
+
+
+def get_terminal(ascii=False):
+    term = Terminal(Window(LINES, COLUMNS), ascii=ascii)
+    # Skip the python 3.4 workaround, the same as the test suite
+    term.addch = lambda window, *args: window.addch(*args)
+    return term
+
+
+def get_page(shape='balanced', n_comments=N_COMMENTS):
+
+    submission, _ = get_thread(shape, n_comments)
+    term = get_terminal()
+    config = Config()
+    oauth = OAuthHelper(_reddit, term, config)
+    page = SubmissionPage(_reddit, term, config, oauth, submission=submission)
+    page.content._loader = NullLoader()
+    return page
+
+
+def register_shapes(name, shapes=('balanced', 'deep', 'wide')):
+    """
+    Register a benchmark once for each thread shape. The setup function is
+    called with the shape.
+    """
+
+    def decorator(setup):
+        for shape in shapes:
+            benchmark('{0}[{1}]'.format(name, shape))(
+                lambda shape=shape: setup(shape))
+        return setup
+    return decorator
+
+
+@register_shapes('content.flatten_comments')
+def flatten_comments(shape):
+    submission, _ = get_thread(shape)
+    return lambda: Content.flatten_comments(submission.comments)
+
+
+@register_shapes('content.strip_praw_comment', shapes=('balanced',))
+def strip_praw_comment(shape):
+    _, comments = get_thread(shape)
+    return lambda: [Content.strip_praw_comment(c) for c in comments]
+
+
+@benchmark('content.strip_praw_submission')
+def strip_praw_submission():
+    submission, _ = get_thread()
+    return lambda: Content.strip_praw_submission(submission)
+
+
+@benchmark('content.wrap_text')
+def wrap_text():
+    _, comments = get_thread()
+    bodies = [getattr(c, 'body', '') for c in comments[:1000]]
+    return lambda: [Content.wrap_text(body, 70) for body in bodies]
+
+
+@benchmark('terminal.clean')
+def clean():
+    term = get_terminal()
+    lines = get_lines()
+    return lambda: [term.clean(line, 70) for line in lines]
+
+
+@benchmark('terminal.clean[ascii]')
+def clean_ascii():
+    term = get_terminal(ascii=True)
+    lines = get_lines()
+    return lambda: [term.clean(line, 70) for line in lines]
+
+
+@benchmark('terminal.add_line')
+def add_line():
+    term = get_terminal()
+    window = Window(LINES, COLUMNS)
+    lines = get_lines()
+    return lambda: [term.add_line(window, line, 0, 1) for line in lines]
+
+
+def get_lines():
+    _, comments = get_thread()
+    lines = []
+    for comment in comments[:1000]:
+        lines.extend(Content.wrap_text(getattr(comment, 'body', ''), 70))
+    return lines
+
+
+@benchmark('navigator.move')
+def navigator_move():
+    """
+    Scroll from the top of the thread to the 500th comment and back, with
+    10 comments on the screen.
+    """
+
+    content = get_content()
+
+    def run():
+        nav = Navigator(content.exists, page_index=-1)
+        for _ in range(500):
+            nav.move(1, 10)
+        for _ in range(500):
+            nav.move(-1, 10)
+    return run
+
+
+@benchmark('navigator.move_page')
+def navigator_move_page():
+    content = get_content()
+
+    def run():
+        nav = Navigator(content.exists, page_index=-1)
+        for _ in range(50):
+            nav.move_page(1, 10)
+        for _ in range(50):
+            nav.move_page(-1, 10)
+    return run
+
+
+@benchmark('content.rows.find')
+def rows_find():
+    """
+    Find the comment at each percentage of the way down the thread, once
+    every comment has been measured.
+    """
+
+    content = get_content()
+    total = content.rows.total(70)
+    rows = [total * percent // 100 for percent in range(101)]
+    return lambda: [content.rows.find(row, 70) for row in rows]
+
+
+@register_shapes('content.toggle')
+def toggle(shape):
+    """
+    Fold and unfold the top level comment with the most replies.
+    """
+
+    content = get_content(shape)
+    levels = [data['level'] for data in content._comment_data]
+    starts = [i for i, level in enumerate(levels) if level == 0]
+    ends = starts[1:] + [len(levels)]
+    index, _ = max(zip(starts, ends), key=lambda pair: pair[1] - pair[0])
+
+    def run():
+        content.toggle(index)
+        content.toggle(index)
+    return run
+
+
+@benchmark('content.collapse[50k]')
+def collapse():
+    """
+    Fold every top level comment in a very large thread. The thread is put
+    back by copying the list of comments before each run.
+    """
+
+    content = get_content(n_comments=50000)
+    comment_data = list(content._comment_data)
+
+    def run():
+        content._comment_data = list(comment_data)
+        content.collapse(0)
+    return run
+
+
+@benchmark('content.expand_all[50k]')
+def expand_all():
+    """
+    Unfold every comment in a very large thread, where every level has been
+    folded from the bottom up.
+    """
+
+    content = get_content(n_comments=50000)
+    for level in reversed(range(5)):
+        content.collapse(level)
+    comment_data = list(content._comment_data)
+
+    def run():
+        content._comment_data = list(comment_data)
+        content.expand_all()
+    return run
+
+
+@benchmark('content.sort')
+def sort():
+    """
+    Sort the thread by score, and put it back in the order that it was
+    downloaded in.
+    """
+
+    content = get_content()
+
+    def run():
+        content.sort('top')
+        content.sort(None)
+    return run
+
+
+@benchmark('content.search[50k]')
+def search():
+    """
+    Find the next match in a very large thread once for every letter that's
+    typed, once the index has been built.
+    """
+
+    content = get_content(n_comments=50000)
+    content.search.build()
+    queries = ['terminal'[:n] for n in range(1, 9)]
+    hits = [len(content.search.search(query)) for query in queries]
+
+    run = lambda: [content.search.find(query, 25000) for query in queries]
+    run.info = lambda: dict(('hits[{0}]'.format(q), n)
+                            for q, n in zip(queries, hits))
+    return run
+
+
+@benchmark('content.search.build[50k]')
+def search_build():
+    content = get_content(n_comments=50000)
+
+    def run():
+        content.search.reset()
+        content.search.build()
+    return run
+
+
+@benchmark('prompt.complete[5k]')
+def complete():
+    """
+    Complete a subreddit name once for every letter that's typed, out of a
+    few thousand saved subreddits. The last queries only have fuzzy matches.
+    """
+
+    names = ['{0}{1}'.format(word, n) for n in range(1000)
+             for word in ('python', 'linux', 'pics', 'news', 'games')]
+    completer = Completer(names)
+    queries = ['pyth', 'python', 'python99', 'pyn', 'pyn9x']
+
+    return lambda: [completer.complete(query) for query in queries]
+
+
+@benchmark('prompt.completer[5k]')
+def completer_build():
+    """
+    Build the completions when the prompt is opened.
+    """
+
+    names = ['{0}{1}'.format(word, n) for n in range(1000)
+             for word in ('python', 'linux', 'pics', 'news', 'games')]
+    return lambda: Completer(names)
+
+
+@benchmark('page.draw[top]')
+def draw_top():
+    page = get_page()
+    return page.draw
+
+
+@benchmark('page.draw[middle]')
+def draw_middle():
+    page = get_page()
+    page.nav.page_index = N_COMMENTS // 2
+    return page.draw
+
+
+@benchmark('page.draw[inverted]')
+def draw_inverted():
+    """
+    Draw the bottom of a thread that's too short to fill the screen, which
+    flips the page so that it's drawn from the top instead.
+    """
+
+    page = get_page(n_comments=5)
+    counts = {'frames': 0, 'items': 0}
+    draw_item = page._draw_item
+
+    def counted_draw_item(*args):
+        counts['items'] += 1
+        return draw_item(*args)
+    page._draw_item = counted_draw_item
+
+    def run():
+        page.nav.jump(page.content.last_index, inverted=True)
+        page.draw()
+        counts['frames'] += 1
+
+    run.info = lambda: {
+        'items_per_frame': counts['items'] / max(counts['frames'], 1)}
+    return run
+
+
+@benchmark('page.search[50k]')
+def page_search():
+    """
+    Type a search into the prompt on a very large thread, moving to the
+    first match and drawing the page after every letter.
+    """
+
+    page = get_page(n_comments=50000)
+    page.draw()
+    page.content.search.build()
+    queries = ['terminal'[:n] for n in range(1, 9)]
+    start = page.content.position(25000)
+
+    def run():
+        for query in queries:
+            page._show_match(page.content.search.find(query, start))
+    run.info = lambda: {'letters': len(queries)}
+    return run
+
+
+@benchmark('page.move_cursor')
+def move_cursor():
+    """
+    Move the cursor down a page and back up again, redrawing the content
+    after every move like the page does.
+    """
+
+    page = get_page()
+    page.draw()
+
+    def run():
+        for _ in range(20):
+            page._move_cursor(1)
+        for _ in range(20):
+            page._move_cursor(-1)
+    return run
@@ -2,18 +2,12 @@
 from __future__ import unicode_literals
 
 import sys
+import time
 import locale
 import logging
 
-import praw
-import tornado
-
 from . import docs
 from .config import Config
-from .oauth import OAuthHelper
-from .terminal import Terminal
-from .objects import curses_session
-from .subreddit import SubredditPage
 from .__version__ import __version__
 
 _logger = logging.getLogger(__name__)
@@ -26,6 +20,61 @@ _logger = logging.getLogger(__name__)
 # http://blog.mellenthin.de/archives/2010/10/18/gdb-attach-fails
 
 
+def load_first_page(reddit, term, config, oauth):
+    """
+    Log in and download the first page to display.
+
+    The steps run one after another. PRAW holds a lock on the domain for the
+    whole of each request, so a token refresh on another thread would only
+    take turns with the listing, and a `praw.Reddit` session can't be shared
+    between threads anyway. The time taken by each step is written to the
+    log instead, so that slow start ups can be tracked down.
+
+    Returns a tuple of (subreddit page, submission page). Either page can be
+    None.
+    """
+
+    # Imported here to keep start up fast, see main()
+    from .subreddit import SubredditPage
+    from .submission import SubmissionPage
+
+    start = time.time()
+    steps = []
+
+    def finish_step(name, step_start):
+        elapsed = 1000 * (time.time() - step_start)
+        steps.append('{0} {1:.0f}ms'.format(name, elapsed))
+
+    # There's no need to log in when browsing cached or dumped content
+    offline = config['offline'] or config['local_dir']
+    if config.refresh_token and not offline:
+        step_start = time.time()
+        oauth.authorize()
+        finish_step('login', step_start)
+
+    submission_page = None
+    if config['link']:
+        step_start = time.time()
+        with term.loader():
+            submission_page = SubmissionPage(
+                reddit, term, config, oauth, url=config['link'])
+        if term.loader.exception:
+            submission_page = None
+        finish_step('submission', step_start)
+
+    step_start = time.time()
+    with term.loader():
+        page = SubredditPage(
+            reddit, term, config, oauth, name=config['subreddit'])
+    if term.loader.exception:
+        page = None
+    finish_step('listing', step_start)
+
+    _logger.info('Startup critical path: %s; first page ready after %.0fms',
+                 ', '.join(steps), 1000 * (time.time() - start))
+    return page, submission_page
+
+
 def main():
     "Main entry point"
 
@@ -45,11 +94,14 @@ def main():
 
     # Load the browsing history from previous sessions
     config.load_history()
+    config.load_subreddits()
 
     # Load any previously saved auth session token
     config.load_refresh_token()
+    config.load_access_token()
     if config['clear_auth']:
         config.delete_refresh_token()
+        config.delete_access_token()
 
     if config['log']:
         logging.basicConfig(level=logging.DEBUG, filename=config['log'])
@@ -60,28 +112,39 @@ def main():
     # Construct the reddit user agent
     user_agent = docs.AGENT.format(version=__version__)
 
+    if config['sync']:
+        from .sync import sync
+        return sync(config, user_agent)
+
+    # These are imported after the arguments have been parsed so that
+    # `--help` and `--version` don't have to wait on them
+    from .oauth import OAuthHelper
+    from .terminal import Terminal
+    from .objects import curses_session, build_reddit
+    from .sync import DiskCacheHandler
+
+    # Record everything that's displayed, if it's enabled
+    config.load_fulltext()
+
     try:
         with curses_session() as stdscr:
             term = Terminal(stdscr, config['ascii'])
             with term.loader(catch_exception=False):
-                reddit = praw.Reddit(
-                    user_agent=user_agent,
-                    decode_html_entities=False,
-                    disable_update_check=True)
+                # Pages downloaded with --sync are read from the cache
+                handler = DiskCacheHandler(
+                    config.cache_dir, max_age=config['cache_max_age'],
+                    offline=config['offline'])
+                reddit = build_reddit(config, user_agent, handler)
 
             # Authorize on launch if the refresh token is present
             oauth = OAuthHelper(reddit, term, config)
-            if config.refresh_token:
-                oauth.authorize()
-
-            with term.loader():
-                page = SubredditPage(
-                    reddit, term, config, oauth,
-                    name=config['subreddit'], url=config['link'])
-            if term.loader.exception:
-                return
+            page, submission_page = load_first_page(
+                reddit, term, config, oauth)
 
-            page.loop()
+            if submission_page is not None:
+                submission_page.loop()
+            if page is not None:
+                page.loop()
     except Exception as e:
         _logger.exception(e)
         raise
@@ -90,10 +153,15 @@ def main():
     finally:
         # Try to save the browsing history
         config.save_history()
+        config.save_subreddits()
+        # Write out the items that are still waiting to be indexed
+        config.save_fulltext()
         # Ensure sockets are closed to prevent a ResourceWarning
         if 'reddit' in locals():
             reddit.handler.http.close()
-        # Explicitly close file descriptors opened by Tornado's IOLoop
-        tornado.ioloop.IOLoop.current().close(all_fds=True)
+        # Explicitly close file descriptors opened by Tornado's IOLoop. Tornado
+        # is only loaded if the user went through the authorization flow.
+        if 'tornado.ioloop' in sys.modules:
+            sys.modules['tornado.ioloop'].IOLoop.current().close(all_fds=True)
 
 sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import mmap
+import json
+import codecs
+import struct
+from collections import OrderedDict
+
+from .config import Config
+
+
+class ThreadArchive(object):
+    """
+    A saved thread, stored as a JSON-lines file with one record per line. The
+    first record is the submission, followed by the flattened comments in the
+    order that they are displayed.
+
+    A separate index file holds the byte offset of every record. Both files
+    are memory-mapped, so opening an archive takes the same amount of time no
+    matter how large the thread is, and a record is only decoded when it's
+    accessed.
+
+    The same format is used for the listings that are read by `LocalSource`,
+    with one submission per record.
+
+    Index layout:
+        header (see HEADER), followed by n_records + 1 offsets as uint64
+    """
+
+    HEADER = struct.Struct('<4sQd')
+    OFFSET = struct.Struct('<Q')
+    MAGIC = b'RTVI'
+
+    # Keys that are added by `Content.get()` when the item is drawn
+    RENDER_KEYS = ('split_title', 'split_text', 'split_body', 'n_rows',
+                   'offset')
+
+    def __init__(self, filename):
+
+        self.filename = filename
+        self.index_filename = filename + '.idx'
+
+        if not self._index_is_current():
+            self._build_index()
+
+        with open(self.filename, 'rb') as fp:
+            self._data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.index_filename, 'rb') as fp:
+            self._index = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._n_records, self.last_seen = self.HEADER.unpack(
+            self._index[:self.HEADER.size])
+
+    def __len__(self):
+        return self._n_records
+
+    def __getitem__(self, index):
+
+        if index < 0:
+            index += self._n_records
+        if not 0 <= index < self._n_records:
+            raise IndexError(index)
+
+        position = self.HEADER.size + index * self.OFFSET.size
+        start, end = struct.unpack_from('<QQ', self._index, position)
+        return json.loads(self._data[start:end].decode('utf-8'))
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+    @classmethod
+    def write(cls, filename, submission_data, comment_data):
+        """
+        Save a submission and its flattened comments, as returned by
+        `SubmissionContent`. Folded comments are unpacked so that the archive
+        holds every comment that has been loaded.
+        """
+
+        def unpack(items):
+            for item in items:
+                if item['type'] == 'HiddenComment':
+                    for child in unpack(item['cache']):
+                        yield child
+                else:
+                    yield item
+
+        records = [submission_data]
+        records.extend(unpack(comment_data))
+        cls.write_records(filename, records)
+
+    @classmethod
+    def write_records(cls, filename, records):
+        """
+        Save any sequence of records, e.g. a listing of submissions for
+        `LocalSource`.
+        """
+
+        Config._ensure_filepath(filename)
+        offsets, last_seen = [0], 0.0
+        tmp_filename = filename + '.tmp'
+        with codecs.open(tmp_filename, 'w', encoding='utf-8') as fp:
+            for data in records:
+                data = dict((k, v) for k, v in data.items()
+                            if k not in cls.RENDER_KEYS)
+                line = json.dumps(data, ensure_ascii=False) + '\n'
+                fp.write(line)
+                offsets.append(offsets[-1] + len(line.encode('utf-8')))
+                last_seen = max(last_seen, data.get('created_utc', 0))
+        os.rename(tmp_filename, filename)
+        cls._write_index(filename + '.idx', offsets, last_seen)
+
+    def _index_is_current(self):
+
+        if not os.path.exists(self.index_filename):
+            return False
+        # The data file is always written first
+        data_mtime = os.path.getmtime(self.filename)
+        return os.path.getmtime(self.index_filename) >= data_mtime
+
+    def _build_index(self):
+        """
+        Scan the data file to rebuild a missing or stale index.
+        """
+
+        offsets, last_seen = [0], 0.0
+        with open(self.filename, 'rb') as fp:
+            for line in fp:
+                if not line.strip():
+                    break
+                offsets.append(offsets[-1] + len(line))
+                data = json.loads(line.decode('utf-8'))
+                last_seen = max(last_seen, data.get('created_utc', 0))
+        self._write_index(self.index_filename, offsets, last_seen)
+
+    @classmethod
+    def _write_index(cls, filename, offsets, last_seen):
+
+        tmp_filename = filename + '.tmp'
+        with open(tmp_filename, 'wb') as fp:
+            fp.write(cls.HEADER.pack(cls.MAGIC, len(offsets) - 1, last_seen))
+            for offset in offsets:
+                fp.write(cls.OFFSET.pack(offset))
+        os.rename(tmp_filename, filename)
+
+
+class ArchivedComments(object):
+    """
+    List-like view of the comments in a `ThreadArchive`, used in place of the
+    list of comment data in `SubmissionContent`.
+
+    Only the most recently accessed records are kept in memory. Folding and
+    unfolding comments replaces items in an overlay that maps each position to
+    either a record number or a dict, so the archive file is never modified.
+
+    A record that drops out of the cache is decoded into a new dict the next
+    time that it's accessed, so the same comment isn't always the same object.
+    Items must be compared by their fullname rather than with `is`. Dicts that
+    are stored in the overlay, e.g. folded comments, are kept as they are.
+    """
+
+    CACHE_SIZE = 512
+
+    def __init__(self, archive):
+
+        self._archive = archive
+        self._slots = None
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        if self._slots is None:
+            return len(self._archive) - 1
+        return len(self._slots)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if self._slots is None:
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError(index)
+            return self._record(index + 1)
+
+        slot = self._slots[index]
+        if isinstance(slot, dict):
+            return slot
+        return self._record(slot)
+
+    def __setitem__(self, index, value):
+
+        self._materialize()
+        if isinstance(index, slice):
+            # Pin the items that are being moved, e.g. into a folded comment
+            self._slots[index] = list(value)
+        else:
+            self._slots[index] = value
+
+    def insert(self, index, value):
+        self._materialize()
+        self._slots.insert(index, value)
+
+    def _materialize(self):
+        if self._slots is None:
+            self._slots = list(range(1, len(self._archive)))
+
+    def _record(self, number):
+
+        data = self._cache.pop(number, None)
+        if data is None:
+            data = self._archive[number]
+            if len(self._cache) >= self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        self._cache[number] = data
+        return data
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import curses
+
+from .page import Page, PageController
+from .content import BrowsedContent
+from .objects import Color, Navigator
+from .submission import SubmissionPage
+from .terminal import Terminal
+
+
+class BrowsedController(PageController):
+    character_map = {}
+
+
+class BrowsedPage(Page):
+
+    def __init__(self, reddit, term, config, oauth, query):
+        """
+        Params:
+            query (string): Words to search the full text index for
+        """
+        super(BrowsedPage, self).__init__(reddit, term, config, oauth)
+
+        self.content = BrowsedContent.from_query(config.fulltext, query)
+        self.controller = BrowsedController(self)
+        self.nav = Navigator(self.content.exists)
+
+    @BrowsedController.register(curses.KEY_F5, 'r')
+    def refresh_content(self, order=None):
+        "Search again, including anything that was browsed since"
+
+        if order:
+            self.term.flash()
+            return
+
+        self.config.fulltext.flush()
+        with self.term.loader():
+            self.content = BrowsedContent.from_query(
+                self.config.fulltext, self.content.query)
+        if not self.term.loader.exception:
+            self.nav = Navigator(self.content.exists)
+
+    @BrowsedController.register(curses.KEY_ENTER, Terminal.RETURN,
+                                curses.KEY_RIGHT, 'l')
+    def open_submission(self):
+        "Open the thread that the selected item belongs to"
+
+        data = self.content.get(self.nav.absolute_index)
+        with self.term.loader():
+            page = SubmissionPage(
+                self.reddit, self.term, self.config, self.oauth,
+                url=data['permalink'])
+        if self.term.loader.exception:
+            return
+
+        page.loop()
+
+    @BrowsedController.register(curses.KEY_LEFT, Terminal.ESCAPE, 'h', 'b')
+    def close_browsed(self):
+        "Close the search results and return to the subreddit page"
+
+        self.active = False
+
+    def _draw_item(self, win, data, inverted=False):
+        n_rows, n_cols = win.getmaxyx()
+        n_cols -= 1  # Leave space for the cursor in the first column
+
+        # Handle the case where the window is not large enough to fit the data.
+        valid_rows = range(0, n_rows)
+        offset = 0 if not inverted else -(data['n_rows'] - n_rows)
+
+        row = offset
+        for row, text in enumerate(data['split_title'], start=row):
+            if row in valid_rows:
+                self.term.add_line(win, text, row, 1, curses.A_BOLD)
+
+        row = offset + len(data['split_title'])
+        for row, text in enumerate(data['split_text'], start=row):
+            if row in valid_rows:
+                self.term.add_line(win, text, row, 1)
+
+        row = offset + len(data['split_title']) + len(data['split_text'])
+        if row in valid_rows:
+            text = '{author}'.format(**data)
+            self.term.add_line(win, text, row, 1, curses.A_BOLD)
+            if data['subreddit']:
+                text = ' /r/{subreddit}'.format(**data)
+                self.term.add_line(win, text, attr=Color.YELLOW)
+            text = ' {created}'.format(**data)
+            self.term.add_line(win, text)
+            if data['type'] == 'Comment':
+                self.term.add_line(win, ' comment', attr=Color.BLUE)
@@ -2,8 +2,17 @@
 from __future__ import unicode_literals
 
 import os
+import math
+import mmap
+import stat
+import json
 import codecs
+import struct
+import hashlib
 import argparse
+from collections import OrderedDict
+
+import six
 from six.moves import configparser
 
 from . import docs, __version__
@@ -13,7 +22,15 @@ PACKAGE = os.path.dirname(__file__)
 XDG_HOME = os.getenv('XDG_CONFIG_HOME', os.path.join(HOME, '.config'))
 CONFIG = os.path.join(XDG_HOME, 'rtv', 'rtv.cfg')
 TOKEN = os.path.join(XDG_HOME, 'rtv', 'refresh-token')
+ACCESS_TOKEN = os.path.join(XDG_HOME, 'rtv', 'access-token')
 HISTORY = os.path.join(XDG_HOME, 'rtv', 'history.log')
+BLOOM = os.path.join(XDG_HOME, 'rtv', 'history.bloom')
+XDG_CACHE = os.getenv('XDG_CACHE_HOME', os.path.join(HOME, '.cache'))
+CACHE = os.path.join(XDG_CACHE, 'rtv', 'http')
+XDG_DATA = os.getenv('XDG_DATA_HOME', os.path.join(HOME, '.local', 'share'))
+ARCHIVE = os.path.join(XDG_DATA, 'rtv', 'threads')
+FULLTEXT = os.path.join(XDG_HOME, 'rtv', 'browsed.db')
+SUBREDDITS = os.path.join(XDG_HOME, 'rtv', 'subreddits.json')
 TEMPLATE = os.path.join(PACKAGE, 'templates')
 
 
@@ -30,7 +47,8 @@ def build_parser():
         help='name of the subreddit that will be opened on start')
     parser.add_argument(
         '-l', dest='link',
-        help='full URL of a submission that will be opened on start')
+        help='full URL of a submission, or the path of a thread that was '
+             'saved with `w`, that will be opened on start')
     parser.add_argument(
         '--ascii', action='store_const', const=True,
         help='enable ascii-only mode')
@@ -44,32 +62,387 @@ def build_parser():
     parser.add_argument(
         '--clear-auth', dest='clear_auth', action='store_const', const=True,
         help='Remove any saved OAuth tokens before starting')
+    parser.add_argument(
+        '--sync', action='store_const', const=True,
+        help='Download the subreddits listed in sync_subreddits for offline '
+             'reading and exit')
+    parser.add_argument(
+        '--offline', action='store_const', const=True,
+        help='Browse the content that was downloaded with --sync, without '
+             'connecting to reddit')
+    parser.add_argument(
+        '--local', dest='local_dir', metavar='DIR', action='store',
+        help='Browse listings and threads that were dumped to a directory, '
+             'instead of reddit')
     return parser
 
 
-class OrderedSet(object):
+class History(object):
     """
-    A simple implementation of an ordered set. A set is used to check
-    for membership, and a list is used to maintain ordering.
+    The links that the user has opened, ordered by when they were last
+    visited. Only the newest `size` links are kept between sessions.
+
+    Once the history has been loaded from its file, every link that is added
+    is appended to the end of the file right away so that nothing is lost if
+    rtv crashes. Links that are visited again get appended again, so the file
+    is compacted down to the newest `size` links whenever it grows past
+    `COMPACT_FACTOR` times that length.
     """
 
-    def __init__(self, elements=None):
-        elements = elements or []
-        self._set = set(elements)
-        self._list = elements
+    COMPACT_FACTOR = 2
+
+    def __init__(self, filename, size=200):
+        self.filename = filename
+        self.size = size
+        self._links = OrderedDict()
+        self._loaded = False
+        self._n_lines = 0
+        self._needs_newline = False
 
     def __contains__(self, item):
-        return item in self._set
+        return item in self._links
 
     def __len__(self):
-        return len(self._list)
+        return len(self._links)
+
+    def __iter__(self):
+        return iter(self._links)
 
     def __getitem__(self, item):
-        return self._list[item]
+        return list(self._links)[item]
+
+    def load(self):
+        self._links = OrderedDict()
+        self._n_lines = 0
+        self._needs_newline = False
+        if os.path.exists(self.filename):
+            with codecs.open(self.filename, encoding='utf-8') as fp:
+                for line in fp:
+                    self._needs_newline = not line.endswith('\n')
+                    self._n_lines += 1
+                    if line.strip():
+                        self._touch(line.strip())
+        self._trim()
+        self._loaded = True
+
+        if self._n_lines > self.size * self.COMPACT_FACTOR:
+            self.save()
+
+    def add(self, item):
+        self._touch(item)
+        if not self._loaded:
+            return
+
+        Config._ensure_filepath(self.filename)
+        with codecs.open(self.filename, 'a', encoding='utf-8') as fp:
+            if self._needs_newline:
+                fp.write('\n')
+                self._needs_newline = False
+            fp.write(item + '\n')
+        self._n_lines += 1
+
+        if self._n_lines > self.size * self.COMPACT_FACTOR:
+            self.save()
+
+    def sync(self):
+        """
+        Make sure that the file is up to date. Once the history has been
+        loaded, links are written as they are added so there's nothing to do.
+        """
+
+        if not self._loaded:
+            self.save()
+
+    def save(self):
+        """
+        Rewrite the file with only the newest `size` links. The new file is
+        moved into place so that a crash can't leave it half written.
+        """
+
+        self._trim()
+        Config._ensure_filepath(self.filename)
+        tmp_filename = self.filename + '.tmp'
+        with codecs.open(tmp_filename, 'w', encoding='utf-8') as fp:
+            fp.writelines(link + '\n' for link in self._links)
+        os.rename(tmp_filename, self.filename)
+        self._n_lines = len(self._links)
+        self._needs_newline = False
+
+    def delete(self):
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+        self._links = OrderedDict()
+        self._n_lines = 0
+
+    def _touch(self, item):
+        self._links.pop(item, None)
+        self._links[item] = None
+
+    def _trim(self):
+        while len(self._links) > self.size:
+            self._links.popitem(last=False)
+
+
+class BloomFilter(object):
+    """
+    A compact, probabilistic replacement for `History` that is meant for very
+    large history sizes. Checking if a link has been visited can return a
+    false positive at roughly `error_rate`, but never a false negative.
+
+    The filter is stored in a memory-mapped file, so loading it doesn't depend
+    on the number of links and only the pages that are touched are read from
+    disk. Links are split between two generations of `size` links each. When
+    the active generation fills up, the older one is cleared and takes over,
+    so roughly the newest `size` to `2 * size` links are remembered.
+
+    File layout:
+        header (see HEADER), followed by the bits of both generations
+    """
+
+    HEADER = struct.Struct('<4sIQIQQ')
+    MAGIC = b'RTVB'
+
+    def __init__(self, filename, size=200, error_rate=0.001,
+                 history_file=None):
+        """
+        Params:
+            filename (str): Path of the memory-mapped file.
+            size (int): Number of links in each generation.
+            error_rate (float): False positive rate when a generation is full.
+            history_file (str): Optional, the plain text history that is
+                imported when the filter is first created.
+        """
+
+        self.filename = filename
+        self.size = max(size, 1)
+        self.error_rate = error_rate
+        self.history_file = history_file
+
+        n_bits = -self.size * math.log(error_rate) / math.log(2) ** 2
+        self.n_bytes = int(math.ceil(n_bits / 8))
+        self.n_bits = self.n_bytes * 8
+        self.n_hashes = max(int(round(n_bits / self.size * math.log(2))), 1)
+
+        self._mmap = None
+        self._active = 0
+        self._counts = [0, 0]
+
+    def __contains__(self, item):
+        if self._mmap is None:
+            return False
+        bits = self._bits(item)
+        return any(all(self._get_bit(g, b) for b in bits) for g in (0, 1))
+
+    def __len__(self):
+        return sum(self._counts)
+
+    def load(self):
+        """
+        Map the file into memory. The filter is rebuilt if the file doesn't
+        exist, can't be read, was cut short, or was built with different
+        settings.
+        """
+
+        Config._ensure_filepath(self.filename)
+        length = self.HEADER.size + 2 * self.n_bytes
+
+        state = self._read_header(length)
+        created = state is None
+        if created:
+            with open(self.filename, 'wb') as fp:
+                fp.truncate(length)
+            state = 0, 0, 0
+        active, count0, count1 = state
+
+        with open(self.filename, 'r+b') as fp:
+            self._mmap = mmap.mmap(fp.fileno(), length)
+        self._active = active
+        self._counts = [count0, count1]
+        self._write_header()
+
+        if created and self.history_file:
+            if os.path.exists(self.history_file):
+                with codecs.open(self.history_file, encoding='utf-8') as fp:
+                    for line in fp:
+                        if line.strip():
+                            self.add(line.strip())
+
+    def _read_header(self, length):
+        """
+        Return the active generation and the counts that are saved in the
+        file, or None if the filter has to be rebuilt because the file is
+        missing, unreadable, shorter than `length`, or was built with
+        different settings.
+        """
+
+        try:
+            with open(self.filename, 'rb') as fp:
+                header = fp.read(self.HEADER.size)
+                fp.seek(0, os.SEEK_END)
+                file_length = fp.tell()
+        except (IOError, OSError):
+            return None
+        if len(header) < self.HEADER.size or file_length < length:
+            return None
+
+        magic, n_hashes, n_bits, active, count0, count1 = \
+            self.HEADER.unpack(header)
+        if (magic, n_hashes, n_bits) != (self.MAGIC, self.n_hashes,
+                                         self.n_bits):
+            return None
+        return active, count0, count1
 
     def add(self, item):
-        self._set.add(item)
-        self._list.append(item)
+        if self._mmap is None:
+            self.load()
+
+        bits = self._bits(item)
+        if all(self._get_bit(self._active, b) for b in bits):
+            return
+
+        for b in bits:
+            self._set_bit(self._active, b)
+        self._counts[self._active] += 1
+
+        if self._counts[self._active] >= self.size:
+            # Clear out the oldest generation and start filling it up
+            self._active = 1 - self._active
+            self._counts[self._active] = 0
+            start = self._offset(self._active)
+            self._mmap[start:start + self.n_bytes] = b'\x00' * self.n_bytes
+        self._write_header()
+
+    def sync(self):
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    save = sync
+
+    def delete(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+        self._active = 0
+        self._counts = [0, 0]
+
+    def _bits(self, item):
+        """
+        Derive the bit positions for an item from two halves of its md5 hash,
+        using the Kirsch-Mitzenmacher double hashing trick.
+        """
+
+        digest = hashlib.md5(item.encode('utf-8')).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def _offset(self, generation):
+        return self.HEADER.size + generation * self.n_bytes
+
+    def _get_bit(self, generation, bit):
+        index = self._offset(generation) + bit // 8
+        return six.byte2int(self._mmap[index:index + 1]) & (1 << (bit % 8))
+
+    def _set_bit(self, generation, bit):
+        index = self._offset(generation) + bit // 8
+        value = six.byte2int(self._mmap[index:index + 1]) | (1 << (bit % 8))
+        self._mmap[index:index + 1] = six.int2byte(value)
+
+    def _write_header(self):
+        self._mmap[:self.HEADER.size] = self.HEADER.pack(
+            self.MAGIC, self.n_hashes, self.n_bits, self._active,
+            self._counts[0], self._counts[1])
+
+
+class SubredditCache(object):
+    """
+    The subreddits that the user is subscribed to, as of the last time that
+    the list was downloaded, and the subreddits that were opened most
+    recently. Both are kept between sessions so that subreddit names can be
+    completed without connecting to reddit.
+    """
+
+    def __init__(self, filename, size=100):
+        self.filename = filename
+        self.size = size
+        self.user = None
+        self.subscriptions = []
+        self._visited = OrderedDict()
+        self._modified = False
+
+    def load(self):
+        self.user, self.subscriptions = None, []
+        self._visited = OrderedDict()
+        self._modified = False
+        if os.path.exists(self.filename):
+            with codecs.open(self.filename, encoding='utf-8') as fp:
+                try:
+                    data = json.load(fp)
+                except ValueError:
+                    return
+            self.user = data.get('user')
+            self.subscriptions = data.get('subscriptions', [])
+            for name in data.get('visited', []):
+                self._visited[name] = None
+
+    def save(self):
+        if not self._modified:
+            return
+
+        Config._ensure_filepath(self.filename)
+        tmp_filename = self.filename + '.tmp'
+        with codecs.open(tmp_filename, 'w', encoding='utf-8') as fp:
+            json.dump({
+                'user': self.user,
+                'subscriptions': self.subscriptions,
+                'visited': list(self._visited)}, fp)
+        os.rename(tmp_filename, self.filename)
+        self._modified = False
+
+    def visit(self, name):
+        """
+        Move the subreddit to the front of the recently visited list. Accepts
+        the display name, e.g. /r/python.
+        """
+
+        name = name.strip(' /')
+        if name.startswith('r/'):
+            name = name[2:]
+        self._visited.pop(name, None)
+        self._visited[name] = None
+        while len(self._visited) > self.size:
+            self._visited.popitem(last=False)
+        self._modified = True
+
+    def get_subscriptions(self, user):
+        "Return the saved subscriptions if they belong to the given user"
+
+        return self.subscriptions if user == self.user else []
+
+    def set_subscriptions(self, user, subscriptions):
+        """
+        Params:
+            user (str): Name of the user that the subscriptions belong to.
+            subscriptions (list): Data from `strip_praw_subscription`.
+        """
+
+        self.user = user
+        self.subscriptions = [
+            dict((k, data[k]) for k in ('type', 'name', 'title'))
+            for data in subscriptions]
+        self._modified = True
+
+    def names(self, user=None):
+        """
+        Return the subreddit names, without the /r/ prefix, with the most
+        recently visited first followed by the user's subscriptions.
+        """
+
+        names = list(reversed(self._visited))
+        for data in self.get_subscriptions(user or self.user):
+            names.append(data['name'][3:])
+        return names
 
 
 class Config(object):
@@ -82,6 +455,22 @@ class Config(object):
         'link': None,
         'subreddit': 'front',
         'history_size': 200,
+        'history_bloom_filter': False,
+        'history_error_rate': 0.001,
+        'index_browsed': False,
+        'follow_interval': 15,
+        'follow_max_interval': 300,
+        'refresh_interval': 0,
+        'subreddit_window': 250,
+        'sync': False,
+        'offline': False,
+        'local_dir': None,
+        'api_url': None,
+        'api_request_delay': None,
+        'sync_subreddits': '',
+        'sync_limit': 25,
+        'sync_workers': 4,
+        'cache_max_age': 3600,
         # https://github.com/reddit/reddit/wiki/OAuth2
         # Client ID is of type "installed app" and the secret should be empty
         'oauth_client_id': 'E2oEtRQfdfAfNQ',
@@ -97,18 +486,34 @@ class Config(object):
     def __init__(self,
                  config_file=CONFIG,
                  history_file=HISTORY,
+                 bloom_file=BLOOM,
                  token_file=TOKEN,
+                 access_token_file=ACCESS_TOKEN,
+                 cache_dir=CACHE,
+                 archive_dir=ARCHIVE,
+                 fulltext_file=FULLTEXT,
+                 subreddits_file=SUBREDDITS,
                  **kwargs):
 
         self.config_file = config_file
         self.history_file = history_file
+        self.bloom_file = bloom_file
         self.token_file = token_file
+        self.access_token_file = access_token_file
+        self.cache_dir = cache_dir
+        self.archive_dir = archive_dir
+        self.fulltext_file = fulltext_file
+        self.subreddits_file = subreddits_file
         self.config = kwargs
 
-        # `refresh_token` and `history` are saved/loaded at separate locations,
-        # so they are treated differently from the rest of the config options.
+        # `refresh_token`, `access_token`, `history`, `fulltext` and
+        # `subreddits` are saved/loaded at separate locations, so they are
+        # treated differently from the rest of the config options.
         self.refresh_token = None
-        self.history = OrderedSet()
+        self.access_token = None
+        self.history = History(self.history_file, self['history_size'])
+        self.fulltext = None
+        self.subreddits = SubredditCache(self.subreddits_file)
 
     def __getitem__(self, item):
         return self.config.get(item, self.DEFAULT.get(item))
@@ -146,6 +551,27 @@ class Config(object):
             config_dict['clear_auth'] = config.getboolean('rtv', 'clear_auth')
         if 'persistent' in config_dict:
             config_dict['persistent'] = config.getboolean('rtv', 'persistent')
+        if 'offline' in config_dict:
+            config_dict['offline'] = config.getboolean('rtv', 'offline')
+        if 'history_bloom_filter' in config_dict:
+            config_dict['history_bloom_filter'] = config.getboolean(
+                'rtv', 'history_bloom_filter')
+        if 'index_browsed' in config_dict:
+            config_dict['index_browsed'] = config.getboolean(
+                'rtv', 'index_browsed')
+        if 'api_request_delay' in config_dict:
+            config_dict['api_request_delay'] = config.getfloat(
+                'rtv', 'api_request_delay')
+        if 'history_error_rate' in config_dict:
+            config_dict['history_error_rate'] = config.getfloat(
+                'rtv', 'history_error_rate')
+
+        # Convert numeric options
+        for key in ('history_size', 'follow_interval', 'follow_max_interval',
+                    'refresh_interval', 'subreddit_window', 'sync_limit',
+                    'sync_workers', 'cache_max_age'):
+            if key in config_dict:
+                config_dict[key] = config.getint('rtv', key)
 
         self.update(**config_dict)
 
@@ -166,22 +592,84 @@ class Config(object):
             os.remove(self.token_file)
         self.refresh_token = None
 
+    def load_access_token(self):
+        """
+        The access token is cached along with its expiration time, scope, and
+        the name of the user that it belongs to so that it can be re-used
+        between sessions.
+        """
+
+        self.access_token = None
+        if os.path.exists(self.access_token_file):
+            with codecs.open(self.access_token_file, encoding='utf-8') as fp:
+                lines = fp.read().splitlines()
+            if len(lines) == 4:
+                try:
+                    expires = float(lines[1])
+                except ValueError:
+                    return
+                self.access_token = {
+                    'access_token': lines[0],
+                    'expires': expires,
+                    'scope': set(lines[2].split()),
+                    'user': lines[3]}
+
+    def save_access_token(self):
+        self._ensure_filepath(self.access_token_file)
+        with codecs.open(self.access_token_file, 'w+', encoding='utf-8') as fp:
+            fp.write('\n'.join([
+                self.access_token['access_token'],
+                repr(self.access_token['expires']),
+                ' '.join(sorted(self.access_token['scope'])),
+                self.access_token['user']]))
+        # Match the permissions of the refresh token
+        if os.path.exists(self.token_file):
+            mode = stat.S_IMODE(os.stat(self.token_file).st_mode)
+            os.chmod(self.access_token_file, mode)
+
+    def delete_access_token(self):
+        if os.path.exists(self.access_token_file):
+            os.remove(self.access_token_file)
+        self.access_token = None
+
     def load_history(self):
-        if os.path.exists(self.history_file):
-            with codecs.open(self.history_file, encoding='utf-8') as fp:
-                self.history = OrderedSet([line.strip() for line in fp])
+        if self['history_bloom_filter']:
+            self.history = BloomFilter(
+                self.bloom_file, self['history_size'],
+                self['history_error_rate'], history_file=self.history_file)
         else:
-            self.history = OrderedSet()
+            self.history = History(self.history_file, self['history_size'])
+        self.history.load()
 
     def save_history(self):
-        self._ensure_filepath(self.history_file)
-        with codecs.open(self.history_file, 'w+', encoding='utf-8') as fp:
-            fp.writelines('\n'.join(self.history[-self['history_size']:]))
+        self.history.sync()
 
     def delete_history(self):
-        if os.path.exists(self.history_file):
-            os.remove(self.history_file)
-        self.history = OrderedSet()
+        self.history.delete()
+
+    def load_subreddits(self):
+        self.subreddits.load()
+
+    def save_subreddits(self):
+        self.subreddits.save()
+
+    def load_fulltext(self):
+        """
+        Start recording the items that are displayed, if `index_browsed` is
+        enabled and SQLite supports it.
+        """
+
+        if self['index_browsed']:
+            # Imported here to avoid a circular import
+            from .fulltext import FullTextIndex
+
+            fulltext = FullTextIndex(self.fulltext_file)
+            if fulltext.open():
+                self.fulltext = fulltext
+
+    def save_fulltext(self):
+        if self.fulltext is not None:
+            self.fulltext.close()
 
     @staticmethod
     def _ensure_filepath(filename):
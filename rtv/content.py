@@ -1,21 +1,72 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import os
 import re
+import time
+from bisect import bisect_right
 from datetime import datetime
+from functools import partial
 
 import six
 import praw
 from kitchen.text.display import wrap
 
 from . import exceptions
+from .archive import ThreadArchive, ArchivedComments
 
 
 class Content(object):
 
+    # The submission page starts at -1, which is the submission itself
+    first_index = 0
+
+    def __len__(self):
+        """
+        The number of items that have been loaded so far.
+        """
+        raise NotImplementedError
+
+    @property
+    def last_index(self):
+        return self.first_index + len(self) - 1
+
     def get(self, index, n_cols):
         raise NotImplementedError
 
+    def exists(self, index):
+        """
+        Return True if there is an item at the given index. Unlike `get`, this
+        doesn't wrap any text or restore items that have been evicted, but
+        listings that are loaded lazily may still need to download more items
+        to find out how long they are.
+        """
+
+        return self.first_index <= index <= self.last_index
+
+    def peek(self, index):
+        """
+        Return the stored data at the given index without wrapping any text or
+        loading anything from reddit. Returns None if the index has not been
+        loaded.
+        """
+        raise NotImplementedError
+
+    def measure(self, index, n_cols=70):
+        """
+        Return the number of rows that the item at the given index takes up,
+        not including the blank line after it.
+        """
+
+        return self.get(index, n_cols=n_cols)['n_rows']
+
+    def get_praw_object(self, data):
+        """
+        Rebuild the PRAW object for a submission or comment that was returned
+        by `get`, in order to vote, reply, edit, or delete it.
+        """
+        raise NotImplementedError
+
     def iterate(self, index, step, n_cols=70):
 
         while True:
@@ -70,32 +121,38 @@ class Content(object):
         """
 
         data = {}
-        data['object'] = comment
         data['level'] = comment.nested_level
 
         if isinstance(comment, praw.objects.MoreComments):
             data['type'] = 'MoreComments'
+            data['name'] = getattr(comment, 'name', None)
+            data['parent_id'] = comment.parent_id
+            data['children'] = comment.children
             data['count'] = comment.count
             data['body'] = 'More comments'.format(comment.count)
         else:
             author = getattr(comment, 'author', '[deleted]')
             name = getattr(author, 'name', '[deleted]')
             sub = getattr(comment, 'submission', '[deleted]')
-            sub_author = getattr(sub, 'author', '[deleted]')
-            sub_name = getattr(sub_author, 'name', '[deleted]')
+            sub_author = getattr(sub, 'author', None) or '[deleted]'
+            # Accept a plain name as well as a Redditor for the thread author
+            sub_name = getattr(sub_author, 'name', sub_author)
             flair = getattr(comment, 'author_flair_text', '')
             permalink = getattr(comment, 'permalink', None)
 
             data['type'] = 'Comment'
+            data['name'] = comment.fullname
             data['body'] = comment.body
             data['created'] = cls.humanize_timestamp(comment.created_utc)
+            data['created_utc'] = comment.created_utc
             data['score'] = '{} pts'.format(comment.score)
             data['author'] = name
-            data['is_author'] = (name == sub_name)
+            data['is_author'] = (name != '[deleted]' and name == sub_name)
             data['flair'] = flair
             data['likes'] = comment.likes
             data['gold'] = comment.gilded > 0
             data['permalink'] = permalink
+            data['controversiality'] = getattr(comment, 'controversiality', 0)
 
         return data
 
@@ -119,11 +176,12 @@ class Content(object):
         flair = getattr(sub, 'link_flair_text', '')
 
         data = {}
-        data['object'] = sub
         data['type'] = 'Submission'
+        data['name'] = sub.fullname
         data['title'] = sub.title
         data['text'] = sub.selftext
         data['created'] = cls.humanize_timestamp(sub.created_utc)
+        data['created_utc'] = sub.created_utc
         data['comments'] = '{} comments'.format(sub.num_comments)
         data['score'] = '{} pts'.format(sub.score)
         data['author'] = name
@@ -154,6 +212,57 @@ class Content(object):
 
         return data
 
+    @staticmethod
+    def refresh_praw_data(data, thing):
+        """
+        Update the score, vote direction and comment count of a submission or
+        comment that was previously stripped, using a freshly fetched PRAW
+        object for the same item.
+        """
+
+        data['score'] = '{} pts'.format(thing.score)
+        data['likes'] = thing.likes
+        data['gold'] = thing.gilded > 0
+        if data['type'] == 'Submission':
+            data['comments'] = '{} comments'.format(thing.num_comments)
+
+    @staticmethod
+    def build_praw_submission(reddit, data, order=None):
+        """
+        Rebuild a lightweight PRAW submission from the data returned by
+        `strip_praw_submission`. Nothing is requested from reddit, the object
+        only holds enough information to act on the submission and to load
+        more of its comments.
+        """
+
+        submission = praw.objects.Submission(reddit, {
+            'id': data['name'].split('_', 1)[1],
+            'permalink': data['permalink'],
+            'subreddit': data['subreddit'],
+            'author': data['author']})
+        submission._comment_sort = order
+        return submission
+
+    @staticmethod
+    def build_praw_comment(data, submission):
+        """
+        Rebuild a lightweight PRAW comment or MoreComments object from the data
+        returned by `strip_praw_comment`, attached to the given submission.
+        """
+
+        reddit = submission.reddit_session
+        json = {'name': data['name'], 'id': data['name'].split('_', 1)[1]}
+        if data['type'] == 'MoreComments':
+            json['parent_id'] = data['parent_id']
+            json['children'] = data['children']
+            json['count'] = data['count']
+            comment = praw.objects.MoreComments(reddit, json)
+        else:
+            json['replies'] = ''
+            comment = praw.objects.Comment(reddit, json)
+        comment._update_submission(submission)
+        return comment
+
     @staticmethod
     def strip_praw_subscription(subscription):
         """
@@ -162,7 +271,6 @@ class Content(object):
         """
 
         data = {}
-        data['object'] = subscription
         data['type'] = 'Subscription'
         data['name'] = "/r/" + subscription.display_name
         data['title'] = subscription.title
@@ -210,34 +318,635 @@ class Content(object):
         return out
 
 
+class RowIndex(object):
+    """
+    Prefix sums of the number of rows that each item takes up on the screen,
+    including the blank line after it, for one column width. This is used to
+    find an item by its position on the page, e.g. to jump to a percentage,
+    without drawing everything in between.
+
+    An item is measured by wrapping its text the first time that it's needed,
+    and measurements are kept until the width changes. When items are folded
+    or inserted, `splice` forgets only the items that changed, and the sums
+    after them are added up again the next time that they are needed.
+    """
+
+    def __init__(self, content):
+
+        self._content = content
+        self._n_cols = None
+        # Positions are content indices, counted from `first_index`
+        self._heights = []
+        # self._sums[i] is the number of rows above position i
+        self._sums = [0]
+
+    def reset(self):
+        self._heights = []
+        self._sums = [0]
+
+    def splice(self, start, stop, count):
+        """
+        Record that the items from `start` to `stop` have been replaced by
+        `count` new items.
+        """
+
+        start -= self._content.first_index
+        stop -= self._content.first_index
+        if start < len(self._heights):
+            self._heights[start:stop] = [None] * count
+        del self._sums[start + 1:]
+
+    def _update(self, stop, n_cols):
+        """
+        Measure the items up to position `stop`.
+        """
+
+        if n_cols != self._n_cols:
+            self._n_cols = n_cols
+            self.reset()
+
+        heights, sums = self._heights, self._sums
+        first = self._content.first_index
+        for position in range(len(sums) - 1, min(stop, len(self._content))):
+            if position == len(heights):
+                heights.append(None)
+            if heights[position] is None:
+                heights[position] = self._content.measure(
+                    position + first, n_cols=n_cols) + 1
+            sums.append(sums[-1] + heights[position])
+
+    def offset(self, index, n_cols):
+        """
+        The number of rows above the item at `index`.
+        """
+
+        position = index - self._content.first_index
+        self._update(position + 1, n_cols)
+        return self._sums[min(position, len(self._sums) - 1)]
+
+    def total(self, n_cols):
+        """
+        The number of rows taken up by all of the loaded items.
+        """
+
+        self._update(len(self._content), n_cols)
+        return self._sums[-1]
+
+    def find(self, row, n_cols):
+        """
+        Return the index of the item that covers the given row.
+        """
+
+        self._update(len(self._content), n_cols)
+        position = bisect_right(self._sums, row) - 1
+        position = max(min(position, len(self._sums) - 2), 0)
+        return position + self._content.first_index
+
+
+class TreeIndex(object):
+    """
+    The parent, previous sibling, top level ancestor, and the end of the
+    replies of every comment in a thread. This lets the page move between
+    parents, siblings and top level comments without stepping through all of
+    the replies in between.
+
+    Everything is worked out from the comment levels in a single pass the
+    first time that it's needed, and thrown away whenever comments are folded,
+    loaded or inserted.
+    """
+
+    def __init__(self, content):
+
+        self._content = content
+        self._parents = None
+        self._previous = None
+        self._tops = None
+        self._ends = None
+
+    def reset(self):
+        self._parents = None
+
+    def _update(self):
+
+        if self._parents is not None:
+            return
+
+        levels = [data['level'] for data in self._content._comment_data]
+        n_comments = len(levels)
+        parents, previous = [-1] * n_comments, [None] * n_comments
+        tops, ends = list(range(n_comments)), [n_comments] * n_comments
+
+        # The comments that are still waiting for the end of their replies
+        stack = []
+        for index, level in enumerate(levels):
+            while stack and levels[stack[-1]] >= level:
+                closed = stack.pop()
+                ends[closed] = index
+                if levels[closed] == level:
+                    previous[index] = closed
+            if stack:
+                parents[index] = stack[-1]
+                tops[index] = tops[stack[-1]]
+            stack.append(index)
+
+        self._previous, self._tops, self._ends = previous, tops, ends
+        self._parents = parents
+
+    def parent(self, index):
+        """
+        Return the index of the comment's parent, -1 for top level comments.
+        """
+
+        if index < 0:
+            return None
+        self._update()
+        return self._parents[index]
+
+    def end(self, index):
+        """
+        Return the index after the comment's last reply.
+        """
+
+        self._update()
+        if index < 0:
+            return len(self._ends)
+        return self._ends[index]
+
+    def next_sibling(self, index):
+
+        if index < 0:
+            return None
+        self._update()
+        end, parents = self._ends[index], self._parents
+        if end < len(parents) and parents[end] == parents[index]:
+            return end
+        return None
+
+    def previous_sibling(self, index):
+
+        if index < 0:
+            return None
+        self._update()
+        return self._previous[index]
+
+    def next_top(self, index):
+        """
+        Return the index of the next top level comment.
+        """
+
+        self._update()
+        end = self._ends[self._tops[index]] if index >= 0 else 0
+        if end < len(self._ends):
+            return end
+        return None
+
+
+class SearchIndex(object):
+    """
+    The lower case author and body of every comment in a thread, including
+    the ones that are folded, joined into one string. A search is then a few
+    calls to `str.find` instead of a loop over all of the comments.
+
+    Comments are numbered in the order that they're written out when every
+    comment is unfolded, which folding doesn't change, and only their names
+    are kept. The index is built a few hundred comments at a time by `build`,
+    which the page runs while it's waiting for a key press, and it's thrown
+    away when comments are sorted, loaded or inserted.
+    """
+
+    def __init__(self, content):
+
+        self._content = content
+        self.reset()
+
+    def reset(self):
+        self._names = []
+        # self._offsets[i] is where comment i starts in the text
+        self._offsets = []
+        self._chunks = []
+        self._length = 0
+        self._text = None
+        # The lists that are being walked, and the next index in each of them
+        self._stack = None
+
+    def rewind(self):
+        """
+        Comments were folded or unfolded. Their positions stay the same, but
+        an index that's still being built walks the list by index and has to
+        start over.
+        """
+
+        if self._text is None:
+            self.reset()
+
+    @property
+    def complete(self):
+        return self._text is not None
+
+    def build(self, limit=None):
+        """
+        Index up to `limit` more comments, or all of them. Returns True if
+        anything was indexed.
+        """
+
+        if self._text is not None:
+            return False
+        if self._stack is None:
+            # Comments are read one at a time, so that an archived thread only
+            # decodes the ones that are being indexed
+            self._stack = [[self._content._comment_data, 0]]
+
+        stack, count = self._stack, 0
+        while stack and (limit is None or count < limit):
+            comment_data, index = stack[-1]
+            if index == len(comment_data):
+                stack.pop()
+                continue
+            stack[-1][1] += 1
+
+            data = comment_data[index]
+            if data['type'] == 'HiddenComment':
+                stack.append([data['cache'], 0])
+                continue
+            if data['type'] == 'Comment':
+                chunk = '{0} {1}\n'.format(data['author'], data['body'])
+                chunk = chunk.lower()
+            else:
+                chunk = '\n'
+            self._names.append(data.get('name'))
+            self._offsets.append(self._length)
+            self._chunks.append(chunk)
+            self._length += len(chunk)
+            count += 1
+
+        if not stack:
+            self._finish()
+        return count > 0
+
+    def _finish(self):
+        self._text = ''.join(self._chunks)
+        self._offsets.append(self._length)
+        self._chunks = None
+
+    def __getitem__(self, position):
+        "The name of the comment at the given position"
+        return self._names[position]
+
+    def search(self, query):
+        """
+        Return the positions of all of the comments that contain the query,
+        ignoring case.
+        """
+
+        hits, position = [], 0
+        while True:
+            position = self.find(query, position)
+            if position is None or (hits and position <= hits[-1]):
+                return hits
+            hits.append(position)
+            position += 1
+
+    def find(self, query, position=0, reverse=False):
+        """
+        Return the position of the first comment at or after `position` that
+        contains the query, ignoring case, or with `reverse` the last one
+        before it. The search wraps around the end of the thread, and returns
+        None if nothing matches.
+
+        The text is scanned by `str.find`, so finding the next match doesn't
+        depend on how many comments match.
+        """
+
+        self.build()
+        query = query.lower()
+        if not query:
+            return None
+
+        text, offsets = self._text, self._offsets
+        start = offsets[min(max(position, 0), len(self._names))]
+        if reverse:
+            match = text.rfind(query, 0, start)
+            if match == -1:
+                match = text.rfind(query)
+        else:
+            match = text.find(query, start)
+            if match == -1:
+                match = text.find(query)
+
+        if match == -1:
+            return None
+        return bisect_right(offsets, match) - 1
+
+
+class ContentSource(object):
+    """
+    Backend that subreddit listings and threads are loaded from.
+
+    The content classes only work with the dicts that are built by
+    `Content.strip_praw_submission` and `Content.strip_praw_comment`, so
+    anything that can produce them can be browsed through the normal pages.
+    Voting, replying, and loading more comments always go through `reddit`.
+    """
+
+    reddit = None
+
+    def get_listing(self, name, order=None, query=None):
+        """
+        Params:
+            name (str): Subreddit name, without the /r/ prefix or the order.
+            order (str): Order the submissions are sorted by.
+            query (str): Optional, search the subreddit instead.
+
+        Returns a tuple of (submissions, listing). `submissions` is an
+        iterator of items that can be passed to `strip_submission`. `listing`
+        is a function that accepts `limit` and `params` and is used to fetch
+        newer submissions, or None if the listing can't be refreshed.
+        """
+        raise NotImplementedError
+
+    def get_submission(self, url, order=None):
+        """
+        Return an item for the thread at the given url, which can be passed to
+        `strip_submission` and `load_thread`.
+        """
+        raise NotImplementedError
+
+    def strip_submission(self, submission):
+        raise NotImplementedError
+
+    def load_thread(self, submission):
+        """
+        Returns a tuple of (submission data, flattened comment data, creation
+        time of the newest comment).
+        """
+        raise NotImplementedError
+
+    def load_submissions(self, stubs):
+        """
+        Reload submissions that were evicted from memory, given the stubs that
+        were left in their place. Returns a dict of fullname -> data. Stubs
+        that can't be found are left out.
+        """
+        raise NotImplementedError
+
+
+class PRAWSource(ContentSource):
+    """
+    Load everything from reddit.
+    """
+
+    def __init__(self, reddit):
+        self.reddit = reddit
+
+    def get_listing(self, name, order=None, query=None):
+
+        reddit = self.reddit
+        listing = None
+        if name == 'me':
+            if not reddit.is_oauth_session():
+                raise exceptions.AccountError('Could not access user account')
+            elif order:
+                listing = partial(reddit.user.get_submitted, sort=order)
+            else:
+                listing = reddit.user.get_submitted
+            submissions = listing()
+
+        elif query:
+            if name == 'front':
+                submissions = reddit.search(query, subreddit=None, sort=order)
+            else:
+                submissions = reddit.search(query, subreddit=name, sort=order)
+
+        else:
+            if name == 'front':
+                dispatch = {
+                    None: reddit.get_front_page,
+                    'hot': reddit.get_front_page,
+                    'top': reddit.get_top,
+                    'rising': reddit.get_rising,
+                    'new': reddit.get_new,
+                    'controversial': reddit.get_controversial,
+                    }
+            else:
+                subreddit = reddit.get_subreddit(name)
+                dispatch = {
+                    None: subreddit.get_hot,
+                    'hot': subreddit.get_hot,
+                    'top': subreddit.get_top,
+                    'rising': subreddit.get_rising,
+                    'new': subreddit.get_new,
+                    'controversial': subreddit.get_controversial,
+                    }
+            listing = dispatch[order]
+            submissions = listing(limit=None)
+
+        return submissions, listing
+
+    def get_submission(self, url, order=None):
+
+        # Leave links to the api_url server alone, it might not use https
+        if not url.startswith(self.reddit.config.permalink_url):
+            url = url.replace('http:', 'https:')
+        return self.reddit.get_submission(url, comment_sort=order)
+
+    def strip_submission(self, submission):
+        return Content.strip_praw_submission(submission)
+
+    def load_thread(self, submission):
+
+        submission_data = Content.strip_praw_submission(submission)
+        comments = Content.flatten_comments(submission.comments)
+        comment_data = [Content.strip_praw_comment(c) for c in comments]
+        last_seen = max([submission.created_utc] + [
+            c['created_utc'] for c in comment_data if 'created_utc' in c])
+        return submission_data, comment_data, last_seen
+
+    def load_submissions(self, stubs):
+
+        fullnames = [stub['name'] for stub in stubs]
+        submissions = self.reddit.get_info(thing_id=fullnames) or []
+        return dict((s.fullname, Content.strip_praw_submission(s))
+                    for s in submissions)
+
+
+class LocalSource(ContentSource):
+    """
+    Load listings and threads that were dumped to a directory, in the indexed
+    JSON-lines format of `ThreadArchive`. Files are memory-mapped and records
+    are decoded as they are displayed, so large dumps can be browsed without
+    loading them into memory.
+
+    Layout:
+        <name>.jsonl            Submissions in the listing for /r/<name>
+        <name>.<order>.jsonl    Optional, the listing sorted by <order>
+        threads/<fullname>.jsonl
+                                A thread saved with `SubmissionContent.save`
+    """
+
+    def __init__(self, directory, reddit=None):
+        """
+        Params:
+            directory (str): Directory that holds the dumped files.
+            reddit (praw.Reddit): Optional, session used to vote, reply, or
+                load more comments.
+        """
+
+        self.directory = os.path.expanduser(directory)
+        self.reddit = reddit
+        # Fullname -> (archive, record number) of every submission that has
+        # been listed, used to reload submissions after they are evicted
+        self._locations = {}
+
+    def get_listing(self, name, order=None, query=None):
+
+        if query:
+            raise exceptions.SubredditError('Local listings are not indexed')
+        if name == 'me':
+            raise exceptions.AccountError('Could not access user account')
+
+        filenames = ['{0}.jsonl'.format(name)]
+        if order:
+            filenames.insert(0, '{0}.{1}.jsonl'.format(name, order))
+        for filename in filenames:
+            filename = os.path.join(self.directory, filename)
+            if os.path.isfile(filename):
+                break
+        else:
+            raise exceptions.SubredditError('No local listing for ' + name)
+
+        archive = ThreadArchive(filename)
+
+        def submissions():
+            for number in range(len(archive)):
+                data = archive[number]
+                self._locations[data['name']] = (archive, number)
+                yield data
+
+        return submissions(), None
+
+    def get_submission(self, url, order=None):
+
+        filename = os.path.expanduser(url)
+        if not os.path.isfile(filename):
+            match = re.search(r'/comments/(\w+)', url)
+            if match is None:
+                raise exceptions.SubmissionError('Invalid url ' + url)
+            name = 't3_{0}.jsonl'.format(match.group(1))
+            filename = os.path.join(self.directory, 'threads', name)
+            if not os.path.isfile(filename):
+                raise exceptions.SubmissionError('Thread has not been saved')
+        return ThreadArchive(filename)
+
+    def strip_submission(self, submission):
+        return submission
+
+    def load_thread(self, submission):
+        comment_data = ArchivedComments(submission)
+        return submission[0], comment_data, submission.last_seen
+
+    def load_submissions(self, stubs):
+
+        found = {}
+        for stub in stubs:
+            if stub['name'] in self._locations:
+                archive, number = self._locations[stub['name']]
+                found[stub['name']] = archive[number]
+        return found
+
+
+def _score(data):
+    return int(data['score'].split()[0])
+
+
+def _same_item(a, b):
+    """
+    Comments that are read from an `ArchivedComments` list are decoded again
+    when they drop out of its cache, so items are matched by their fullname.
+    Items without one, like folded comments, are only ever the same object.
+    """
+
+    if a is b:
+        return True
+    name = a.get('name')
+    return name is not None and name == b.get('name')
+
+
 class SubmissionContent(Content):
     """
     Grab a submission from PRAW and lazily store comments to an internal
     list for repeat access.
     """
 
+    first_index = -1
+
+    # The page builds the search index while it's waiting for input
+    index_in_background = True
+
+    # Sort keys for `sort`, the lowest comes first. Reddit doesn't give out
+    # the number of downvotes, so the controversial comments are the ones
+    # that reddit has flagged, followed by the ones with the closest votes
+    SORT_ORDERS = {
+        'top': lambda d: -_score(d),
+        'new': lambda d: -d['created_utc'],
+        'old': lambda d: d['created_utc'],
+        'controversial': lambda d: (
+            -d.get('controversiality', 0), abs(_score(d))),
+    }
+
     def __init__(self, submission, loader, indent_size=2, max_indent_level=8,
-                 order=None):
+                 order=None, source=None):
+        """
+        Params:
+            submission: PRAW submission, or the item returned by
+                `source.get_submission`.
+            loader (LoadScreen): Loader used when loading more comments.
+            source (ContentSource): Optional, where the submission came from.
+                Defaults to reddit.
+        """
 
-        submission_data = self.strip_praw_submission(submission)
-        comments = self.flatten_comments(submission.comments)
+        source = source or PRAWSource(submission.reddit_session)
+        submission_data, comment_data, last_seen = source.load_thread(
+            submission)
 
         self.indent_size = indent_size
         self.max_indent_level = max_indent_level
         self.name = submission_data['permalink']
         self.order = order
         self._loader = loader
-        self._submission = submission
+        self._reddit = source.reddit
         self._submission_data = submission_data
-        self._comment_data = [self.strip_praw_comment(c) for c in comments]
+        self._comment_data = comment_data
+        self._last_seen = last_seen
+        # Set by fetch_newer() when more comments were posted than it scanned
+        self.missed_comments = False
+        # The order that the comments were downloaded in, and their positions
+        # in it. The positions are recorded the first time that they're sorted
+        self._loaded_order = order
+        self._ranks = None
+        self.rows = RowIndex(self)
+        self.tree = TreeIndex(self)
+        self.search = SearchIndex(self)
 
     @classmethod
     def from_url(cls, reddit, url, loader, indent_size=2, max_indent_level=8,
-                 order=None):
+                 order=None, source=None):
+
+        source = source or PRAWSource(reddit)
+        submission = source.get_submission(url, order)
+        return cls(submission, loader, indent_size, max_indent_level, order,
+                   source=source)
 
-        url = url.replace('http:', 'https:')
-        submission = reddit.get_submission(url, comment_sort=order)
-        return cls(submission, loader, indent_size, max_indent_level, order)
+    def save(self, filename):
+        """
+        Save the submission and every comment that has been loaded to a
+        `ThreadArchive`, which can be opened with `ArchiveContent`.
+        """
+
+        ThreadArchive.write(
+            filename, self._submission_data, list(self._comment_data))
+
+    def __len__(self):
+        return len(self._comment_data) + 1
 
     def get(self, index, n_cols=70):
         """
@@ -269,6 +978,29 @@ class SubmissionContent(Content):
 
         return data
 
+    def get_praw_object(self, data):
+
+        if self._reddit is None:
+            raise exceptions.SubmissionError('Not connected to reddit')
+
+        # A new submission is built every time because PRAW keeps a reference
+        # to each comment that is attached to it
+        submission = self.build_praw_submission(
+            self._reddit, self._submission_data, self.order)
+        if data['type'] == 'Submission':
+            return submission
+        else:
+            return self.build_praw_comment(data, submission)
+
+    def peek(self, index):
+
+        if index == -1:
+            return self._submission_data
+        elif 0 <= index < len(self._comment_data):
+            return self._comment_data[index]
+        else:
+            return None
+
     def toggle(self, index, n_cols=70):
         """
         Toggle the state of the object at the given index.
@@ -285,38 +1017,389 @@ class SubmissionContent(Content):
 
         elif data['type'] == 'Comment':
             cache = [data]
-            count = 1
             for d in self.iterate(index + 1, 1, n_cols):
                 if d['level'] <= data['level']:
                     break
-
-                count += d.get('count', 1)
                 cache.append(d)
 
-            comment = {}
-            comment['type'] = 'HiddenComment'
-            comment['cache'] = cache
-            comment['count'] = count
-            comment['level'] = data['level']
-            comment['body'] = 'Hidden'.format(count)
+            comment = self._hide(cache)
             self._comment_data[index:index + len(cache)] = [comment]
+            self.rows.splice(index, index + len(cache), 1)
+            self.tree.reset()
+            self.search.rewind()
 
         elif data['type'] == 'HiddenComment':
             self._comment_data[index:index + 1] = data['cache']
+            self.rows.splice(index, index + 1, len(data['cache']))
+            self.tree.reset()
+            self.search.rewind()
 
         elif data['type'] == 'MoreComments':
             with self._loader():
                 # Undefined behavior if using a nested loader here
                 assert self._loader.depth == 1
-                comments = data['object'].comments(update=True)
+                more_comments = self.get_praw_object(data)
+                comments = more_comments.comments(update=True)
             if not self._loader.exception:
                 comments = self.flatten_comments(comments, data['level'])
                 comment_data = [self.strip_praw_comment(c) for c in comments]
                 self._comment_data[index:index + 1] = comment_data
+                self.rows.splice(index, index + 1, len(comment_data))
+                self.tree.reset()
+                self.search.reset()
 
         else:
             raise ValueError('%s type not recognized' % data['type'])
 
+    def collapse(self, level, index=-1):
+        """
+        Fold every comment on the given level, leaving only the comments above
+        it showing. This is the same as calling `toggle` on each of them, but
+        is done in a single pass over the thread without wrapping any text.
+
+        Returns the new index of the item at `index`, or of the hidden comment
+        that it was folded into.
+        """
+
+        # The comment that is being folded, followed by its replies
+        comment_data, cache, new_index = [], None, index
+        for i, data in enumerate(self._comment_data):
+            if cache is not None and data['level'] > level:
+                cache.append(data)
+            else:
+                if cache is not None:
+                    comment_data.append(self._hide(cache))
+                    cache = None
+                if data['type'] == 'Comment' and data['level'] == level:
+                    cache = [data]
+                else:
+                    comment_data.append(data)
+            if i == index:
+                new_index = len(comment_data) - (cache is None)
+        if cache is not None:
+            comment_data.append(self._hide(cache))
+
+        self._replace(comment_data)
+        return new_index
+
+    def expand_all(self, index=-1):
+        """
+        Unfold every hidden comment, including the ones that were folded
+        inside of other hidden comments.
+
+        Returns the new index of the item at `index`.
+        """
+
+        comment_data, new_index = [], index
+        for i, data in enumerate(self._comment_data):
+            if i == index:
+                new_index = len(comment_data)
+            comment_data.extend(self._walk([data]))
+
+        self._replace(comment_data)
+        return new_index
+
+    def sort(self, order=None, index=-1):
+        """
+        Sort the comments that have been loaded without downloading the thread
+        again. Replies are sorted among their siblings and stay underneath
+        their parents, folded comments stay folded, and links to load more
+        comments stay at the end of their siblings.
+
+        Params:
+            order (str): One of `SORT_ORDERS`, or None to go back to the order
+                that the comments were downloaded in.
+            index (int): The selected item.
+
+        Returns the new index of the item at `index`.
+        """
+
+        if self._ranks is None:
+            self._ranks = {}
+            for data in self._walk(self._comment_data):
+                self._ranks.setdefault(data.get('name'), len(self._ranks))
+
+        if order is None:
+            ranks = self._ranks
+            value = lambda d: ranks.get(d['name'], len(ranks))
+        else:
+            value = self.SORT_ORDERS[order]
+
+        def key(data):
+            if data['type'] == 'HiddenComment':
+                data = data['cache'][0]
+            if data['type'] == 'MoreComments':
+                return 1, 0
+            return 0, value(data)
+
+        selected = self._comment_data[index] if index >= 0 else None
+        comment_data = self._sort_tree(self._comment_data, key)
+        self._replace(comment_data)
+        self.search.reset()
+        self.order = order or self._loaded_order
+
+        if selected is None:
+            return index
+        return next((i for i, d in enumerate(comment_data)
+                     if _same_item(d, selected)), index)
+
+    def reveal(self, name):
+        """
+        Unfold the hidden comments that the named comment is inside of, and
+        return its index. Returns None if the comment isn't in the thread.
+        """
+
+        if name is None:
+            return None
+
+        index = 0
+        while index < len(self._comment_data):
+            item = self._comment_data[index]
+            if item.get('name') == name:
+                return index
+            if item['type'] == 'HiddenComment' and any(
+                    d.get('name') == name for d in self._walk(item['cache'])):
+                # Look inside of it on the next pass
+                self.toggle(index)
+            else:
+                index += 1
+        return None
+
+    def position(self, index):
+        """
+        Return the number of comments before the item at `index` when every
+        comment is unfolded, which is how comments are numbered in the
+        search index. The submission is -1.
+        """
+
+        if index < 0:
+            return -1
+
+        position = 0
+        for i in range(index):
+            item = self._comment_data[i]
+            if item['type'] == 'HiddenComment':
+                position += sum(1 for _ in self._walk(item['cache']))
+            else:
+                position += 1
+        return position
+
+    @classmethod
+    def _sort_tree(cls, comment_data, key):
+
+        # Group the replies by the index of their parent. Only indices are
+        # stored, so sorting a large thread doesn't build a lot of objects
+        # for the garbage collector to look at
+        keys = [key(data) for data in comment_data]
+        roots, replies, stack = [], {}, []
+        for index, data in enumerate(comment_data):
+            level = data['level']
+            while stack and comment_data[stack[-1]]['level'] >= level:
+                stack.pop()
+            if stack:
+                replies.setdefault(stack[-1], []).append(index)
+            else:
+                roots.append(index)
+            stack.append(index)
+
+        # And write them out again depth first, with each group sorted
+        sorted_data = []
+        stack = sorted(roots, key=keys.__getitem__)[::-1]
+        while stack:
+            index = stack.pop()
+            data = comment_data[index]
+            if data['type'] == 'HiddenComment':
+                data['cache'] = cls._sort_tree(data['cache'], key)
+            sorted_data.append(data)
+            if index in replies:
+                stack.extend(
+                    sorted(replies[index], key=keys.__getitem__)[::-1])
+        return sorted_data
+
+    @staticmethod
+    def _walk(comment_data):
+        """
+        Iterate over the comments, including the ones inside of hidden
+        comments.
+        """
+
+        stack = list(reversed(comment_data))
+        while stack:
+            data = stack.pop()
+            if data['type'] == 'HiddenComment':
+                stack.extend(reversed(data['cache']))
+            else:
+                yield data
+
+    @staticmethod
+    def _hide(cache):
+        """
+        Build the hidden comment that a comment and its replies are folded
+        into.
+        """
+
+        count = sum(d.get('count', 1) for d in cache[1:]) + 1
+        comment = {}
+        comment['type'] = 'HiddenComment'
+        comment['cache'] = cache
+        comment['count'] = count
+        comment['level'] = cache[0]['level']
+        comment['body'] = 'Hidden'.format(count)
+        return comment
+
+    def _replace(self, comment_data):
+
+        self._comment_data[:] = comment_data
+        self.rows.reset()
+        self.tree.reset()
+        self.search.rewind()
+
+    def fetch_newer(self, limit=1000):
+        """
+        Download the comments that have been posted since the newest loaded
+        comment and splice them into the tree, directly underneath their
+        parents. Only the subreddit's stream of new comments is requested, so
+        the cost of a poll doesn't depend on the size of the thread. Replies
+        to folded comments are added to the hidden comment that they're
+        folded inside of.
+
+        If the stream doesn't reach back to the newest loaded comment,
+        `missed_comments` is set because some comments were skipped.
+
+        Params:
+            limit (int): Maximum number of comments to scan in the subreddit's
+                comment stream.
+
+        Returns the list of indices where the comments were inserted, in the
+        order that they were inserted.
+        """
+
+        if self._reddit is None:
+            raise exceptions.SubmissionError('Not connected to reddit')
+
+        subreddit = self._submission_data['subreddit']
+        link_id = self._submission_data['name']
+
+        # The stream is sorted newest first, stop at the last comment we saw.
+        # Comments posted in the same second as it are kept, and the ones
+        # that are already loaded are skipped by name below
+        comments = []
+        count = 0
+        self.missed_comments = False
+        for comment in self._reddit.get_comments(subreddit, limit=limit):
+            count += 1
+            if comment.created_utc < self._last_seen:
+                break
+            if comment.link_id == link_id:
+                comments.append(comment)
+        else:
+            self.missed_comments = count >= limit
+        if not comments:
+            return []
+        self._last_seen = comments[0].created_utc
+
+        # Attach a submission to avoid an extra request for each comment
+        submission = self.build_praw_submission(
+            self._reddit, self._submission_data, self.order)
+
+        # Insert the oldest comments first so parents exist before replies
+        inserted = []
+        loaded = set(data.get('name') for data in self._walk(
+            self._comment_data))
+        names = [data.get('name') for data in self._comment_data]
+        for comment in reversed(comments):
+            if comment.fullname in loaded:
+                continue
+            comment._update_submission(submission)
+
+            if comment.parent_id == link_id:
+                index, level = 0, 0
+            elif comment.parent_id in names:
+                parent = names.index(comment.parent_id)
+                index = parent + 1
+                level = self._comment_data[parent]['level'] + 1
+            elif comment.parent_id in loaded:
+                self._insert_folded(comment)
+                loaded.add(comment.fullname)
+                continue
+            else:
+                # The parent hasn't been loaded yet
+                continue
+
+            comment.nested_level = level
+            data = self.strip_praw_comment(comment)
+            self._comment_data.insert(index, data)
+            self.rows.splice(index, index, 1)
+            self.tree.reset()
+            self.search.reset()
+            names.insert(index, data['name'])
+            loaded.add(data['name'])
+            inserted.append(index)
+
+        return inserted
+
+    def _insert_folded(self, comment):
+        """
+        Add a comment to the cache of the hidden comment that its parent is
+        folded inside of, directly underneath the parent.
+        """
+
+        for index, data in enumerate(self._comment_data):
+            if data['type'] == 'HiddenComment':
+                path = self._find_folded(data, comment.parent_id)
+                if path:
+                    break
+        else:
+            return
+
+        cache = path[-1]['cache']
+        parent = next(i for i, d in enumerate(cache)
+                      if d.get('name') == comment.parent_id)
+        comment.nested_level = cache[parent]['level'] + 1
+        cache.insert(parent + 1, self.strip_praw_comment(comment))
+        for hidden in path:
+            hidden['count'] += 1
+        # Write it back, archived threads would lose the change otherwise
+        self._comment_data[index] = data
+        self.rows.splice(index, index + 1, 1)
+        self.search.reset()
+
+    @classmethod
+    def _find_folded(cls, hidden, name):
+        """
+        Return the hidden comments that the named comment is folded inside
+        of, starting with `hidden`, or None if it isn't in there.
+        """
+
+        for data in hidden['cache']:
+            if data.get('name') == name:
+                return [hidden]
+            if data['type'] == 'HiddenComment':
+                path = cls._find_folded(data, name)
+                if path:
+                    return [hidden] + path
+        return None
+
+
+class ArchiveContent(SubmissionContent):
+    """
+    A thread that was saved with `SubmissionContent.save()`. Comments are
+    decoded from the archive as they are displayed, so opening a thread
+    doesn't depend on the number of comments. The reddit session is only used
+    to vote, reply, or load more comments.
+    """
+
+    # Indexing reads every comment, so it waits for the first search
+    index_in_background = False
+
+    def __init__(self, reddit, filename, loader, indent_size=2,
+                 max_indent_level=8):
+
+        source = LocalSource(os.path.dirname(filename), reddit)
+        super(ArchiveContent, self).__init__(
+            source.get_submission(filename), loader, indent_size,
+            max_indent_level, source=source)
+
 
 class SubredditContent(Content):
     """
@@ -324,13 +1407,50 @@ class SubredditContent(Content):
     list for repeat access.
     """
 
-    def __init__(self, name, submissions, loader, order=None):
+    # Seconds before an evicted submission that failed to load is requested
+    # again
+    RETRY_INTERVAL = 30
+
+    def __init__(self, name, submissions, loader, order=None, listing=None,
+                 reddit=None, window_size=None, source=None):
+        """
+        Params:
+            name (string): Display name of the subreddit.
+            submissions (generator): Generator of submissions, PRAW objects
+                unless `source` is given.
+            loader (LoadScreen): Loader used when fetching submissions.
+            order (string): Order the submissions are sorted by.
+            listing (func): Optional, the PRAW method that produced
+                `submissions`. Required to fetch newer submissions.
+            reddit (praw.Reddit): Optional, session used to re-fetch evicted
+                submissions.
+            window_size (int): Optional, the number of submissions on either
+                side of the last accessed index that are kept in memory. Any
+                submissions further away are reduced to their fullname and
+                re-loaded when they are accessed again. Requires `reddit` or
+                `source`.
+            source (ContentSource): Optional, where the submissions came from.
+                Defaults to reddit.
+        """
+
+        if source is None and reddit is not None:
+            source = PRAWSource(reddit)
 
         self.name = name
         self.order = order
+        self.window_size = window_size if source else None
         self._loader = loader
+        self._listing = listing
+        self._reddit = source.reddit if source else reddit
+        self._source = source
         self._submissions = submissions
         self._submission_data = []
+        # Indices of the submissions that are not evicted
+        self._loaded = set()
+        # Indices of the evicted submissions that couldn't be loaded again,
+        # and when they can be tried again
+        self._failed = {}
+        self.rows = RowIndex(self)
 
         # Verify that content exists for the given submission generator.
         # This is necessary because PRAW loads submissions lazily, and
@@ -342,7 +1462,8 @@ class SubredditContent(Content):
             raise exceptions.SubredditError('Unable to retrieve subreddit')
 
     @classmethod
-    def from_name(cls, reddit, name, loader, order=None, query=None):
+    def from_name(cls, reddit, name, loader, order=None, query=None,
+                  window_size=None, source=None):
 
         # Strip leading and trailing backslashes
         name = name.strip(' /')
@@ -359,43 +1480,132 @@ class SubredditContent(Content):
         if order not in ['hot', 'top', 'rising', 'new', 'controversial', None]:
             raise exceptions.SubredditError('Unrecognized order "%s"' % order)
 
-        if name == 'me':
-            if not reddit.is_oauth_session():
-                raise exceptions.AccountError('Could not access user account')
-            elif order:
-                submissions = reddit.user.get_submitted(sort=order)
-            else:
-                submissions = reddit.user.get_submitted()
+        source = source or PRAWSource(reddit)
+        submissions, listing = source.get_listing(name, order, query)
+        return cls(display_name, submissions, loader, order=order,
+                   listing=listing, window_size=window_size, source=source)
 
-        elif query:
-            if name == 'front':
-                submissions = reddit.search(query, subreddit=None, sort=order)
-            else:
-                submissions = reddit.search(query, subreddit=name, sort=order)
+    @property
+    def can_fetch_newer(self):
+        return self._listing is not None
 
-        else:
-            if name == 'front':
-                dispatch = {
-                    None: reddit.get_front_page,
-                    'hot': reddit.get_front_page,
-                    'top': reddit.get_top,
-                    'rising': reddit.get_rising,
-                    'new': reddit.get_new,
-                    'controversial': reddit.get_controversial,
-                    }
+    def fetch_newer(self, limit=100):
+        """
+        Download the submissions that are newer than the first submission in
+        the list and insert them at the top. Only the new items are requested
+        from reddit, using the listing's `before` parameter.
+
+        Returns the number of submissions that were added.
+        """
+
+        if not self.can_fetch_newer:
+            raise exceptions.SubredditError('Listing does not support paging')
+
+        # Reddit returns the `limit` items directly preceding the `before`
+        # item, newest first. Keep stepping backwards until we run out.
+        submissions = []
+        before = self._submission_data[0]['name']
+        while True:
+            params = {'before': before}
+            batch = list(self._listing(limit=limit, params=params))
+            if not batch:
+                break
+            submissions[0:0] = batch
+            before = batch[0].fullname
+            if len(batch) < limit:
+                break
+
+        loaded = set(data['name'] for data in self._submission_data)
+        new_data = [self.strip_praw_submission(s) for s in submissions
+                    if s.fullname not in loaded]
+        self._submission_data[0:0] = new_data
+        for index, data in enumerate(self._submission_data):
+            data['index'] = index
+        self._loaded = set(i + len(new_data) for i in self._loaded)
+        self._failed = {}
+        self._loaded.update(range(len(new_data)))
+        # Every title is renumbered, which can change how it wraps
+        self.rows.reset()
+
+        return len(new_data)
+
+    def _strip_submission(self, submission):
+
+        if self._source is None:
+            return self.strip_praw_submission(submission)
+        return self._source.strip_submission(submission)
+
+    def _evict(self, index):
+        """
+        Reduce every submission outside of the window around `index` to a
+        stub that only holds its fullname and position.
+        """
+
+        for i in list(self._loaded):
+            if abs(i - index) > self.window_size:
+                data = self._submission_data[i]
+                # The title is kept so that it can still be measured
+                self._submission_data[i] = {
+                    'name': data['name'], 'index': data['index'],
+                    'title': data['title']}
+                self._loaded.remove(i)
+
+    def _restore(self, index):
+        """
+        Reload the evicted submissions in the window around `index` from the
+        content source. For reddit, this is a single /api/info request.
+
+        Returns False if the submission at `index` couldn't be loaded. It's
+        not requested again for RETRY_INTERVAL seconds.
+        """
+
+        now = time.time()
+        if self._failed.get(index, 0) > now:
+            return False
+
+        start = max(index - self.window_size, 0)
+        stop = min(index + self.window_size, len(self._submission_data) - 1)
+        indices = [i for i in range(start, stop + 1) if i not in self._loaded
+                   and self._failed.get(i, 0) <= now]
+        indices.sort(key=lambda i: abs(i - index))
+        indices = indices[:100]
+
+        stubs = [self._submission_data[i] for i in indices]
+        with self._loader():
+            found = self._source.load_submissions(stubs)
+        if self._loader.exception:
+            found = {}
+
+        for i in indices:
+            stub = self._submission_data[i]
+            if stub['name'] in found:
+                data = found[stub['name']]
+                data['index'] = stub['index']
+                self._submission_data[i] = data
+                self._loaded.add(i)
+                self._failed.pop(i, None)
             else:
-                subreddit = reddit.get_subreddit(name)
-                dispatch = {
-                    None: subreddit.get_hot,
-                    'hot': subreddit.get_hot,
-                    'top': subreddit.get_top,
-                    'rising': subreddit.get_rising,
-                    'new': subreddit.get_new,
-                    'controversial': subreddit.get_controversial,
-                    }
-            submissions = dispatch[order](limit=None)
+                self._failed[i] = now + self.RETRY_INTERVAL
+
+        return index in self._loaded
+
+    def _unavailable(self, index, n_cols):
+        """
+        Stand-in for an evicted submission that couldn't be loaded again. The
+        stub stays in the list, so a later `get` will try it again.
+        """
 
-        return cls(display_name, submissions, loader, order=order)
+        stub = self._submission_data[index]
+        data = {
+            'type': 'Unavailable', 'name': stub['name'],
+            'index': stub['index'], 'title': stub['title'],
+            'url': 'Unable to load the submission', 'url_full': '',
+            'score': '', 'created': '', 'comments': '', 'author': '',
+            'subreddit': '', 'flair': None, 'gold': False, 'nsfw': False}
+        data['split_title'] = self._split_title(index, n_cols)
+        data['n_rows'] = len(data['split_title']) + 3
+        data['offset'] = 0
+        return data
 
     def get(self, index, n_cols=70):
         """
@@ -406,6 +1616,57 @@ class SubredditContent(Content):
         if index < 0:
             raise IndexError
 
+        self._extend(index)
+
+        if self.window_size is not None:
+            loaded = index in self._loaded or self._restore(index)
+            self._evict(index)
+            if not loaded:
+                return self._unavailable(index, n_cols)
+
+        # Modifies the original dict, faster than copying
+        data = self._submission_data[index]
+        data['split_title'] = self._split_title(index, n_cols)
+        data['n_rows'] = len(data['split_title']) + 3
+        data['offset'] = 0
+
+        return data
+
+    def measure(self, index, n_cols=70):
+        """
+        Measure the submission without restoring it if it has been evicted,
+        or moving the window.
+        """
+
+        self._extend(index)
+        return len(self._split_title(index, n_cols)) + 3
+
+    def _split_title(self, index, n_cols):
+
+        # Add the post number to the beginning of the title. This is done here
+        # instead of when the submission is loaded because newer submissions
+        # can be inserted at the top of the list.
+        data = self._submission_data[index]
+        title = '{0}. {1}'.format(index+1, data['title'])
+        return self.wrap_text(title, width=n_cols)
+
+    def __len__(self):
+        return len(self._submission_data)
+
+    def exists(self, index):
+
+        try:
+            self._extend(index)
+        except IndexError:
+            return False
+        return index >= 0
+
+    def _extend(self, index):
+        """
+        Load submissions from the listing until there is one at `index`, and
+        raise an IndexError if the listing ends first.
+        """
+
         while index >= len(self._submission_data):
             try:
                 with self._loader():
@@ -415,30 +1676,39 @@ class SubredditContent(Content):
             except StopIteration:
                 raise IndexError
             else:
-                data = self.strip_praw_submission(submission)
-                data['index'] = index
-                # Add the post number to the beginning of the title
-                data['title'] = '{0}. {1}'.format(index+1, data['title'])
+                data = self._strip_submission(submission)
+                data['index'] = len(self._submission_data)
+                self._loaded.add(data['index'])
                 self._submission_data.append(data)
 
-        # Modifies the original dict, faster than copying
-        data = self._submission_data[index]
-        data['split_title'] = self.wrap_text(data['title'], width=n_cols)
-        data['n_rows'] = len(data['split_title']) + 3
-        data['offset'] = 0
+    def get_praw_object(self, data):
 
-        return data
+        return self.build_praw_submission(self._reddit, data)
+
+    def peek(self, index):
+
+        if index in self._loaded:
+            return self._submission_data[index]
+        else:
+            return None
 
 
 class SubscriptionContent(Content):
 
     def __init__(self, subscriptions, loader):
+        """
+        Params:
+            subscriptions (generator): Generator of subscription data, as
+                built by `strip_praw_subscription`.
+            loader (LoadScreen): Loader used when fetching subscriptions.
+        """
 
         self.name = "Subscriptions"
         self.order = None
         self._loader = loader
         self._subscriptions = subscriptions
         self._subscription_data = []
+        self.rows = RowIndex(self)
 
         try:
             self.get(0)
@@ -448,32 +1718,135 @@ class SubscriptionContent(Content):
     @classmethod
     def from_user(cls, reddit, loader):
         subscriptions = reddit.get_my_subreddits(limit=None)
-        return cls(subscriptions, loader)
+        return cls(
+            (cls.strip_praw_subscription(s) for s in subscriptions), loader)
 
-    def get(self, index, n_cols=70):
+    @classmethod
+    def from_list(cls, subscription_data, loader):
         """
-        Grab the `i`th subscription, with the title field formatted to fit
-        inside of a window of width `n_cols`
+        Build the content from subscriptions that were saved earlier, without
+        connecting to reddit.
         """
+        return cls(iter([dict(data) for data in subscription_data]), loader)
 
-        if index < 0:
-            raise IndexError
+    def __len__(self):
+        return len(self._subscription_data)
+
+    def exists(self, index):
+
+        try:
+            self._extend(index)
+        except IndexError:
+            return False
+        return index >= 0
+
+    def _extend(self, index):
 
         while index >= len(self._subscription_data):
             try:
                 with self._loader():
-                    subscription = next(self._subscriptions)
+                    data = next(self._subscriptions)
                 if self._loader.exception:
                     raise IndexError
             except StopIteration:
                 raise IndexError
             else:
-                data = self.strip_praw_subscription(subscription)
                 self._subscription_data.append(data)
 
+    def load_all(self):
+        """
+        Fetch every subscription that hasn't been loaded yet, and return the
+        data for all of them.
+        """
+
+        try:
+            self._extend(float('inf'))
+        except IndexError:
+            pass
+        return self._subscription_data
+
+    def get(self, index, n_cols=70):
+        """
+        Grab the `i`th subscription, with the title field formatted to fit
+        inside of a window of width `n_cols`
+        """
+
+        if index < 0:
+            raise IndexError
+
+        self._extend(index)
+
         data = self._subscription_data[index]
         data['split_title'] = self.wrap_text(data['title'], width=n_cols)
         data['n_rows'] = len(data['split_title']) + 1
         data['offset'] = 0
 
         return data
+
+    def peek(self, index):
+
+        if 0 <= index < len(self._subscription_data):
+            return self._subscription_data[index]
+        else:
+            return None
+
+
+class BrowsedContent(Content):
+    """
+    Submissions and comments that were displayed in earlier sessions and
+    match a search of the `FullTextIndex`. Everything is read from the local
+    database, so searching works offline.
+    """
+
+    # Lines of the matching text that are shown under each title
+    SNIPPET_ROWS = 3
+
+    def __init__(self, query, results):
+
+        self.name = 'Browsed: {0}'.format(query)
+        self.order = None
+        self.query = query
+        self._result_data = results
+        self.rows = RowIndex(self)
+
+        for data in results:
+            data['title'] = data['title'] or '[unknown thread]'
+            data['created'] = self.humanize_timestamp(data['created_utc'] or 0)
+
+        if not results:
+            raise exceptions.SearchError('No matches for ' + query)
+
+    @classmethod
+    def from_query(cls, fulltext, query):
+        return cls(query, fulltext.search(query))
+
+    def __len__(self):
+        return len(self._result_data)
+
+    def exists(self, index):
+        return 0 <= index < len(self._result_data)
+
+    def get(self, index, n_cols=70):
+        """
+        Grab the `i`th result, with the title and the matching text formatted
+        to fit inside of a window of width `n_cols`
+        """
+
+        if index < 0:
+            raise IndexError
+
+        data = self._result_data[index]
+        data['split_title'] = self.wrap_text(data['title'], width=n_cols)
+        data['split_text'] = self.wrap_text(
+            data['snippet'] or '', width=n_cols)[:self.SNIPPET_ROWS]
+        data['n_rows'] = len(data['split_title']) + len(data['split_text']) + 1
+        data['offset'] = 0
+
+        return data
+
+    def peek(self, index):
+
+        if 0 <= index < len(self._result_data):
+            return self._result_data[index]
+        else:
+            return None
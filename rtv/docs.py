@@ -25,6 +25,8 @@ HELP = """
 Basic Commands
   `j/k` or `UP/DOWN`  : Move the cursor up/down
   `m/n` or `PgUp/PgDn`: Jump to the previous/next page
+  `g/G` or `Home/End` : Jump to the top/bottom
+  `%`                 : Jump to a percentage of the way down the page
   `o` or `ENTER`      : Open the selected item as a webpage
   `r` or `F5`         : Refresh page content
   `u`                 : Log in or switch accounts
@@ -41,12 +43,23 @@ Authenticated Commands
 
 Subreddit Mode
   `l` or `RIGHT`      : Enter the selected submission
-  `/`                 : Open a prompt to switch subreddits
+  `/`                 : Switch subreddits, `TAB` completes the name
   `f`                 : Open a prompt to search the current subreddit
+  `F`                 : Follow the subreddit and insert new submissions
+  `b`                 : Search everything that has been browsed, offline
 
 Submission Mode
   `h` or `LEFT`       : Return to subreddit mode
   `SPACE`             : Fold the selected comment, or load additional comments
+  `1-5`               : Sort comments (original/top/old/new/controversial)
+  `-/_`               : Fold every comment on this level/on the top level
+  `+` or `=`          : Unfold every comment
+  `/`                 : Search the comments, jumping to matches while typing
+  `]/[`               : Jump to the next/previous match of the last search
+  `p/T`               : Jump to the parent/next top level comment
+  `J/K`               : Jump to the next/previous comment on the same level
+  `F`                 : Follow the thread and insert new comments
+  `w`                 : Save the thread to read later with -l FILE
 """
 
 COMMENT_FILE = """
@@ -26,5 +26,9 @@ class SubscriptionError(RTVError):
     "Subscriptions could not be fetched"
 
 
+class SearchError(RTVError):
+    "Nothing matched the search"
+
+
 class ProgramError(RTVError):
     "Problem executing an external program"
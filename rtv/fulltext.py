@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import time
+import sqlite3
+import logging
+import threading
+
+from six.moves import queue
+
+from .config import Config
+
+_logger = logging.getLogger(__name__)
+
+
+class FullTextIndex(object):
+    """
+    Every submission and comment that has been displayed, stored in an SQLite
+    FTS5 table so that it can be searched without connecting to reddit.
+
+    Pages call `add` for each item that they draw, which only puts a row on a
+    queue. A background thread writes the queue to the database in batches,
+    so drawing never waits on the disk. Searches are run on the calling
+    thread through a separate connection.
+    """
+
+    # Rows are written when this many are waiting, or FLUSH_INTERVAL seconds
+    # after the first one was queued, whichever happens first
+    BATCH_SIZE = 200
+    FLUSH_INTERVAL = 1.0
+
+    # The FTS table only holds the text, `items` holds everything else and
+    # keeps a single row per fullname
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL,
+            type TEXT,
+            title TEXT,
+            body TEXT,
+            author TEXT,
+            subreddit TEXT,
+            permalink TEXT,
+            created_utc REAL,
+            seen REAL);
+        CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+            title, body, author, subreddit, content='items',
+            content_rowid='id');
+        CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts(rowid, title, body, author, subreddit)
+            VALUES (new.id, new.title, new.body, new.author, new.subreddit);
+        END;
+        CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts(items_fts, rowid, title, body, author,
+                                  subreddit)
+            VALUES ('delete', old.id, old.title, old.body, old.author,
+                    old.subreddit);
+        END;
+        CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items
+        WHEN old.title IS NOT new.title OR old.body IS NOT new.body BEGIN
+            INSERT INTO items_fts(items_fts, rowid, title, body, author,
+                                  subreddit)
+            VALUES ('delete', old.id, old.title, old.body, old.author,
+                    old.subreddit);
+            INSERT INTO items_fts(rowid, title, body, author, subreddit)
+            VALUES (new.id, new.title, new.body, new.author, new.subreddit);
+        END;
+    """
+
+    _FLUSH = object()
+
+    def __init__(self, filename):
+
+        self.filename = filename
+        self._queue = queue.Queue()
+        self._thread = None
+        self._db = None
+        # Fullnames that have been queued this session, so that redrawing
+        # the screen doesn't queue them again
+        self._added = set()
+
+    def open(self):
+        """
+        Create the database if it doesn't exist and start the writer. Returns
+        False if this version of SQLite was built without FTS5.
+        """
+
+        Config._ensure_filepath(self.filename)
+        try:
+            self._db = self._connect()
+            self._db.executescript(self.SCHEMA)
+        except sqlite3.OperationalError as e:
+            _logger.warning('Unable to open %s: %s', self.filename, e)
+            self._db = None
+            return False
+
+        self._thread = threading.Thread(target=self._write_rows)
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def close(self):
+        """
+        Write any rows that are still queued and stop the writer.
+        """
+
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._db.close()
+        self._db = None
+
+    def flush(self):
+        """
+        Block until every row that has been queued is written.
+        """
+
+        if self._thread is not None:
+            self._queue.put(self._FLUSH)
+            self._queue.join()
+
+    def add(self, data, submission=None):
+        """
+        Queue a submission or comment, as returned by `Content.get()`.
+        Comments don't store the thread that they belong to, so the
+        submission's data should be passed along with them.
+        """
+
+        if self._thread is None or data['type'] not in ('Submission',
+                                                        'Comment'):
+            return
+        if data['name'] in self._added:
+            return
+        self._added.add(data['name'])
+
+        if data['type'] == 'Submission':
+            title, body = data['title'], data['text']
+            subreddit = data['subreddit']
+        else:
+            submission = submission or {}
+            title, body = submission.get('title'), data['body']
+            subreddit = submission.get('subreddit')
+
+        self._queue.put((
+            data['name'], data['type'], title, body, data['author'],
+            subreddit, data['permalink'], data.get('created_utc'),
+            time.time()))
+
+    def search(self, query, limit=100):
+        """
+        Return the items that match every word in the query, best matches
+        first. The last word is matched as a prefix, so results can be shown
+        while the query is still being typed.
+        """
+
+        expression = self.match_expression(query)
+        if self._db is None or not expression:
+            return []
+
+        cursor = self._db.execute("""
+            SELECT items.type, items.name, items.title, items.body,
+                   items.author, items.subreddit, items.permalink,
+                   items.created_utc,
+                   snippet(items_fts, 1, '', '', '...', 24)
+            FROM items_fts JOIN items ON items.id = items_fts.rowid
+            WHERE items_fts MATCH ?
+            ORDER BY rank LIMIT ?""", (expression, limit))
+
+        keys = ('type', 'name', 'title', 'body', 'author', 'subreddit',
+                'permalink', 'created_utc', 'snippet')
+        return [dict(zip(keys, row)) for row in cursor]
+
+    @staticmethod
+    def match_expression(query):
+        """
+        Quote each word so that punctuation in the query can't be read as
+        FTS5 syntax.
+        """
+
+        words = ['"{0}"'.format(word.replace('"', '""'))
+                 for word in query.split()]
+        if words:
+            words[-1] += '*'
+        return ' '.join(words)
+
+    def _connect(self):
+
+        db = sqlite3.connect(self.filename, timeout=30)
+        # Readers don't block the writer and vice versa
+        db.execute('PRAGMA journal_mode=WAL')
+        return db
+
+    def _write_rows(self):
+        """
+        Writer thread, runs until `close` queues None.
+        """
+
+        db = self._connect()
+        done = False
+        while not done:
+            rows = []
+            item = self._queue.get()
+            n_items = 1
+            deadline = time.time() + self.FLUSH_INTERVAL
+            while True:
+                if item is None:
+                    done = True
+                    break
+                elif item is self._FLUSH:
+                    break
+                rows.append(item)
+                if len(rows) >= self.BATCH_SIZE:
+                    break
+                try:
+                    timeout = max(deadline - time.time(), 0)
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                n_items += 1
+
+            if rows:
+                self._write(db, rows)
+            for _ in range(n_items):
+                self._queue.task_done()
+        db.close()
+
+    @staticmethod
+    def _write(db, rows):
+
+        try:
+            with db:
+                db.executemany("""
+                    INSERT OR IGNORE INTO items (name, type, title, body,
+                        author, subreddit, permalink, created_utc, seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows)
+                # Pick up edits to items that were seen in an earlier session
+                db.executemany("""
+                    UPDATE items SET title = ?, body = ?, seen = ?
+                    WHERE name = ?""",
+                    [(r[2], r[3], r[8], r[0]) for r in rows])
+        except sqlite3.Error:
+            _logger.exception('Unable to write to the full text index')
@@ -4,38 +4,15 @@ from __future__ import unicode_literals
 import time
 import uuid
 
-from tornado import gen, ioloop, web, httpserver
-from concurrent.futures import ThreadPoolExecutor
+import praw
 
+# Tornado is only needed for the first-time authorization flow, so it is
+# imported by `authorize()` instead of here to keep rtv's start up fast.
 
-class OAuthHandler(web.RequestHandler):
-    """
-    Intercepts the redirect that Reddit sends the user to after they verify or
-    deny the application access.
-
-    The GET should supply 3 request params:
-        state: Unique id that was supplied by us at the beginning of the
-               process to verify that the session matches.
-        code: Code that we can use to generate the refresh token.
-        error: If an error occurred, it will be placed here.
-    """
-
-    def initialize(self, display=None, params=None):
-        self.display = display
-        self.params = params
-
-    def get(self):
-        self.params['state'] = self.get_argument('state', default=None)
-        self.params['code'] = self.get_argument('code', default=None)
-        self.params['error'] = self.get_argument('error', default=None)
-
-        self.render('index.html', **self.params)
-
-        complete = self.params['state'] and self.params['code']
-        if complete or self.params['error']:
-            # Stop IOLoop if using a background browser such as firefox
-            if self.display:
-                ioloop.IOLoop.current().stop()
+# Reddit's access tokens are valid for one hour. They are refreshed a few
+# minutes before they expire so that requests never go out with a stale token.
+ACCESS_TOKEN_LIFETIME = 3600
+ACCESS_TOKEN_MARGIN = 300
 
 
 class OAuthHelper(object):
@@ -49,13 +26,6 @@ class OAuthHelper(object):
         self.http_server = None
         self.params = {'state': None, 'code': None, 'error': None}
 
-        # Initialize Tornado webapp
-        # Pass a mutable params object so the request handler can modify it
-        kwargs = {'display': self.term.display, 'params': self.params}
-        routes = [('/', OAuthHandler, kwargs)]
-        self.callback_app = web.Application(
-            routes, template_path=self.config['template_path'])
-
         self.reddit.set_oauth_app_info(
             self.config['oauth_client_id'],
             self.config['oauth_client_secret'],
@@ -70,19 +40,27 @@ class OAuthHelper(object):
 
         self.params.update(state=None, code=None, error=None)
 
-        # If we already have a token, request new access credentials
+        # If we already have a token, re-use the cached access credentials or
+        # request new ones
         if self.config.refresh_token:
-            with self.term.loader(message='Logging in'):
-                self.reddit.refresh_access_information(
-                    self.config.refresh_token)
+            if self.has_valid_access_token:
+                self._set_access_credentials(self.config.access_token)
+            else:
+                self.refresh_access_token()
             return
 
+        from tornado import ioloop, httpserver
+        from .oauth_server import build_callback_app, open_browser_async
+
         # https://github.com/tornadoweb/tornado/issues/1420
         io = ioloop.IOLoop.current()
 
         # Start the authorization callback server
         if self.http_server is None:
-            self.http_server = httpserver.HTTPServer(self.callback_app)
+            # Pass a mutable params object so the request handler can modify it
+            callback_app = build_callback_app(
+                self.term.display, self.params, self.config['template_path'])
+            self.http_server = httpserver.HTTPServer(callback_app)
             self.http_server.listen(self.config['oauth_redirect_port'])
 
         state = uuid.uuid4().hex
@@ -107,7 +85,7 @@ class OAuthHelper(object):
             with self.term.loader(delay=0, message='Redirecting to reddit'):
                 # This load message exists to provide user feedback
                 time.sleep(1)
-            io.add_callback(self._async_open_browser, authorize_url)
+            io.add_callback(open_browser_async, self.term, authorize_url)
             io.start()
 
         if self.params['error'] == 'access_denied':
@@ -120,6 +98,7 @@ class OAuthHelper(object):
             self.term.show_notification('UUID mismatch')
             return
 
+        expires = time.time() + ACCESS_TOKEN_LIFETIME
         with self.term.loader(message='Logging in'):
             info = self.reddit.get_access_information(self.params['code'])
         if self.term.loader.exception:
@@ -131,13 +110,86 @@ class OAuthHelper(object):
         self.config.refresh_token = info['refresh_token']
         if self.config['persistent']:
             self.config.save_refresh_token()
+        self._cache_access_token(info, expires)
+
+    @property
+    def has_valid_access_token(self):
+        """
+        True if there's a cached access token that isn't about to expire.
+        """
+
+        token = self.config.access_token
+        if not token:
+            return False
+        return time.time() < token['expires'] - ACCESS_TOKEN_MARGIN
+
+    def refresh_access_token(self, force=True):
+        """
+        Request a new access token using the refresh token, and cache it so
+        that it can be re-used the next time that rtv is launched.
+
+        Params:
+            force (bool): If False, only refresh the token if it is about to
+                expire. This is meant to be run periodically in the background.
+
+        Returns True if the token was refreshed.
+        """
+
+        if not self.config.refresh_token:
+            return False
+
+        if not force and self.has_valid_access_token:
+            return False
+
+        if self.reddit.user is not None:
+            user = self.reddit.user.name
+        elif self.config.access_token:
+            user = self.config.access_token['user']
+        else:
+            user = None
+
+        expires = time.time() + ACCESS_TOKEN_LIFETIME
+        # Don't flash the loading screen for a background refresh
+        delay = 0.5 if force else 2
+        with self.term.loader(message='Logging in', delay=delay):
+            if user is None:
+                # Also fetches the user's account
+                info = self.reddit.refresh_access_information(
+                    self.config.refresh_token)
+            else:
+                info = self.reddit.refresh_access_information(
+                    self.config.refresh_token, update_session=False)
+                info['user'] = user
+                self._set_access_credentials(info)
+        if self.term.loader.exception:
+            return False
+
+        self._cache_access_token(info, expires)
+        return True
 
     def clear_oauth_data(self):
         self.reddit.clear_authentication()
         self.config.delete_refresh_token()
+        self.config.delete_access_token()
 
-    @gen.coroutine
-    def _async_open_browser(self, url):
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            yield executor.submit(self.term.open_browser, url)
-        ioloop.IOLoop.current().stop()
\ No newline at end of file
+    def _cache_access_token(self, info, expires):
+
+        self.config.access_token = {
+            'access_token': info['access_token'],
+            'expires': expires,
+            'scope': info['scope'],
+            'user': self.reddit.user.name}
+        if self.config['persistent']:
+            self.config.save_access_token()
+
+    def _set_access_credentials(self, token):
+        """
+        Log in with an access token without making any requests. The user's
+        account is only loaded from reddit when it is first needed.
+        """
+
+        self.reddit.set_access_credentials(
+            token['scope'], token['access_token'], self.config.refresh_token,
+            update_user=False)
+        self.reddit.user = praw.objects.LoggedInRedditor(
+            self.reddit, user_name=token['user'])
\ No newline at end of file
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from tornado import gen, ioloop, web
+from concurrent.futures import ThreadPoolExecutor
+
+
+class OAuthHandler(web.RequestHandler):
+    """
+    Intercepts the redirect that Reddit sends the user to after they verify or
+    deny the application access.
+
+    The GET should supply 3 request params:
+        state: Unique id that was supplied by us at the beginning of the
+               process to verify that the session matches.
+        code: Code that we can use to generate the refresh token.
+        error: If an error occurred, it will be placed here.
+    """
+
+    def initialize(self, display=None, params=None):
+        self.display = display
+        self.params = params
+
+    def get(self):
+        self.params['state'] = self.get_argument('state', default=None)
+        self.params['code'] = self.get_argument('code', default=None)
+        self.params['error'] = self.get_argument('error', default=None)
+
+        self.render('index.html', **self.params)
+
+        complete = self.params['state'] and self.params['code']
+        if complete or self.params['error']:
+            # Stop IOLoop if using a background browser such as firefox
+            if self.display:
+                ioloop.IOLoop.current().stop()
+
+
+def build_callback_app(display, params, template_path):
+    "Build the Tornado webapp that receives the authorization callback"
+
+    kwargs = {'display': display, 'params': params}
+    routes = [('/', OAuthHandler, kwargs)]
+    return web.Application(routes, template_path=template_path)
+
+
+@gen.coroutine
+def open_browser_async(term, url):
+    "Open the browser in a worker thread and stop the IOLoop once it closes"
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield executor.submit(term.open_browser, url)
+    ioloop.IOLoop.current().stop()
@@ -2,7 +2,9 @@
 from __future__ import unicode_literals
 
 import os
+import re
 import time
+import heapq
 import curses
 import signal
 import inspect
@@ -14,12 +16,43 @@ from contextlib import contextmanager
 import six
 import praw
 import requests
+from six.moves.urllib.parse import urlparse
 
 from . import exceptions
 
 _logger = logging.getLogger(__name__)
 
 
+def build_reddit(config, user_agent, handler=None):
+    """
+    Create a PRAW session. If the `api_url` option is set, every request is
+    sent to that server instead of reddit, e.g. the fake reddit server in
+    scripts/fake_reddit.py that is used for load testing.
+    """
+
+    kwargs = {}
+    if config['api_request_delay'] is not None:
+        kwargs['api_request_delay'] = config['api_request_delay']
+
+    reddit = praw.Reddit(
+        user_agent=user_agent,
+        handler=handler,
+        decode_html_entities=False,
+        disable_update_check=True,
+        **kwargs)
+
+    if config['api_url']:
+        # PRAW always uses https for these, so they can't be set through
+        # its own config options
+        url = config['api_url'].rstrip('/')
+        reddit.config.api_url = url
+        reddit.config.permalink_url = url
+        reddit.config.oauth_url = url
+        # Requests are rate limited per domain
+        reddit.config.domain = urlparse(url).netloc
+    return reddit
+
+
 @contextmanager
 def curses_session():
     """
@@ -114,6 +147,8 @@ class LoadScreen(object):
         (exceptions.SubscriptionError, 'No Subscriptions'),
         (exceptions.AccountError, 'Unable to Access Account'),
         (exceptions.SubredditError, 'Invalid Subreddit'),
+        (exceptions.SubmissionError, 'Invalid Submission'),
+        (exceptions.SearchError, 'No Matches'),
         (praw.errors.InvalidSubreddit, 'Invalid Subreddit'),
         (praw.errors.InvalidComment, 'Invalid Comment'),
         (praw.errors.InvalidSubmission, 'Invalid Submission'),
@@ -313,16 +348,17 @@ class Navigator(object):
 
     def __init__(
             self,
-            valid_page_cb,
+            exists_cb,
             page_index=0,
             cursor_index=0,
             inverted=False):
         """
         Params:
-            valid_page_callback (func): This function, usually `Content.get`,
-                takes a page index and raises an IndexError if that index falls
-                out of bounds. This is used to determine the upper and lower
-                bounds of the page, i.e. when to stop scrolling.
+            exists_cb (func): This function, usually `Content.exists`, takes
+                a page index and returns False if that index falls out of
+                bounds. This is used to determine the upper and lower bounds
+                of the page, i.e. when to stop scrolling. It's called often,
+                so it shouldn't do any more work than it needs to.
             page_index (int): Initial page index.
             cursor_index (int): Initial cursor index, relative to the page.
             inverted (bool): Whether the page scrolling is reversed of not.
@@ -337,7 +373,7 @@ class Navigator(object):
         self.page_index = page_index
         self.cursor_index = cursor_index
         self.inverted = inverted
-        self._page_cb = valid_page_cb
+        self._exists = exists_cb
 
     @property
     def step(self):
@@ -380,7 +416,7 @@ class Navigator(object):
 
         if forward:
             if self.page_index < 0:
-                if self._is_valid(0):
+                if self._exists(0):
                     # Special case - advance the page index if less than zero
                     self.page_index = 0
                     self.cursor_index = 0
@@ -389,7 +425,7 @@ class Navigator(object):
                     valid = False
             else:
                 self.cursor_index += 1
-                if not self._is_valid(self.absolute_index):
+                if not self._exists(self.absolute_index):
                     # Move would take us out of bounds
                     self.cursor_index -= 1
                     valid = False
@@ -403,7 +439,7 @@ class Navigator(object):
                 self.cursor_index -= 1
             else:
                 self.page_index -= self.step
-                if self._is_valid(self.absolute_index):
+                if self._exists(self.absolute_index):
                     # We have reached the beginning of the page - move the
                     # index
                     redraw = True
@@ -440,7 +476,7 @@ class Navigator(object):
                 self.inverted = False
 
                 # not submission mode: starting index is 0
-                if not self._is_valid(self.absolute_index):
+                if not self._exists(self.absolute_index):
                     self.page_index = 0
                 valid = True
             else:
@@ -452,24 +488,51 @@ class Navigator(object):
                     self.cursor_index \
                         = (n_windows-(direction < 0)) - self.cursor_index
 
-                valid = False
-                adj = 0
-                # check if reached the bottom
-                while not valid:
-                    n_move = n_windows - adj
-                    if n_move == 0:
-                        break
-
-                    self.page_index += n_move * direction
-                    valid = self._is_valid(self.absolute_index)
-                    if not valid:
-                        self.page_index -= n_move * direction
-                        adj += 1
+                # Move a whole page, or if that would go past the bottom,
+                # bisect for the furthest move that still lands on an item
+                index = self.absolute_index
+                if self._exists(index + n_windows * direction):
+                    n_move = n_windows
+                else:
+                    n_move, hi = 0, n_windows - 1
+                    while n_move < hi:
+                        mid = (n_move + hi + 1) // 2
+                        if self._exists(index + mid * direction):
+                            n_move = mid
+                        else:
+                            hi = mid - 1
+                self.page_index += n_move * direction
+                valid = n_move > 0
 
             redraw = True
 
         return valid, redraw
 
+    def jump(self, index, inverted=False):
+        """
+        Move the cursor straight to the given index, without stepping through
+        the items in between.
+
+        Params:
+            index (int): The index of the item to select.
+            inverted (bool): If false, the item is drawn at the top of the
+                screen. If true, it's drawn at the bottom of the screen with
+                the items before it above.
+
+        Returns:
+            valid (bool): Indicates whether or not the index exists.
+            redraw (bool): Indicates whether or not the screen needs to be
+                redrawn.
+        """
+
+        if not self._exists(index):
+            return False, False
+
+        self.page_index = index
+        self.cursor_index = 0
+        self.inverted = inverted
+        return True, True
+
     def flip(self, n_windows):
         """
         Flip the orientation of the page.
@@ -480,17 +543,155 @@ class Navigator(object):
         self.cursor_index = n_windows
         self.inverted = not self.inverted
 
-    def _is_valid(self, page_index):
+
+class Poller(object):
+    """
+    Schedules a periodic task that is run while the page is waiting for input.
+
+    The callback should return True if it found something new. The polling
+    interval is reset to `min_interval` whenever the callback finds new data,
+    and backs off by `factor` (up to `max_interval`) each time it comes up
+    empty.
+
+    >>> poller = Poller(self.check_for_updates, 10, 300)
+    >>> if poller.due:
+    >>>     poller.poll()
+    """
+
+    def __init__(self, callback, min_interval, max_interval=None, factor=2.0):
         """
-        Check if a page index will cause entries to fall outside valid range.
+        Params:
+            callback (func): Function that will be run on each poll. Returns
+                True if new data was found.
+            min_interval (float): Shortest time between polls, in seconds.
+            max_interval (float): Longest time between polls, in seconds.
+                Defaults to `min_interval`, which disables the back off.
+            factor (float): Multiplier applied to the interval after each
+                poll that doesn't find anything new.
         """
 
-        try:
-            self._page_cb(page_index)
-        except IndexError:
-            return False
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval or min_interval, min_interval)
+        self.factor = factor
+        self.interval = min_interval
+        self.next_poll = time.time() + self.interval
+        self._callback = callback
+
+    @property
+    def timeout(self):
+        """
+        Return the number of seconds until the next poll is due.
+        """
+
+        return max(self.next_poll - time.time(), 0)
+
+    @property
+    def due(self):
+        return self.timeout == 0
+
+    def poll(self):
+        """
+        Run the callback and schedule the next poll.
+        """
+
+        if self._callback():
+            self.interval = self.min_interval
         else:
-            return True
+            self.interval = min(self.interval * self.factor, self.max_interval)
+        self.next_poll = time.time() + self.interval
+
+    def reset(self):
+        """
+        Drop back to the shortest interval and restart the countdown.
+        """
+
+        self.interval = self.min_interval
+        self.next_poll = time.time() + self.interval
+
+
+class Completer(object):
+    """
+    Ranked completions for a list of names, e.g. subreddits.
+
+    Names are added in order of preference. Every node of a prefix trie keeps
+    the first `limit` names below it, so a prefix is completed by walking one
+    node per character no matter how many names there are. When there aren't
+    enough names with the prefix, the list is topped up with fuzzy matches,
+    i.e. names that contain the typed characters in order. Matches where the
+    characters are closest together come first.
+
+    >>> completer = Completer(['python', 'linux', 'pics'])
+    >>> completer.complete('py')
+    ['python']
+    >>> completer.complete('pis')
+    ['pics']
+    """
+
+    def __init__(self, names=(), limit=10):
+
+        self.limit = limit
+        self._names = []
+        self._keys = []
+        self._added = set()
+        # Each node maps a character to the next node, and None to the best
+        # names below it
+        self._root = {None: []}
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name):
+        """
+        Add a name with a lower priority than every name added before it.
+        Names that have already been added are ignored, regardless of case.
+        """
+
+        key = name.lower()
+        if key in self._added:
+            return
+        self._added.add(key)
+        self._names.append(name)
+        self._keys.append(key)
+
+        node = self._root
+        if len(node[None]) < self.limit:
+            node[None].append(name)
+        for char in key:
+            node = node.setdefault(char, {None: []})
+            if len(node[None]) < self.limit:
+                node[None].append(name)
+
+    def complete(self, text):
+        """
+        Return up to `limit` names that match the text, ignoring case. An
+        empty string matches the first names that were added.
+        """
+
+        key = text.lower()
+        node = self._root
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                break
+        matches = list(node[None]) if node is not None else []
+        if len(matches) >= self.limit or not key:
+            return matches
+
+        # Skipping with [^c]* instead of .*? finds the same matches without
+        # backtracking
+        found = set(matches)
+        pattern = re.compile(re.escape(key[0]) + ''.join(
+            '[^{0}]*{0}'.format(re.escape(char)) for char in key[1:]))
+        fuzzy = []
+        for rank, name_key in enumerate(self._keys):
+            match = pattern.search(name_key)
+            if match and self._names[rank] not in found:
+                fuzzy.append((match.end() - match.start(), rank))
+        for _, rank in heapq.nsmallest(self.limit - len(matches), fuzzy):
+            matches.append(self._names[rank])
+        return matches
 
 
 class Controller(object):
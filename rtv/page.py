@@ -4,12 +4,14 @@ from __future__ import unicode_literals
 import sys
 import time
 import curses
-from functools import wraps
+from functools import wraps, partial
+from itertools import chain
 
 from kitchen.text.display import textual_width
 
 from . import docs
-from .objects import Controller, Color
+from .content import Content, PRAWSource, LocalSource
+from .objects import Controller, Color, Poller
 
 
 def logged_in(f):
@@ -40,12 +42,26 @@ class Page(object):
         self.content = None
         self.nav = None
         self.controller = None
+        self.pollers = {}
+
+        if config['local_dir']:
+            self.source = LocalSource(config['local_dir'], reddit)
+        else:
+            self.source = PRAWSource(reddit)
 
         self.active = True
         self._header_window = None
         self._content_window = None
         self._subwindows = None
 
+        self._watch_access_token()
+
+        # Scores and votes can't be refreshed without a connection to reddit
+        offline = self.config['offline'] or self.config['local_dir']
+        if self.config['refresh_interval'] and not offline:
+            self.pollers['refresh'] = Poller(
+                self.refresh_visible_items, self.config['refresh_interval'])
+
     def refresh_content(self, order=None):
         raise NotImplementedError
 
@@ -53,6 +69,13 @@ class Page(object):
     def _draw_item(window, data, inverted):
         raise NotImplementedError
 
+    def _record_items(self, items):
+        """
+        Add the items that were drawn to the full text index. Pages that don't
+        show reddit content don't record anything.
+        """
+        pass
+
     def loop(self):
         """
         Main control loop runs the following steps:
@@ -61,14 +84,40 @@ class Page(object):
             3. Trigger the method registered to the input key
 
         The loop will run until self.active is set to False from within one of
-        the methods.
+        the methods. If any pollers are registered, waiting for a key will time
+        out when the next poll is due, and the poll is run instead.
         """
 
         self.active = True
         while self.active:
             self.draw()
-            ch = self.term.stdscr.getch()
-            self.controller.trigger(ch)
+            ch = self.get_input()
+            if ch == -1:
+                self.run_pollers()
+            else:
+                self.controller.trigger(ch)
+
+    def get_input(self):
+        """
+        Block until a key is pressed, or until the next poller is due. Returns
+        -1 if no key was pressed.
+        """
+
+        if not self.pollers:
+            return self.term.stdscr.getch()
+
+        timeout = min(poller.timeout for poller in self.pollers.values())
+        self.term.stdscr.timeout(int(timeout * 1000))
+        try:
+            return self.term.stdscr.getch()
+        finally:
+            self.term.stdscr.timeout(-1)
+
+    def run_pollers(self):
+        # Copy the list because a poller is allowed to un-register itself
+        for poller in list(self.pollers.values()):
+            if poller.due:
+                poller.poll()
 
     @PageController.register('q')
     def exit(self):
@@ -123,6 +172,49 @@ class Page(object):
         self._move_page(1)
         self.clear_input_queue()
 
+    @PageController.register('g', curses.KEY_HOME)
+    def move_top(self):
+        self._jump(self.content.first_index)
+
+    @PageController.register('G', curses.KEY_END)
+    def move_bottom(self):
+        # Only goes as far as what has been loaded, a subreddit could go on
+        # for a long time
+        first, last = self.content.first_index, self.content.last_index
+        n_rows, n_cols = self._content_window.getmaxyx()
+        # Leave out the blank line after the last item
+        total = self.content.rows.total(n_cols - 2) - 1
+        if last > first and total > n_rows:
+            self._jump(last, inverted=True)
+            return
+
+        # Everything fits on the screen, so keep the top of the page in place
+        # and only move the cursor
+        self._remove_cursor()
+        self.nav.jump(first)
+        self.nav.cursor_index = last - first
+        self._draw_content()
+        self._add_cursor()
+
+    @PageController.register('%')
+    def move_percent(self):
+        text = self.term.prompt_input('Jump to percent: ')
+        if not text:
+            return
+        try:
+            percent = float(text.strip().rstrip('%'))
+        except ValueError:
+            self.term.show_notification('Invalid percent "{0}"'.format(text))
+            return
+
+        # The position is measured in rows, so a long comment counts for more
+        # than a short one, like a scrollbar
+        _, n_cols = self._content_window.getmaxyx()
+        percent = min(max(percent, 0), 100)
+        total = self.content.rows.total(n_cols - 2)
+        row = int(total * percent / 100)
+        self._jump(self.content.rows.find(row, n_cols - 2))
+
     @PageController.register('a')
     @logged_in
     def upvote(self):
@@ -131,12 +223,12 @@ class Page(object):
             self.term.flash()
         elif data['likes']:
             with self.term.loader():
-                data['object'].clear_vote()
+                self.content.get_praw_object(data).clear_vote()
             if not self.term.loader.exception:
                 data['likes'] = None
         else:
             with self.term.loader():
-                data['object'].upvote()
+                self.content.get_praw_object(data).upvote()
             if not self.term.loader.exception:
                 data['likes'] = True
 
@@ -148,12 +240,12 @@ class Page(object):
             self.term.flash()
         elif data['likes'] or data['likes'] is None:
             with self.term.loader():
-                data['object'].downvote()
+                self.content.get_praw_object(data).downvote()
             if not self.term.loader.exception:
                 data['likes'] = False
         else:
             with self.term.loader():
-                data['object'].clear_vote()
+                self.content.get_praw_object(data).clear_vote()
             if not self.term.loader.exception:
                 data['likes'] = None
 
@@ -170,6 +262,22 @@ class Page(object):
                 self.term.show_notification('Logged out')
         else:
             self.oauth.authorize()
+        self._watch_access_token()
+
+    def _watch_access_token(self):
+        """
+        Renew the access token in the background before it expires. There's
+        nothing to renew when logged out, and no connection to renew it with
+        when browsing offline.
+        """
+
+        offline = self.config['offline'] or self.config['local_dir']
+        if self.config.refresh_token and not offline:
+            if 'oauth' not in self.pollers:
+                self.pollers['oauth'] = Poller(
+                    partial(self.oauth.refresh_access_token, force=False), 60)
+        else:
+            self.pollers.pop('oauth', None)
 
     @PageController.register('d')
     @logged_in
@@ -189,7 +297,7 @@ class Page(object):
             return
 
         with self.term.loader(message='Deleting', delay=0):
-            data['object'].delete()
+            self.content.get_praw_object(data).delete()
             # Give reddit time to process the request
             time.sleep(2.0)
         if self.term.loader.exception is None:
@@ -225,7 +333,7 @@ class Page(object):
             return
 
         with self.term.loader(message='Editing', delay=0):
-            data['object'].edit(text)
+            self.content.get_praw_object(data).edit(text)
             time.sleep(2.0)
         if self.term.loader.exception is None:
             self.refresh_content()
@@ -241,6 +349,46 @@ class Page(object):
         message = 'New Messages' if inbox > 0 else 'No New Messages'
         self.term.show_notification(message)
 
+    def refresh_visible_items(self):
+        """
+        Update the scores, comment counts and votes of the items that are on
+        the screen, along with one screen of items in either direction. Items
+        are looked up by fullname in batches of 100, so this usually only
+        costs a single request.
+
+        Returns True if any items were updated.
+        """
+
+        if not self._subwindows:
+            return False
+
+        n_windows = len(self._subwindows)
+        first = self.nav.page_index
+        last = self.nav.page_index + self.nav.step * (n_windows - 1)
+        start, stop = min(first, last) - n_windows, max(first, last) + n_windows
+
+        items = {}
+        for index in range(start, stop + 1):
+            data = self.content.peek(index)
+            if data and data['type'] in ('Submission', 'Comment'):
+                items[data['name']] = data
+        if not items:
+            return False
+
+        fullnames = list(items)
+        things = []
+        with self.term.loader(delay=2):
+            for i in range(0, len(fullnames), 100):
+                batch = fullnames[i:i + 100]
+                things.extend(self.reddit.get_info(thing_id=batch) or [])
+        if self.term.loader.exception:
+            return False
+
+        for thing in things:
+            if thing.fullname in items:
+                Content.refresh_praw_data(items[thing.fullname], thing)
+        return bool(things)
+
     def clear_input_queue(self):
         """
         Clear excessive input caused by the scroll wheel or holding down a key
@@ -306,36 +454,58 @@ class Page(object):
         self._subwindows = []
 
         page_index, cursor_index, inverted = self.nav.position
-        step = self.nav.step
+        items = self.content.iterate(page_index, self.nav.step, n_cols - 2)
+        layout, full = self._layout(items, n_rows, inverted)
+        if inverted and not full and layout:
+            # If the page is not full we need to make sure that it is NOT
+            # inverted. The items that were already laid out are re-used, and
+            # the page is filled in with the items below them.
+            self.nav.flip(len(layout) - 1)
+            items = chain(
+                reversed([data for data, _, _ in layout]),
+                self.content.iterate(page_index + 1, 1, n_cols - 2))
+            layout, _ = self._layout(items, n_rows, inverted=False)
+
+        for data, start, window_rows in layout:
+            subwindow = self._content_window.derwin(
+                window_rows, n_cols - data['offset'], start, data['offset'])
+            attr = self._draw_item(subwindow, data, self.nav.inverted)
+            self._subwindows.append((subwindow, attr))
+
+        if self.config.fulltext is not None:
+            self._record_items([data for data, _, _ in layout])
+
+        self._content_window.refresh()
+
+    @staticmethod
+    def _layout(items, n_rows, inverted):
+        """
+        Work out where each item goes on the screen before anything is drawn,
+        so that every frame is only drawn once.
+
+        If not inverted, align the first item with the top and lay out
+        downwards. If inverted, align the first item with the bottom and lay
+        out upwards.
 
-        # If not inverted, align the first submission with the top and draw
-        # downwards. If inverted, align the first submission with the bottom
-        # and draw upwards.
+        Returns:
+            layout (list): (data, start_row, n_rows) of each item that fits
+                on the screen, in the order that they were given.
+            full (bool): Whether or not the items fill up the screen.
+        """
+
+        layout = []
+        step = -1 if inverted else 1
         current_row = (n_rows - 1) if inverted else 0
         available_rows = (n_rows - 1) if inverted else n_rows
-        for data in self.content.iterate(page_index, step, n_cols - 2):
+        for data in items:
             window_rows = min(available_rows, data['n_rows'])
-            window_cols = n_cols - data['offset']
             start = current_row - window_rows if inverted else current_row
-            subwindow = self._content_window.derwin(
-                window_rows, window_cols, start, data['offset'])
-            attr = self._draw_item(subwindow, data, inverted)
-            self._subwindows.append((subwindow, attr))
+            layout.append((data, start, window_rows))
             available_rows -= (window_rows + 1)  # Add one for the blank line
             current_row += step * (window_rows + 1)
             if available_rows <= 0:
-                break
-        else:
-            # If the page is not full we need to make sure that it is NOT
-            # inverted. Unfortunately, this currently means drawing the whole
-            # page over again. Could not think of a better way to pre-determine
-            # if the content will fill up the page, given that it is dependent
-            # on the size of the terminal.
-            if self.nav.inverted:
-                self.nav.flip((len(self._subwindows) - 1))
-                self._draw_content()
-
-        self._content_window.refresh()
+                return layout, True
+        return layout, False
 
     def _add_cursor(self):
         self._edit_cursor(curses.A_REVERSE)
@@ -365,6 +535,15 @@ class Page(object):
         self._draw_content()
         self._add_cursor()
 
+    def _jump(self, index, inverted=False):
+        self._remove_cursor()
+        valid, redraw = self.nav.jump(index, inverted)
+        if not valid:
+            self.term.flash()
+
+        self._draw_content()
+        self._add_cursor()
+
     def _edit_cursor(self, attribute):
 
         # Don't allow the cursor to go below page index 0
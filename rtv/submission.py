@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import os
 import time
 import curses
 
 from . import docs
-from .content import SubmissionContent
+from .content import SubmissionContent, ArchiveContent
 from .page import Page, PageController, logged_in
-from .objects import Navigator, Color
+from .objects import Navigator, Color, Poller
 from .terminal import Terminal
 
 
@@ -20,14 +21,22 @@ class SubmissionPage(Page):
     def __init__(self, reddit, term, config, oauth, url=None, submission=None):
         super(SubmissionPage, self).__init__(reddit, term, config, oauth)
 
-        if url:
-            self.content = SubmissionContent.from_url(reddit, url, term.loader)
+        if url and os.path.isfile(os.path.expanduser(url)):
+            # The url can also point to a thread that was saved with `w`
+            self.content = ArchiveContent(
+                reddit, os.path.expanduser(url), term.loader)
+        elif url:
+            self.content = SubmissionContent.from_url(
+                reddit, url, term.loader, source=self.source)
         else:
             self.content = SubmissionContent(submission, term.loader)
 
         self.controller = SubmissionController(self)
         # Start at the submission post, which is indexed as -1
-        self.nav = Navigator(self.content.get, page_index=-1)
+        self.nav = Navigator(self.content.exists, page_index=-1)
+        self._search_query = None
+
+        self._index_comments()
 
     @SubmissionController.register(curses.KEY_RIGHT, 'l', ' ')
     def toggle_comment(self):
@@ -35,6 +44,7 @@ class SubmissionPage(Page):
 
         current_index = self.nav.absolute_index
         self.content.toggle(current_index)
+        self._index_comments()
         if self.nav.inverted:
             # Reset the navigator so that the cursor is at the bottom of the
             # page. This is a workaround to handle if folding the comment
@@ -47,6 +57,152 @@ class SubmissionPage(Page):
 
         self.active = False
 
+    # The comments that have been loaded are sorted without downloading them
+    # again, refresh the page to get reddit's version of the order
+    @SubmissionController.register('1')
+    def sort_content_hot(self):
+        self._sort_comments(None)
+
+    @SubmissionController.register('2')
+    def sort_content_top(self):
+        self._sort_comments('top')
+
+    @SubmissionController.register('3')
+    def sort_content_old(self):
+        self._sort_comments('old')
+
+    @SubmissionController.register('4')
+    def sort_content_new(self):
+        self._sort_comments('new')
+
+    @SubmissionController.register('5')
+    def sort_content_controversial(self):
+        self._sort_comments('controversial')
+
+    def _sort_comments(self, order):
+        self._reset_nav(self.content.sort(order, self.nav.absolute_index))
+        self._index_comments()
+
+    @SubmissionController.register('/')
+    def search(self):
+        "Search the comments, moving to the first match as the query is typed"
+
+        start = self.content.position(self.nav.absolute_index)
+        selected = self.content.peek(self.nav.absolute_index)
+
+        def update(query):
+            # The first match at or after the cursor
+            self._show_match(self.content.search.find(query, start))
+
+        query = self.term.prompt_input('Search: ', callback=update)
+        if query is None:
+            # Cancelled, go back to where the search started
+            index = self.content.reveal(selected and selected.get('name'))
+            self._jump(-1 if index is None else index)
+        elif query:
+            self._search_query = query
+            if self.content.search.find(query) is None:
+                self.term.show_notification('No matches')
+            else:
+                update(query)
+
+    @SubmissionController.register(']')
+    def next_match(self):
+        "Move to the next comment that matches the last search"
+
+        position = self.content.position(self.nav.absolute_index)
+        self._show_match(self.content.search.find(
+            self._search_query or '', position + 1))
+
+    @SubmissionController.register('[')
+    def previous_match(self):
+        "Move to the previous comment that matches the last search"
+
+        position = self.content.position(self.nav.absolute_index)
+        self._show_match(self.content.search.find(
+            self._search_query or '', position, reverse=True))
+
+    def _show_match(self, position):
+
+        if position is None:
+            self.term.flash()
+            return
+
+        # Unfold the comments that the match is hidden inside of
+        index = self.content.reveal(self.content.search[position])
+        self._jump(-1 if index is None else index)
+
+    def _index_comments(self):
+        "Index the comments for searching while waiting for input"
+
+        if self.content.index_in_background and not self.content.search.complete:
+            self.pollers['search'] = Poller(self._build_search_index, 0.01, 1)
+
+    def _build_search_index(self):
+        built = self.content.search.build(limit=500)
+        if self.content.search.complete:
+            # Otherwise the page would keep redrawing once a second
+            self.pollers.pop('search', None)
+        return built
+
+    @SubmissionController.register('-')
+    def collapse_level(self):
+        "Fold every comment on the same level as the selected comment"
+
+        index = self.nav.absolute_index
+        level = self.content.peek(index)['level'] if index >= 0 else 0
+        self._reset_nav(self.content.collapse(level, index))
+
+    @SubmissionController.register('_')
+    def collapse_all(self):
+        "Fold every top level comment"
+
+        self._reset_nav(self.content.collapse(0, self.nav.absolute_index))
+
+    @SubmissionController.register('+', '=')
+    def expand_all(self):
+        "Unfold every hidden comment"
+
+        self._reset_nav(self.content.expand_all(self.nav.absolute_index))
+
+    def _reset_nav(self, index):
+        # If the items above the cursor have moved, start the page from the
+        # selected item
+        if index != self.nav.absolute_index or self.nav.inverted:
+            self.nav.jump(index)
+
+    @SubmissionController.register('p')
+    def move_parent(self):
+        "Move the cursor to the parent of the selected comment"
+
+        self._jump_tree(self.content.tree.parent)
+
+    @SubmissionController.register('J')
+    def move_next_sibling(self):
+        "Move the cursor past the replies to the next comment on this level"
+
+        self._jump_tree(self.content.tree.next_sibling)
+
+    @SubmissionController.register('K')
+    def move_previous_sibling(self):
+        "Move the cursor to the previous comment on this level"
+
+        self._jump_tree(self.content.tree.previous_sibling)
+
+    @SubmissionController.register('T')
+    def move_next_top(self):
+        "Move the cursor to the next top level comment"
+
+        self._jump_tree(self.content.tree.next_top)
+
+    def _jump_tree(self, find):
+
+        index = find(self.nav.absolute_index)
+        if index is None:
+            self.term.flash()
+        else:
+            self._jump(index)
+
     @SubmissionController.register(curses.KEY_F5, 'r')
     def refresh_content(self, order=None):
         "Re-download comments and reset the page index"
@@ -56,9 +212,67 @@ class SubmissionPage(Page):
 
         with self.term.loader():
             self.content = SubmissionContent.from_url(
-                self.reddit, url, self.term.loader, order=order)
+                self.reddit, url, self.term.loader, order=order,
+                source=self.source)
         if not self.term.loader.exception:
-            self.nav = Navigator(self.content.get, page_index=-1)
+            self.nav = Navigator(self.content.exists, page_index=-1)
+            self._index_comments()
+            if 'follow' in self.pollers:
+                self.pollers['follow'].reset()
+
+    @SubmissionController.register('F')
+    def toggle_follow(self):
+        "Toggle polling the thread for new comments"
+
+        if 'follow' in self.pollers:
+            del self.pollers['follow']
+            self.term.show_notification('Stopped following')
+            return
+
+        self.pollers['follow'] = Poller(
+            self._follow_new_comments,
+            self.config['follow_interval'],
+            self.config['follow_max_interval'])
+        self.term.show_notification('Following new comments')
+
+    def _follow_new_comments(self):
+        "Insert newly posted comments without moving the cursor"
+
+        with self.term.loader(delay=2):
+            inserted = self.content.fetch_newer()
+        if self.term.loader.exception:
+            return False
+        # Replies to folded comments are indexed without being inserted
+        self._index_comments()
+        if self.content.missed_comments:
+            self.term.show_notification(
+                'Some new comments were missed, press `r` to reload')
+        if not inserted:
+            return False
+
+        # Keep the cursor on the same item by shifting the page by the number
+        # of comments that were inserted above it
+        index = self.nav.absolute_index
+        if index >= 0:
+            original = index
+            for insert_index in inserted:
+                if insert_index <= index:
+                    index += 1
+            self.nav.page_index += index - original
+        return True
+
+    @SubmissionController.register('w')
+    def save_thread(self):
+        "Save the thread and the comments that have been loaded to a file"
+
+        name = self.content.peek(-1)['name']
+        filename = os.path.join(self.config.archive_dir, name + '.jsonl')
+        try:
+            self.content.save(filename)
+        except (IOError, OSError):
+            self.term.show_notification('Could not save thread')
+        else:
+            self.term.show_notification('Saved to {0}'.format(filename))
 
     @SubmissionController.register(curses.KEY_ENTER, Terminal.RETURN, 'o')
     def open_link(self):
@@ -85,10 +299,10 @@ class SubmissionPage(Page):
         data = self.content.get(self.nav.absolute_index)
         if data['type'] == 'Submission':
             body = data['text']
-            reply = data['object'].add_comment
+            reply = self.content.get_praw_object(data).add_comment
         elif data['type'] == 'Comment':
             body = data['body']
-            reply = data['object'].reply
+            reply = self.content.get_praw_object(data).reply
         else:
             self.term.flash()
             return
@@ -124,6 +338,12 @@ class SubmissionPage(Page):
         else:
             self.term.flash()
 
+    def _record_items(self, items):
+
+        submission_data = self.content.peek(-1)
+        for data in items:
+            self.config.fulltext.add(data, submission_data)
+
     def _draw_item(self, win, data, inverted=False):
 
         if data['type'] == 'MoreComments':
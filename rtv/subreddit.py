@@ -9,9 +9,10 @@ import six
 from . import docs
 from .content import SubredditContent
 from .page import Page, PageController, logged_in
-from .objects import Navigator, Color
+from .objects import Navigator, Color, Poller, Completer
 from .submission import SubmissionPage
 from .subscription import SubscriptionPage
+from .browsed import BrowsedPage
 from .terminal import Terminal
 
 
@@ -29,9 +30,12 @@ class SubredditPage(Page):
         """
         super(SubredditPage, self).__init__(reddit, term, config, oauth)
 
-        self.content = SubredditContent.from_name(reddit, name, term.loader)
+        self.content = SubredditContent.from_name(
+            reddit, name, term.loader, window_size=config['subreddit_window'],
+            source=self.source)
         self.controller = SubredditController(self)
-        self.nav = Navigator(self.content.get)
+        self.nav = Navigator(self.content.exists)
+        self.config.subreddits.visit(self.content.name)
 
         if url:
             self.open_submission(url=url)
@@ -40,6 +44,7 @@ class SubredditPage(Page):
     def refresh_content(self, name=None, order=None):
         "Re-download all submissions and reset the page index"
 
+        followed = self.content.name
         name = name or self.content.name
         order = order or self.content.order
 
@@ -50,14 +55,73 @@ class SubredditPage(Page):
 
         with self.term.loader():
             self.content = SubredditContent.from_name(
-                self.reddit, name, self.term.loader, order=order)
+                self.reddit, name, self.term.loader, order=order,
+                window_size=self.config['subreddit_window'],
+                source=self.source)
         if not self.term.loader.exception:
-            self.nav = Navigator(self.content.get)
+            self.nav = Navigator(self.content.exists)
+            self.config.subreddits.visit(self.content.name)
+            self._update_follow(followed)
+
+    @SubredditController.register('F')
+    def toggle_follow(self):
+        "Toggle polling the listing for new submissions"
+
+        if 'follow' in self.pollers:
+            del self.pollers['follow']
+            self.term.show_notification('Stopped following')
+            return
+
+        if not self.content.can_fetch_newer:
+            self.term.flash()
+            return
+
+        if self.content.order != 'new':
+            self.refresh_content(order='new')
+            if self.term.loader.exception:
+                return
+
+        self.pollers['follow'] = Poller(
+            self._follow_new_submissions,
+            self.config['follow_interval'],
+            self.config['follow_max_interval'])
+        self.term.show_notification('Following {0}'.format(self.content.name))
+
+    def _update_follow(self, followed):
+        """
+        Called after the listing has been replaced. Keep following if it's
+        still the newest submissions in the listing that was being followed,
+        otherwise stop.
+        """
+
+        if 'follow' not in self.pollers:
+            return
+
+        content = self.content
+        if (content.name == followed and content.order == 'new' and
+                content.can_fetch_newer):
+            self.pollers['follow'].reset()
+        else:
+            del self.pollers['follow']
+            self.term.show_notification('Stopped following')
+
+    def _follow_new_submissions(self):
+        "Insert newly posted submissions without moving the cursor"
+
+        with self.term.loader(delay=2):
+            count = self.content.fetch_newer()
+        if self.term.loader.exception or not count:
+            return False
+
+        # Shift the page so that the same submissions stay on the screen
+        self.nav.page_index += count
+        return True
 
     @SubredditController.register('f')
     def search_subreddit(self, name=None):
         "Open a prompt to search the given subreddit"
 
+        followed = self.content.name
         name = name or self.content.name
 
         query = self.term.prompt_input('Search {0}:'.format(name))
@@ -66,18 +130,64 @@ class SubredditPage(Page):
 
         with self.term.loader():
             self.content = SubredditContent.from_name(
-                self.reddit, name, self.term.loader, query=query)
+                self.reddit, name, self.term.loader, query=query,
+                window_size=self.config['subreddit_window'],
+                source=self.source)
         if not self.term.loader.exception:
-            self.nav = Navigator(self.content.get)
+            self.nav = Navigator(self.content.exists)
+            self._update_follow(followed)
 
     @SubredditController.register('/')
     def prompt_subreddit(self):
         "Open a prompt to navigate to a different subreddit"
 
-        name = self.term.prompt_input('Enter Subreddit: /r/')
+        # Completions come from the subreddits that were visited recently and
+        # the saved subscriptions, so nothing is downloaded while typing
+        user = self.reddit.user.name if self.reddit.user else None
+        completer = Completer(self.config.subreddits.names(user))
+        completer.add('front')
+
+        def complete(text):
+            # Don't complete the order in e.g. python/new
+            if '/' in text:
+                return []
+            return completer.complete(text)
+
+        def update(text):
+            self._draw_content()
+            self._add_cursor()
+            self._draw_completions(complete(text))
+
+        def complete_first(text):
+            matches = complete(text)
+            return matches[0] if matches else None
+
+        update('')
+        name = self.term.prompt_input(
+            'Enter Subreddit: /r/', callback=update, complete=complete_first)
         if name is not None:
             self.refresh_content(name=name, order='ignore')
 
+    def _draw_completions(self, names):
+        """
+        List the names above the prompt on the bottom line, with the one that
+        tab will complete highlighted.
+        """
+
+        n_rows, n_cols = self.term.stdscr.getmaxyx()
+        names = ['/r/{0}'.format(name) for name in names[:n_rows - 2]]
+        if not names:
+            return
+
+        width = min(max(len(name) for name in names) + 2, n_cols)
+        window = self.term.stdscr.derwin(
+            len(names), width, n_rows - 1 - len(names), 0)
+        window.erase()
+        for row, name in enumerate(names):
+            attr = curses.A_REVERSE if row == 0 else Color.YELLOW
+            self.term.add_line(window, name, row, 1, curses.A_BOLD | attr)
+        window.refresh()
+
     @SubredditController.register(curses.KEY_RIGHT, 'l')
     def open_submission(self, url=None):
         "Select the current submission to view posts"
@@ -85,6 +195,10 @@ class SubredditPage(Page):
         data = {}
         if url is None:
             data = self.content.get(self.nav.absolute_index)
+            if data['type'] != 'Submission':
+                # It couldn't be loaded again after it was evicted
+                self.term.flash()
+                return
             url = data['permalink']
 
         with self.term.loader():
@@ -103,7 +217,9 @@ class SubredditPage(Page):
         "Open a link with the webbrowser"
 
         data = self.content.get(self.nav.absolute_index)
-        if data['url_type'] in ('x-post', 'selfpost'):
+        if data['type'] != 'Submission':
+            self.term.flash()
+        elif data['url_type'] in ('x-post', 'selfpost'):
             # Open links to other posts directly in RTV
             self.open_submission()
         else:
@@ -166,6 +282,33 @@ class SubredditPage(Page):
             self.refresh_content(name=page.subreddit_data['name'],
                                  order='ignore')
 
+    @SubredditController.register('b')
+    def search_browsed(self):
+        "Open a prompt to search everything that has been browsed"
+
+        if self.config.fulltext is None:
+            self.term.show_notification('Set index_browsed=True to enable')
+            return
+
+        query = self.term.prompt_input('Search browsed: ')
+        if not query:
+            return
+
+        # Make sure that the items on the screen can be found
+        self.config.fulltext.flush()
+        with self.term.loader():
+            page = BrowsedPage(
+                self.reddit, self.term, self.config, self.oauth, query)
+        if self.term.loader.exception:
+            return
+
+        page.loop()
+
+    def _record_items(self, items):
+
+        for data in items:
+            self.config.fulltext.add(data)
+
     def _draw_item(self, win, data, inverted=False):
 
         n_rows, n_cols = win.getmaxyx()
@@ -190,7 +333,7 @@ class SubredditPage(Page):
         row = n_title + offset + 1
         if row in valid_rows:
             self.term.add_line(win, '{score} '.format(**data), row, 1)
-            text, attr = self.term.get_arrow(data['likes'])
+            text, attr = self.term.get_arrow(data.get('likes'))
             self.term.add_line(win, text, attr=attr)
             self.term.add_line(win, ' {created} {comments} '.format(**data))
 
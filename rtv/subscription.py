@@ -18,9 +18,16 @@ class SubscriptionPage(Page):
     def __init__(self, reddit, term, config, oauth):
         super(SubscriptionPage, self).__init__(reddit, term, config, oauth)
 
-        self.content = SubscriptionContent.from_user(reddit, term.loader)
+        # The subscriptions are only downloaded if they haven't been saved,
+        # press `r` to download them again
+        user = reddit.user.name if reddit.user else None
+        cached = user and config.subreddits.get_subscriptions(user)
+        if cached:
+            self.content = SubscriptionContent.from_list(cached, term.loader)
+        else:
+            self.content = self._download()
         self.controller = SubscriptionController(self)
-        self.nav = Navigator(self.content.get)
+        self.nav = Navigator(self.content.exists)
         self.subreddit_data = None
 
     @SubscriptionController.register(curses.KEY_F5, 'r')
@@ -32,9 +39,21 @@ class SubscriptionPage(Page):
             self.term.flash()
             return
 
-        self.content = SubscriptionContent.from_user(self.reddit,
-                                                     self.term.loader)
-        self.nav = Navigator(self.content.get)
+        self.content = self._download()
+        self.nav = Navigator(self.content.exists)
+
+    def _download(self):
+        """
+        Download every subscription and save them for the subreddit prompt and
+        the next time that the page is opened.
+        """
+
+        content = SubscriptionContent.from_user(self.reddit, self.term.loader)
+        subscriptions = content.load_all()
+        if not self.term.loader.exception:
+            self.config.subreddits.set_subscriptions(
+                self.reddit.user.name, subscriptions)
+        return content
 
     @SubscriptionController.register(curses.KEY_ENTER, Terminal.RETURN,
                                      curses.KEY_RIGHT, 'l')
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function
+
+import os
+import json
+import time
+import codecs
+import hashlib
+import logging
+import threading
+
+import requests
+from praw.handlers import DefaultHandler
+from requests.structures import CaseInsensitiveDict
+from six.moves.urllib.parse import urlparse, parse_qsl, urlencode
+
+from .config import Config
+from .content import SubredditContent, SubmissionContent
+
+_logger = logging.getLogger(__name__)
+
+
+class RequestPacer(object):
+    """
+    Spaces out the requests that are made by several handlers, so that
+    together they stay within reddit's rate limit.
+
+    PRAW's own rate limiter holds a lock for each domain until the response
+    arrives, and the locks are shared by every handler, so requests from
+    different threads never overlap. The pacer only reserves the time that
+    each request starts at, and the downloads themselves run in parallel.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_call = {}
+
+    def wait(self, domain, delay):
+        """
+        Block until the next request to the domain is allowed to start.
+        """
+
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next_call.get(domain, 0))
+            self._next_call[domain] = start + delay
+        if start > now:
+            time.sleep(start - now)
+
+
+class DiskCacheHandler(DefaultHandler):
+    """
+    PRAW request handler that keeps a copy of downloaded pages on disk, so they
+    can be read back later without waiting on reddit's rate limit, or without
+    a network connection at all.
+
+    Only GET requests are cached. Responses are keyed on the path and the
+    query string of the request, so pages that were downloaded anonymously can
+    be re-used after logging in, when requests are sent to the OAuth domain.
+
+    When online, each cached page is only used once per session. Opening a
+    synced thread is instant, but refreshing it goes back to reddit.
+    """
+
+    def __init__(self, cache_dir, max_age=3600, offline=False, store=False,
+                 pacer=None):
+        """
+        Params:
+            cache_dir (str): Directory where the responses are stored.
+            max_age (int): When online, cached responses older than this many
+                seconds are ignored. Set to 0 to always go to the network.
+            offline (bool): Never go to the network. Requests that haven't
+                been cached will raise a ConnectionError.
+            store (bool): Save successful responses to the cache.
+            pacer (RequestPacer): Rate limit shared with other handlers, in
+                place of PRAW's, so that handlers in different threads can
+                make requests at the same time.
+        """
+
+        super(DiskCacheHandler, self).__init__()
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.offline = offline
+        self.store = store
+        self.bytes_downloaded = 0
+        self._used = set()
+
+        self.pacer = pacer
+        if pacer is not None:
+            # Shadow the class level state of PRAW's rate limiter. Each
+            # handler is only used by one thread, so it never has to wait.
+            self.last_call = {}
+            self.rl_lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(url):
+        """
+        Build a filename for the url that ignores the domain, the .json suffix
+        and the order of the query parameters.
+        """
+
+        parsed = urlparse(url)
+        path = parsed.path.rstrip('/')
+        if path.endswith('.json'):
+            path = path[:-5].rstrip('/')
+        query = urlencode(sorted(parse_qsl(parsed.query)))
+        key = '{0}?{1}'.format(path, query)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json'
+
+    def request(self, request, proxies, timeout, verify, **kwargs):
+
+        cacheable = request.method == 'GET' and not kwargs['_cache_ignore']
+        if cacheable:
+            key = self.cache_key(request.url)
+            filename = os.path.join(self.cache_dir, key)
+            response = self._load(filename, request)
+            if response is not None:
+                return response
+
+        if self.offline:
+            raise requests.ConnectionError(
+                'Not available offline: {0}'.format(request.url))
+
+        if self.pacer is not None:
+            self.pacer.wait(kwargs['_rate_domain'], kwargs['_rate_delay'])
+        response = super(DiskCacheHandler, self).request(
+            request=request, proxies=proxies, timeout=timeout, verify=verify,
+            **kwargs)
+        self.bytes_downloaded += len(response.content)
+        if cacheable and self.store and response.status_code == 200:
+            self._save(filename, response)
+        return response
+
+    def _load(self, filename, request):
+
+        if filename in self._used and not self.offline:
+            return None
+        if not os.path.exists(filename):
+            return None
+
+        with codecs.open(filename, encoding='utf-8') as fp:
+            try:
+                entry = json.load(fp)
+            except ValueError:
+                _logger.warning('Ignoring corrupt cache file %s', filename)
+                return None
+
+        age = time.time() - entry['time']
+        if not self.offline and age > self.max_age:
+            return None
+        self._used.add(filename)
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = 'utf-8'
+        response._content = entry['content'].encode('utf-8')
+        response.url = request.url
+        response.request = request
+        return response
+
+    def _save(self, filename, response):
+
+        entry = {
+            'url': response.url,
+            'time': time.time(),
+            'status': response.status_code,
+            'headers': {'Content-Type': response.headers.get(
+                'Content-Type', 'application/json')},
+            'content': response.text}
+
+        Config._ensure_filepath(filename)
+        tmp_filename = filename + '.tmp'
+        with codecs.open(tmp_filename, 'w', encoding='utf-8') as fp:
+            json.dump(entry, fp)
+        os.rename(tmp_filename, filename)
+
+
+class SyncLoader(object):
+    """
+    Stand-in for the terminal's LoadScreen when content is downloaded without
+    a terminal. Nothing is drawn and exceptions are never caught.
+    """
+
+    def __init__(self):
+        self.exception = None
+        self.depth = 0
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __enter__(self):
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, e, exc_tb):
+        self.depth -= 1
+
+
+def sync(config, user_agent, out=None):
+    """
+    Download the subreddits listed in the `sync_subreddits` config option and
+    the first `sync_limit` threads of each, so that they can be read with
+    --offline. The same requests are made as when browsing normally, they are
+    just saved to the cache directory.
+
+    PRAW objects aren't safe to share between threads, so each worker gets its
+    own reddit session. The workers share a `RequestPacer`, so requests still
+    start no closer together than reddit's rate limit allows, but their
+    downloads overlap.
+
+    Returns 0 if everything was downloaded, or 1 if anything failed.
+    """
+
+    # Imported here to keep start up fast, see main()
+    from concurrent.futures import ThreadPoolExecutor
+    from .objects import build_reddit
+
+    out = out or print
+    names = config['sync_subreddits'].replace(',', ' ').split()
+    if not names:
+        out('Nothing to sync, add some subreddits to the sync_subreddits '
+            'option in {0}'.format(config.config_file))
+        return 1
+
+    local = threading.local()
+    handlers = []
+    lock = threading.Lock()
+    pacer = RequestPacer()
+
+    def get_session():
+        if not hasattr(local, 'reddit'):
+            handler = DiskCacheHandler(
+                config.cache_dir, max_age=0, store=True, pacer=pacer)
+            local.reddit = build_reddit(config, user_agent, handler)
+            local.loader = SyncLoader()
+            with lock:
+                handlers.append(handler)
+        return local.reddit, local.loader
+
+    def sync_subreddit(name):
+        reddit, loader = get_session()
+        content = SubredditContent.from_name(reddit, name, loader)
+        permalinks = []
+        for index in range(config['sync_limit']):
+            try:
+                data = content.get(index)
+            except IndexError:
+                break
+            permalinks.append(data['permalink'])
+        return permalinks
+
+    def sync_submission(url):
+        reddit, loader = get_session()
+        SubmissionContent.from_url(reddit, url, loader)
+
+    start = time.time()
+    n_threads, n_failed = 0, 0
+    n_workers = max(config['sync_workers'], 1)
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        listings = [(name, pool.submit(sync_subreddit, name))
+                    for name in names]
+        threads = []
+        for name, future in listings:
+            try:
+                permalinks = future.result()
+            except Exception as e:
+                _logger.exception(e)
+                out('{0}: failed ({1})'.format(name, e))
+                n_failed += 1
+                continue
+            out('{0}: {1} threads'.format(name, len(permalinks)))
+            threads.extend(pool.submit(sync_submission, url)
+                           for url in permalinks)
+
+        for future in threads:
+            try:
+                future.result()
+            except Exception as e:
+                _logger.exception(e)
+                n_failed += 1
+            else:
+                n_threads += 1
+
+    elapsed = max(time.time() - start, 0.001)
+    n_bytes = sum(handler.bytes_downloaded for handler in handlers)
+    out('Synced {0} threads in {1:.1f}s: {2:.2f} threads/s, {3:.1f} MB '
+        'downloaded ({4:.1f} kB/s)'.format(
+            n_threads, elapsed, n_threads / elapsed, n_bytes / 1e6,
+            n_bytes / 1e3 / elapsed))
+    if n_failed:
+        out('{0} downloads failed'.format(n_failed))
+        return 1
+    return 0
@@ -28,6 +28,7 @@ class Terminal(object):
     # ASCII code
     ESCAPE = 27
     RETURN = 10
+    TAB = 9
 
     def __init__(self, stdscr, ascii=False):
 
@@ -321,7 +322,8 @@ class Terminal(object):
 
         return text
 
-    def text_input(self, window, allow_resize=False):
+    def text_input(self, window, allow_resize=False, callback=None,
+                   complete=None):
         """
         Transform a window into a text box that will accept user input and loop
         until an escape sequence is entered.
@@ -329,6 +331,13 @@ class Terminal(object):
         If the escape key (27) is pressed, cancel the textbox and return None.
         Otherwise, the textbox will wait until it is full (^j, or a new line is
         entered on the bottom line) or the BEL key (^g) is pressed.
+
+        If a callback is given, it's called with the text every time that the
+        text changes, e.g. to search while the user is typing. The text is
+        drawn again afterwards in case the callback drew over the window.
+
+        If `complete` is given, pressing tab replaces the text with the string
+        that it returns, unless it returns None.
         """
 
         window.clear()
@@ -356,7 +365,10 @@ class Terminal(object):
         # user hits the return character from when the user tries to back out
         # of the input.
         try:
-            out = textbox.edit(validate=validate)
+            if callback is None and complete is None:
+                out = textbox.edit(validate=validate)
+            else:
+                out = self._edit(textbox, validate, callback, complete)
             if isinstance(out, six.binary_type):
                 out = out.decode('utf-8')
         except EscapeInterrupt:
@@ -365,7 +377,42 @@ class Terminal(object):
         curses.curs_set(0)
         return self.strip_textpad(out)
 
-    def prompt_input(self, prompt, key=False):
+    def _edit(self, textbox, validate, callback, complete=None):
+        """
+        The same loop as `Textbox.edit`, but the callback is run after each
+        key that changes the text, and tab is passed to `complete`.
+        """
+
+        window, text = textbox.win, ''
+        while True:
+            ch = validate(window.getch())
+            if not ch:
+                continue
+            if ch == self.TAB and complete is not None:
+                out = complete(text)
+                if out is not None:
+                    # The textbox reads its text back from the window
+                    window.erase()
+                    self.add_line(window, out, 0, 0)
+            elif not textbox.do_command(ch):
+                break
+
+            out = textbox.gather()
+            if isinstance(out, six.binary_type):
+                out = out.decode('utf-8')
+            out = self.strip_textpad(out)
+            if out != text:
+                text = out
+                y, x = window.getyx()
+                if callback is not None:
+                    callback(text)
+                window.erase()
+                self.add_line(window, text, 0, 0)
+                window.move(y, x)
+            window.refresh()
+        return textbox.gather()
+
+    def prompt_input(self, prompt, key=False, callback=None, complete=None):
         """
         Display a text prompt at the bottom of the screen.
 
@@ -374,6 +421,10 @@ class Terminal(object):
             key (bool): If true, grab a single keystroke instead of a full
                         string. This can be faster than pressing enter for
                         single key prompts (e.g. y/n?)
+            callback (func): Called with the text each time that it changes,
+                             see `text_input`
+            complete (func): Called with the text when tab is pressed, and
+                             returns the text to replace it with
         """
 
         n_rows, n_cols = self.stdscr.getmaxyx()
@@ -393,7 +444,15 @@ class Terminal(object):
             text = ch if ch != self.ESCAPE else None
             curses.curs_set(0)
         else:
-            text = self.text_input(window)
+            if callback is not None:
+                def redraw(text, callback=callback):
+                    # The callback may have drawn over the prompt
+                    callback(text)
+                    self.add_line(self.stdscr, prompt, n_rows-1, 0, attr)
+                    self.stdscr.refresh()
+                callback = redraw
+            text = self.text_input(window, callback=callback,
+                                   complete=complete)
         return text
 
     def prompt_y_or_n(self, prompt):
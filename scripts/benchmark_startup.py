@@ -0,0 +1,134 @@
+"""
+Internal tool used to measure how long rtv takes to start up, from the moment
+the process is launched until the first frame of the subreddit page has been
+painted to the terminal.
+
+rtv is run inside of a pseudo-terminal with a clean config directory, and all
+of its HTTP requests are served from one of the test suite's cassettes, so the
+results don't depend on the network. Loading the cassette adds a fixed amount
+of time to every run.
+
+Usage:
+    $ python scripts/benchmark_startup.py [-n RUNS]
+"""
+import os
+import pty
+import sys
+import time
+import signal
+import shutil
+import select
+import argparse
+import tempfile
+
+_filepath = os.path.dirname(os.path.relpath(__file__))
+ROOT = os.path.abspath(os.path.join(_filepath, '..'))
+CASSETTE = os.path.join(
+    ROOT, 'tests', 'cassettes', 'test_subreddit_page_construct.yaml')
+
+# The page header, which is drawn as part of the first frame
+HEADER = b'/r/python'
+
+# Runs rtv with every HTTP request answered from the cassette. vcrpy isn't used
+# here because it imports tornado to patch its HTTP client, which would hide
+# any time saved by not loading tornado during start up.
+CHILD = """
+import sys
+import gzip
+import yaml
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+with open({cassette!r}) as fp:
+    cassette = yaml.safe_load(fp)
+responses = dict(
+    ((i['request']['method'], i['request']['uri'].split('?')[0]),
+     i['response']) for i in cassette['interactions'])
+
+def send(self, request, **kwargs):
+    recorded = responses[(request.method, request.url.split('?')[0])]
+    headers = dict((k, v[0]) for k, v in recorded['headers'].items())
+    content = recorded['body']['string']
+    if headers.pop('Content-Encoding', None) == 'gzip':
+        content = gzip.decompress(content)
+    response = requests.Response()
+    response.status_code = recorded['status']['code']
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response.request = request
+    response.url = request.url
+    return response
+
+HTTPAdapter.send = send
+sys.argv = ['rtv', '-s', 'python']
+import runpy
+runpy.run_module('rtv', run_name='__main__')
+"""
+
+
+def run_once(timeout):
+    "Launch rtv and return the number of seconds until the header is painted"
+
+    config_dir = tempfile.mkdtemp()
+    env = dict(os.environ, XDG_CONFIG_HOME=config_dir, TERM='xterm',
+               LINES='40', COLUMNS='120', PYTHONPATH=ROOT)
+    code = CHILD.format(cassette=CASSETTE)
+
+    start = time.time()
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.execvpe(sys.executable, [sys.executable, '-c', code], env)
+
+    output, elapsed = b'', None
+    try:
+        while time.time() - start < timeout:
+            ready, _, _ = select.select([fd], [], [], 0.1)
+            if not ready:
+                continue
+            try:
+                output += os.read(fd, 4096)
+            except OSError:
+                break
+            if HEADER in output:
+                elapsed = time.time() - start
+                break
+    finally:
+        # The pseudo-terminal is thrown away, so there's no need for rtv to
+        # restore it before exiting
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        os.close(fd)
+        shutil.rmtree(config_dir)
+
+    return elapsed
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-n', dest='runs', type=int, default=10,
+                        help='number of times to launch rtv')
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help='seconds to wait for the first frame')
+    args = parser.parse_args()
+
+    times = []
+    for i in range(args.runs):
+        elapsed = run_once(args.timeout)
+        if elapsed is None:
+            print('Run {0}: timed out'.format(i + 1))
+        else:
+            print('Run {0}: {1:.0f} ms'.format(i + 1, elapsed * 1000))
+            times.append(elapsed)
+
+    if times:
+        times.sort()
+        print('')
+        print('min    {0:.0f} ms'.format(times[0] * 1000))
+        print('median {0:.0f} ms'.format(times[len(times) // 2] * 1000))
+        print('max    {0:.0f} ms'.format(times[-1] * 1000))
+
+
+if __name__ == '__main__':
+    main()
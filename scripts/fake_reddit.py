@@ -0,0 +1,526 @@
+"""
+Internal tool that stands in for the reddit API, so that rtv can be load
+tested at scale on a machine with no network access.
+
+Listings, comment trees, search results and subscriptions are generated on
+the fly. Everything is derived from the seed and the requested ids, so the
+same url always returns the same data. The size and shape of the comment
+trees, the latency of each request and the rate of server errors can all be
+configured from the command line.
+
+Point rtv at the server by adding these lines to rtv.cfg:
+
+    api_url=http://127.0.0.1:8080
+    api_request_delay=0
+
+Any refresh token is accepted, so to test logged in pages, write some text to
+~/.config/rtv/refresh-token before launching rtv.
+
+Usage:
+    $ python scripts/fake_reddit.py [--port 8080] [--comments 500] ...
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+from collections import OrderedDict
+
+from tornado import gen, ioloop, web
+
+# Threads are built by the same generator that the test suite and the
+# benchmarks use
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from tests import synthetic  # noqa: E402
+
+# Submission ids encode the position of the subreddit in the registry and the
+# position of the submission in the listing. Comment ids are the submission id
+# followed by the comment's position in the thread.
+SUBREDDIT_SPAN = 10 ** 7
+
+# Generating a large thread takes a while, and loading more comments requests
+# the same thread again
+THREAD_CACHE_SIZE = 8
+
+
+class FakeReddit(object):
+    """
+    Generates the JSON documents that the reddit API would return.
+    """
+
+    def __init__(self, args):
+
+        self.args = args
+        # Subreddit names are registered as they are requested. Front is
+        # always first so that it's stable across restarts.
+        self.subreddits = ['front']
+        self.created_utc = time.time()
+        self._threads = OrderedDict()
+
+    def _generator(self, *key):
+
+        args = self.args
+        generator = synthetic.ThreadGenerator(
+            seed='{0}:{1}'.format(args.seed, key),
+            n_comments=args.comments, reply_rate=args.reply_rate,
+            fanout=args.fanout, max_depth=args.depth,
+            body_words=args.body_words, unicode_rate=args.unicode_rate,
+            wide_rate=args.wide_rate, more_rate=0)
+        generator.created_utc = self.created_utc
+        return generator
+
+    def subreddit_index(self, name):
+
+        name = name.lower()
+        if name not in self.subreddits:
+            self.subreddits.append(name)
+        return self.subreddits.index(name)
+
+    def submission_id(self, subreddit, index):
+        number = self.subreddit_index(subreddit) * SUBREDDIT_SPAN + index + 1
+        return synthetic.to_base36(number)
+
+    def build_submission(self, submission_id):
+
+        number = int(submission_id, 36) - 1
+        subreddit_index, index = divmod(number, SUBREDDIT_SPAN)
+        if subreddit_index < len(self.subreddits):
+            subreddit = self.subreddits[subreddit_index]
+        else:
+            subreddit = 'fake'
+        if subreddit == 'front':
+            subreddit = 'frontpage'
+
+        generator = self._generator('submission', submission_id)
+        title = generator.text(generator.random.randint(3, 30)).capitalize()
+        slug = '_'.join(title.lower().split()[:6])
+        permalink = '/r/{0}/comments/{1}/{2}/'.format(
+            subreddit, submission_id, slug)
+        is_self = generator.random.random() < 0.5
+        if is_self:
+            n_words = generator.random.randint(0, self.args.body_words * 4)
+            selftext = generator.text(n_words)
+            url = self.args.url.rstrip('/') + permalink
+        else:
+            selftext = ''
+            url = 'https://example.com/{0}'.format(submission_id)
+
+        return {'kind': 't3', 'data': {
+            'id': submission_id,
+            'name': 't3_' + submission_id,
+            'title': title,
+            'selftext': selftext,
+            'is_self': is_self,
+            'url': url,
+            'domain': 'self.' + subreddit if is_self else 'example.com',
+            'permalink': permalink,
+            'subreddit': subreddit,
+            'subreddit_id': 't5_' + synthetic.to_base36(
+                subreddit_index + 1),
+            'author': 'user_{0}'.format(generator.random.randint(0, 1000)),
+            'author_flair_text': None,
+            'link_flair_text': generator.random.choice([None, None, 'Discussion']),
+            'created_utc': self.created_utc - index * 60,
+            'score': generator.random.randint(0, 5000),
+            'ups': 0,
+            'downs': 0,
+            'likes': None,
+            'gilded': int(generator.random.random() < 0.05),
+            'num_comments': self.args.comments,
+            'over_18': generator.random.random() < 0.02,
+            'stickied': False,
+            'edited': False}}
+
+    def listing(self, children, after=None):
+        return {'kind': 'Listing', 'data': {
+            'children': children, 'after': after, 'before': None,
+            'modhash': ''}}
+
+    def submission_listing(self, subreddit, params):
+
+        limit = min(int(params.get('limit', 25)), 100)
+        start = 0
+        if params.get('after'):
+            start = int(params['after'].split('_')[-1], 36) % SUBREDDIT_SPAN
+        if params.get('before'):
+            # Nothing is ever posted, so there's never anything newer
+            return self.listing([])
+
+        stop = min(start + limit, self.args.submissions)
+        children = [self.build_submission(self.submission_id(subreddit, i))
+                    for i in range(start, stop)]
+        after = children[-1]['data']['name'] if stop < self.args.submissions \
+            else None
+        return self.listing(children, after)
+
+    def _thread(self, submission_id):
+        """
+        Generate the comments of a thread in the order that they were posted.
+        Returns the comment data, without replies, and the position of each
+        comment's parent, where -1 means a top level comment.
+        """
+
+        if submission_id in self._threads:
+            thread = self._threads.pop(submission_id)
+            self._threads[submission_id] = thread
+            return thread
+
+        generator = self._generator('thread', submission_id)
+        generator.submission_id = submission_id
+        _, roots = generator.generate()
+
+        comments = [None] * self.args.comments
+        parents = [-1] * self.args.comments
+        stack = [(item, -1) for item in roots['data']['children']]
+        while stack:
+            item, parent = stack.pop()
+            data = item['data']
+            replies = data.pop('replies')
+            position = int(data['id'][len(submission_id):], 36)
+            comments[position], parents[position] = data, parent
+            if replies:
+                stack.extend((child, position)
+                             for child in replies['data']['children'])
+
+        if len(self._threads) >= THREAD_CACHE_SIZE:
+            self._threads.popitem(last=False)
+        self._threads[submission_id] = comments, parents
+        return comments, parents
+
+    def build_more(self, submission_id, comments, parent, children):
+
+        if parent == -1:
+            parent_id = 't3_' + submission_id
+        else:
+            parent_id = comments[parent]['name']
+        return {'kind': 'more', 'data': {
+            'id': children[0], 'name': 't1_' + children[0],
+            'parent_id': parent_id, 'count': len(children),
+            'children': children}}
+
+    def _build_forest(self, submission_id, comments, parents, positions,
+                      limit):
+        """
+        Nest the comments at the given positions under their parents. Only
+        the first `limit` comments are included, the rest are replaced with
+        MoreComments stubs under their parent. Comments that are also picked
+        at --more-rate are stubbed out along with all of their replies.
+        """
+
+        included = set()
+        rng = random.Random('{0}:more:{1}'.format(
+            self.args.seed, submission_id))
+        for position in positions:
+            if len(included) >= limit:
+                break
+            parent = parents[position]
+            if parent != -1 and parent not in included \
+                    and parent in positions:
+                continue
+            if rng.random() < self.args.more_rate:
+                continue
+            included.add(position)
+
+        children = dict((p, []) for p in positions)
+        children[-1] = []
+        stubs = dict((p, []) for p in positions)
+        stubs[-1] = []
+        roots = []
+        position_set = set(positions)
+        for position in positions:
+            parent = parents[position]
+            if parent not in position_set:
+                parent = -1
+            if position in included:
+                children[parent].append(position)
+            elif parent == -1 or parent in included:
+                stubs[parent].append(comments[position]['id'])
+            if parent == -1 and position in included:
+                roots.append(position)
+
+        def build(position):
+            replies = [build(p) for p in children[position]]
+            if stubs[position]:
+                replies.append(self.build_more(
+                    submission_id, comments, position, stubs[position]))
+            data = dict(comments[position])
+            data['replies'] = self.listing(replies) if replies else ''
+            return {'kind': 't1', 'data': data}
+
+        forest = [build(p) for p in roots]
+        if stubs[-1]:
+            forest.append(self.build_more(
+                submission_id, comments, -1, stubs[-1]))
+        return forest
+
+    def thread(self, submission_id, params):
+
+        comments, parents = self._thread(submission_id)
+        limit = int(params.get('limit', self.args.page_size))
+        limit = min(limit, self.args.page_size)
+        forest = self._build_forest(
+            submission_id, comments, parents, list(range(len(parents))),
+            limit)
+        return [self.listing([self.build_submission(submission_id)]),
+                self.listing(forest)]
+
+    def more_children(self, link_id, children):
+        """
+        Return the requested comments along with all of their replies. The
+        replies are nested rather than flat like on reddit, which rtv handles
+        the same way.
+        """
+
+        submission_id = link_id.split('_', 1)[1]
+        comments, parents = self._thread(submission_id)
+
+        requested = set()
+        for comment_id in children:
+            if comment_id.startswith(submission_id):
+                requested.add(int(comment_id[len(submission_id):], 36))
+
+        # Collect each requested comment's subtree
+        positions = set()
+        for position, parent in enumerate(parents):
+            if position in requested or parent in positions:
+                positions.add(position)
+        sub_parents = list(parents)
+        for position in requested:
+            if position < len(parents):
+                sub_parents[position] = -1
+        forest = self._build_forest(
+            submission_id, comments, sub_parents, sorted(positions),
+            self.args.page_size)
+        return {'json': {'errors': [], 'data': {'things': forest}}}
+
+    def new_comment(self, parent_id, body):
+
+        generator = self._generator('reply', parent_id)
+        generator.submission_id = parent_id.split('_', 1)[1][:6]
+        comment = generator.comment(0, parent_id)
+        comment['data']['body'] = body
+        return comment
+
+    def subreddit_comments(self, subreddit, params):
+        # Comments are never posted, so following a thread finds nothing new
+        return self.listing([])
+
+    def search(self, subreddit, params):
+
+        query = params.get('q', '')
+        listing = self.submission_listing(subreddit, params)
+        for child in listing['data']['children']:
+            child['data']['title'] = '{0} {1}'.format(
+                query, child['data']['title'])
+        return listing
+
+    def subscriptions(self, params):
+
+        children = []
+        for i in range(self.args.subscriptions):
+            name = 'subreddit_{0}'.format(i)
+            subreddit_id = synthetic.to_base36(i + 1)
+            children.append({'kind': 't5', 'data': {
+                'id': subreddit_id, 'name': 't5_' + subreddit_id,
+                'display_name': name, 'title': 'The {0} subreddit'.format(
+                    name), 'url': '/r/{0}/'.format(name),
+                'subscribers': 1000 * i, 'over18': False,
+                'public_description': ''}})
+        return self.listing(children)
+
+    def user(self):
+        return {'name': 'fake_user', 'id': '1', 'created_utc':
+                self.created_utc, 'link_karma': 1, 'comment_karma': 1,
+                'is_gold': False, 'is_mod': False, 'has_verified_email': True,
+                'over_18': True, 'inbox_count': 0, 'has_mail': False,
+                'has_mod_mail': False}
+
+
+class BaseHandler(web.RequestHandler):
+
+    def initialize(self, fake):
+        self.fake = fake
+
+    @gen.coroutine
+    def prepare(self):
+
+        args = self.fake.args
+        if args.latency:
+            delay = random.expovariate(1000.0 / args.latency)
+            yield gen.sleep(delay)
+        if random.random() < args.error_rate:
+            self.set_status(503)
+            self.finish({'error': 503})
+
+    @property
+    def params(self):
+        return dict((k, self.get_argument(k)) for k in self.request.arguments)
+
+    def write_json(self, data):
+        self.set_header('Content-Type', 'application/json; charset=UTF-8')
+        self.finish(json.dumps(data))
+
+
+class ListingHandler(BaseHandler):
+
+    def get(self, subreddit=None, order=None):
+        self.write_json(self.fake.submission_listing(
+            subreddit or 'front', self.params))
+
+
+class UserListingHandler(BaseHandler):
+
+    def get(self, user):
+        self.write_json(self.fake.submission_listing(
+            'user_' + user, self.params))
+
+
+class SearchHandler(BaseHandler):
+
+    def get(self, subreddit):
+        self.write_json(self.fake.search(subreddit, self.params))
+
+
+class ThreadHandler(BaseHandler):
+
+    def get(self, submission_id):
+        self.write_json(self.fake.thread(submission_id, self.params))
+
+
+class SubredditCommentsHandler(BaseHandler):
+
+    def get(self, subreddit):
+        self.write_json(self.fake.subreddit_comments(subreddit, self.params))
+
+
+class InfoHandler(BaseHandler):
+
+    def get(self):
+        fullnames = self.get_argument('id', '').split(',')
+        children = [self.fake.build_submission(name.split('_', 1)[1])
+                    for name in fullnames if name.startswith('t3_')]
+        self.write_json(self.fake.listing(children))
+
+
+class MoreChildrenHandler(BaseHandler):
+
+    def post(self):
+        children = self.get_argument('children', '').split(',')
+        link_id = self.get_argument('link_id')
+        self.write_json(self.fake.more_children(link_id, children))
+
+
+class SubscriptionsHandler(BaseHandler):
+
+    def get(self):
+        self.write_json(self.fake.subscriptions(self.params))
+
+
+class AccessTokenHandler(BaseHandler):
+
+    def post(self):
+        self.write_json({
+            'access_token': 'fake_access_token', 'token_type': 'bearer',
+            'expires_in': 3600, 'scope': ' '.join(self.fake.args.scope)})
+
+
+class MeHandler(BaseHandler):
+
+    def get(self):
+        self.write_json(self.fake.user())
+
+
+class ActionHandler(BaseHandler):
+    "Accept votes, comments, edits and deletes without doing anything"
+
+    def post(self, action):
+
+        things = []
+        if action in ('comment', 'editusertext'):
+            things.append(self.fake.new_comment(
+                self.get_argument('thing_id', 't3_1'),
+                self.get_argument('text', '')))
+        self.write_json({'json': {'errors': [], 'data': {'things': things}}})
+
+
+def build_app(fake):
+
+    json_suffix = r'/?(?:\.json)?'
+    orders = r'(?:/(hot|top|new|rising|controversial))?'
+    routes = [
+        (r'/api/v1/access_token' + json_suffix, AccessTokenHandler),
+        (r'/api/v1/me' + json_suffix, MeHandler),
+        (r'/api/info' + json_suffix, InfoHandler),
+        (r'/api/morechildren' + json_suffix, MoreChildrenHandler),
+        (r'/api/(\w+)' + json_suffix, ActionHandler),
+        (r'/subreddits/mine/subscriber' + json_suffix, SubscriptionsHandler),
+        (r'/user/([^/]+)/submitted' + json_suffix, UserListingHandler),
+        (r'/r/([^/]+)/search' + json_suffix, SearchHandler),
+        (r'/r/([^/]+)/comments' + json_suffix, SubredditCommentsHandler),
+        (r'(?:/r/[^/]+)?/comments/(\w+)(?:/[^/]*)*' + json_suffix,
+         ThreadHandler),
+        (r'/r/([^/]+)' + orders + json_suffix, ListingHandler),
+        (r'()' + orders + json_suffix, ListingHandler),
+    ]
+    return web.Application([r + (dict(fake=fake),) for r in routes])
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description=__doc__.split('\n\n')[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed used to generate all of the content')
+    parser.add_argument('--submissions', type=int, default=1000,
+                        help='number of submissions in each listing')
+    parser.add_argument('--comments', type=int, default=500,
+                        help='number of comments in each thread')
+    parser.add_argument('--depth', type=int, default=10,
+                        help='maximum nesting level of the comments')
+    parser.add_argument('--reply-rate', type=float, default=0.7,
+                        help='fraction of comments that are replies')
+    parser.add_argument('--fanout', type=int, default=5,
+                        help='replies go to one of the last N comments, '
+                             'higher values make flatter and wider trees')
+    parser.add_argument('--page-size', type=int, default=200,
+                        help='comments returned before the rest are '
+                             'replaced with MoreComments')
+    parser.add_argument('--more-rate', type=float, default=0.02,
+                        help='fraction of comments that are replaced with '
+                             'MoreComments even on the first page')
+    parser.add_argument('--body-words', type=int, default=30,
+                        help='average number of words in a comment')
+    parser.add_argument('--unicode-rate', type=float, default=0.05,
+                        help='fraction of words with non-ascii '
+                             'characters')
+    parser.add_argument('--wide-rate', type=float, default=0.02,
+                        help='fraction of words with double width '
+                             'characters')
+    parser.add_argument('--subscriptions', type=int, default=50,
+                        help='number of subscribed subreddits')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='average delay added to each request, in ms')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='fraction of requests that fail with a 503')
+    parser.add_argument('--scope', nargs='*', default=[
+        'edit', 'history', 'identity', 'mysubreddits', 'privatemessages',
+        'read', 'report', 'save', 'submit', 'subscribe', 'vote'],
+        help='scope granted to access tokens')
+    parser.add_argument('--quiet', action='store_true',
+                        help="don't log each request")
+    args = parser.parse_args()
+    args.url = 'http://127.0.0.1:{0}'.format(args.port)
+
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO)
+    app = build_app(FakeReddit(args))
+    app.listen(args.port, address='127.0.0.1')
+    print('Serving a fake reddit on {0}'.format(args.url))
+    ioloop.IOLoop.current().start()
+
+
+if __name__ == '__main__':
+    main()
@@ -19,6 +19,8 @@ from rtv.subreddit import SubredditPage
 from rtv.submission import SubmissionPage
 from rtv.subscription import SubscriptionPage
 
+import synthetic
+
 try:
     from unittest import mock
 except ImportError:
@@ -124,6 +126,7 @@ def refresh_token(request):
 @pytest.yield_fixture()
 def config():
     with patch('rtv.config.Config.save_refresh_token'), \
+            patch('rtv.config.Config.save_access_token'), \
             patch('rtv.config.Config.save_history'):
         yield Config()
 
@@ -172,6 +175,29 @@ def reddit(vcr, request):
             yield reddit
 
 
+@pytest.fixture(scope='session')
+def synthetic_reddit():
+    return synthetic.get_reddit()
+
+
+@pytest.fixture()
+def synthetic_submission(synthetic_reddit):
+    """
+    Factory for large submissions that are generated locally, see
+    tests/synthetic.py for the options.
+    """
+    return partial(synthetic.generate, synthetic_reddit)
+
+
+@pytest.fixture(params=sorted(synthetic.SHAPES))
+def synthetic_thread(request, synthetic_reddit):
+    """
+    A generated submission with 500 comments, in each of the preset shapes.
+    """
+    return synthetic.generate(synthetic_reddit, shape=request.param,
+                              n_comments=500)
+
+
 @pytest.fixture()
 def terminal(stdscr, config):
     term = Terminal(stdscr, ascii=config['ascii'])
@@ -197,6 +223,21 @@ def submission_page(reddit, terminal, config, oauth):
     return page
 
 
+@pytest.fixture()
+def synthetic_page(synthetic_reddit, synthetic_submission, terminal, config):
+    """
+    Factory for submission pages that show a generated submission, takes the
+    same options as `synthetic_submission`.
+    """
+    oauth = OAuthHelper(synthetic_reddit, terminal, config)
+
+    def build(**kwargs):
+        submission = synthetic_submission(**kwargs)
+        return SubmissionPage(synthetic_reddit, terminal, config, oauth,
+                              submission=submission)
+    return build
+
+
 @pytest.fixture()
 def subreddit_page(reddit, terminal, config, oauth):
     subreddit = '/r/python'
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+Generate large comment threads for tests and benchmarks, without talking to
+reddit.
+
+Threads are built as the same JSON that reddit's API returns and are then
+turned into PRAW objects by PRAW itself, so they can be passed straight to
+`Content.flatten_comments()`, `Content.strip_praw_comment()` and
+`SubmissionContent`. The same seed always produces the same thread.
+
+The CLI writes a thread to a file, which can be loaded back with `load()`:
+
+    $ python -m tests.synthetic --comments 50000 --shape deep -o deep.json
+"""
+from __future__ import unicode_literals, print_function
+
+import sys
+import json
+import codecs
+import random
+import argparse
+
+import praw
+
+WORDS = (
+    'the of and to in is you that it he was for on are as with his they at '
+    'be this have from or one had by word but not what all were we when your '
+    'can said there use an each which she do how their if will up other about '
+    'out many then them these so some her would make like him into time has '
+    'look two more write go see number no way could people my than first '
+    'python terminal reddit curses comment thread').split()
+
+UNICODE_WORDS = ['naïve', 'café', 'Ünïcödé', 'façade', 'Straße',
+                 '→', '•', '♥', 'Ελληνικά', 'русский']
+
+# Double width characters, which take up two columns on the screen
+WIDE_WORDS = ['日本語', '한국어', '中文字',
+              'ｗｉｄｅ', 'テスト', '漢字']
+
+# Presets for the shape of the tree, see `generate()`
+SHAPES = {
+    'flat': dict(reply_rate=0.1, fanout=50, max_depth=3),
+    'balanced': dict(reply_rate=0.7, fanout=5, max_depth=10),
+    'wide': dict(reply_rate=0.9, fanout=200, max_depth=4),
+    'deep': dict(reply_rate=0.98, fanout=1, max_depth=50),
+}
+
+
+def to_base36(number):
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    out = []
+    while True:
+        number, remainder = divmod(number, 36)
+        out.append(digits[remainder])
+        if not number:
+            return ''.join(reversed(out))
+
+
+class ThreadGenerator(object):
+    """
+    Builds the JSON for a submission and its comment tree.
+
+    The tree is grown one comment at a time. Each comment is a top level
+    comment, or with probability `reply_rate` a reply to one of the `fanout`
+    most recently added comments, as long as that doesn't nest it deeper than
+    `max_depth`. A low fanout with a high reply rate builds long chains of
+    replies, and a high fanout builds wide trees.
+
+    Params:
+        seed (int): Seed for the random number generator.
+        n_comments (int): Number of comments in the thread, not including
+            the comments hidden behind MoreComments.
+        reply_rate (float): Fraction of the comments that are replies.
+        fanout (int): Replies are made to one of this many recent comments.
+        max_depth (int): Maximum nesting level.
+        body_words (int): Average number of words in a comment. Lengths are
+            exponentially distributed, like on reddit.
+        paragraph_rate (float): Fraction of the words that end a paragraph.
+        unicode_rate (float): Fraction of non-ascii words.
+        wide_rate (float): Fraction of words with double width characters.
+        more_rate (float): Fraction of the comments whose replies end with a
+            MoreComments stub.
+        more_size (int): Average number of comments behind each stub.
+    """
+
+    def __init__(self, seed=0, n_comments=1000, reply_rate=0.7, fanout=5,
+                 max_depth=10, body_words=30, paragraph_rate=0.02,
+                 unicode_rate=0.05, wide_rate=0.02, more_rate=0.02,
+                 more_size=20):
+
+        self.seed = seed
+        self.n_comments = n_comments
+        self.reply_rate = reply_rate
+        self.fanout = max(fanout, 1)
+        self.max_depth = max(max_depth, 1)
+        self.body_words = body_words
+        self.paragraph_rate = paragraph_rate
+        self.unicode_rate = unicode_rate
+        self.wide_rate = wide_rate
+        self.more_rate = more_rate
+        self.more_size = more_size
+
+        self.random = random.Random(seed)
+        self.submission_id = to_base36(self.random.randint(36 ** 5, 36 ** 6))
+        self.created_utc = 1451606400.0
+
+    def text(self, n_words):
+
+        words = []
+        for _ in range(max(n_words, 1)):
+            value = self.random.random()
+            if value < self.wide_rate:
+                words.append(self.random.choice(WIDE_WORDS))
+            elif value < self.wide_rate + self.unicode_rate:
+                words.append(self.random.choice(UNICODE_WORDS))
+            else:
+                words.append(self.random.choice(WORDS))
+            if self.random.random() < self.paragraph_rate:
+                words.append('\n\n')
+        return ' '.join(words).replace(' \n\n ', '\n\n').strip()
+
+    def submission(self):
+
+        title = self.text(self.random.randint(3, 30)).capitalize()
+        permalink = '/r/synthetic/comments/{0}/thread/'.format(
+            self.submission_id)
+        return {'kind': 't3', 'data': {
+            'id': self.submission_id,
+            'name': 't3_' + self.submission_id,
+            'title': title,
+            'selftext': self.text(self.body_words * 4),
+            'is_self': True,
+            'url': 'https://www.reddit.com' + permalink,
+            'domain': 'self.synthetic',
+            'permalink': permalink,
+            'subreddit': 'synthetic',
+            'subreddit_id': 't5_1',
+            'author': 'synthetic_op',
+            'author_flair_text': None,
+            'link_flair_text': None,
+            'created_utc': self.created_utc,
+            'score': self.random.randint(0, 5000),
+            'ups': 0,
+            'downs': 0,
+            'likes': None,
+            'gilded': 0,
+            'num_comments': self.n_comments,
+            'over_18': False,
+            'stickied': False,
+            'edited': False}}
+
+    def comment(self, position, parent_id):
+
+        comment_id = self.submission_id + to_base36(position).zfill(4)
+        n_words = int(self.random.expovariate(1.0 / self.body_words)) + 1
+        return {'kind': 't1', 'data': {
+            'id': comment_id,
+            'name': 't1_' + comment_id,
+            'parent_id': parent_id,
+            'link_id': 't3_' + self.submission_id,
+            'body': self.text(n_words),
+            'author': 'user_{0}'.format(self.random.randint(0, 1000)),
+            'author_flair_text': None,
+            'created_utc': self.created_utc + position,
+            'score': self.random.randint(-10, 500),
+            'ups': 0,
+            'downs': 0,
+            'likes': self.random.choice([None, None, None, True, False]),
+            'gilded': int(self.random.random() < 0.01),
+            'edited': False,
+            'replies': ''}}
+
+    def more(self, parent_id, position):
+
+        count = max(int(self.random.expovariate(1.0 / self.more_size)), 1)
+        children = [self.submission_id + 'm' + to_base36(position * 1000 + i)
+                    for i in range(count)]
+        return {'kind': 'more', 'data': {
+            'id': children[0], 'name': 't1_' + children[0],
+            'parent_id': parent_id, 'count': count, 'children': children}}
+
+    def generate(self):
+        """
+        Return the thread as the two listings returned by reddit's
+        /comments/<id> endpoint.
+        """
+
+        submission = self.submission()
+        roots, comments, depths = [], [], []
+        for position in range(self.n_comments):
+            parent = None
+            if comments and self.random.random() < self.reply_rate:
+                low = max(0, len(comments) - self.fanout)
+                candidate = self.random.randint(low, len(comments) - 1)
+                if depths[candidate] + 1 < self.max_depth:
+                    parent = candidate
+
+            if parent is None:
+                comment = self.comment(position, submission['data']['name'])
+                roots.append(comment)
+                depths.append(0)
+            else:
+                comment = self.comment(
+                    position, comments[parent]['data']['name'])
+                replies = comments[parent]['data']['replies']
+                if not replies:
+                    replies = comments[parent]['data']['replies'] = listing()
+                replies['data']['children'].append(comment)
+                depths.append(depths[parent] + 1)
+            comments.append(comment)
+
+        # Stubs go last, the same as on reddit
+        for position, comment in enumerate(comments):
+            if self.random.random() < self.more_rate:
+                if not comment['data']['replies']:
+                    comment['data']['replies'] = listing()
+                comment['data']['replies']['data']['children'].append(
+                    self.more(comment['data']['name'], position))
+        if roots and self.random.random() < self.more_rate * 10:
+            roots.append(self.more(submission['data']['name'], len(comments)))
+
+        return [listing([submission]), listing(roots)]
+
+
+def listing(children=None):
+    return {'kind': 'Listing', 'data': {
+        'children': children or [], 'after': None, 'before': None,
+        'modhash': ''}}
+
+
+def get_reddit():
+    """
+    PRAW session that's only used to build objects, it never makes requests.
+    """
+
+    return praw.Reddit(user_agent='rtv test suite', disable_update_check=True,
+                       decode_html_entities=False)
+
+
+def build(reddit, thread):
+    """
+    Turn the JSON returned by `ThreadGenerator.generate()` into a PRAW
+    submission with its comments attached.
+    """
+
+    # PRAW only builds objects from JSON text, and expects to know which url
+    # it came from
+    text = json.dumps(thread)
+    reddit._request_url = 'https://www.reddit.com' + (
+        thread[0]['data']['children'][0]['data']['permalink'])
+    try:
+        response = json.loads(text, object_hook=reddit._json_reddit_objecter)
+    finally:
+        del reddit._request_url
+    return praw.objects.Submission.from_json(response)
+
+
+def generate(reddit=None, shape=None, **kwargs):
+    """
+    Build a PRAW submission with a synthetic comment tree. `shape` is one of
+    the presets in SHAPES, any other arguments are passed to ThreadGenerator.
+    """
+
+    params = dict(SHAPES[shape]) if shape else {}
+    params.update(kwargs)
+    thread = ThreadGenerator(**params).generate()
+    return build(reddit or get_reddit(), thread)
+
+
+def load(filename, reddit=None):
+    """
+    Load a thread that was saved with the command line interface.
+    """
+
+    with codecs.open(filename, encoding='utf-8') as fp:
+        thread = json.load(fp)
+    return build(reddit or get_reddit(), thread)
+
+
+def main(args=None):
+
+    parser = argparse.ArgumentParser(
+        prog='python -m tests.synthetic',
+        description='Generate a synthetic comment thread for benchmarks.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-o', '--output', default='-',
+                        help='file to write the thread to')
+    parser.add_argument('--shape', choices=sorted(SHAPES),
+                        help='preset for --reply-rate, --fanout and '
+                             '--max-depth')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--comments', dest='n_comments', type=int,
+                        default=1000)
+    parser.add_argument('--reply-rate', type=float)
+    parser.add_argument('--fanout', type=int)
+    parser.add_argument('--max-depth', type=int)
+    parser.add_argument('--body-words', type=int, default=30)
+    parser.add_argument('--paragraph-rate', type=float, default=0.02)
+    parser.add_argument('--unicode-rate', type=float, default=0.05)
+    parser.add_argument('--wide-rate', type=float, default=0.02)
+    parser.add_argument('--more-rate', type=float, default=0.02)
+    parser.add_argument('--more-size', type=int, default=20)
+    args = vars(parser.parse_args(args))
+
+    output = args.pop('output')
+    params = dict(SHAPES[args.pop('shape') or 'balanced'])
+    params.update((k, v) for k, v in args.items() if v is not None)
+    thread = ThreadGenerator(**params).generate()
+
+    text = json.dumps(thread, ensure_ascii=False)
+    if output == '-':
+        print(text)
+    else:
+        with codecs.open(output, 'w', encoding='utf-8') as fp:
+            fp.write(text)
+        print('Wrote {0} comments to {1}'.format(
+            params['n_comments'], output), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -65,7 +65,8 @@ def test_config_from_file():
         'clear_auth': True,
         'log': 'logfile.log',
         'link': 'https://reddit.com/permalink •',
-        'subreddit': 'cfb'}
+        'subreddit': 'cfb',
+        'follow_interval': 30}
 
     with NamedTemporaryFile(suffix='.cfg') as fp:
         config = Config(config_file=fp.name)
@@ -119,6 +120,46 @@ def test_config_refresh_token():
         assert config.refresh_token is None
 
 
+def test_config_access_token():
+    "Ensure that the access token can be loaded, saved, and removed"
+
+    with NamedTemporaryFile(delete=False) as token_fp, \
+            NamedTemporaryFile(delete=False) as fp:
+        os.chmod(token_fp.name, 0o600)
+        config = Config(token_file=token_fp.name, access_token_file=fp.name)
+
+        # Write a new token to the file, with the refresh token's permissions
+        token = {'access_token': 'secret_value', 'expires': 1451606400.5,
+                 'scope': set(['identity', 'read']), 'user': 'username'}
+        config.access_token = token
+        config.save_access_token()
+        assert os.stat(fp.name).st_mode & 0o777 == 0o600
+
+        # Load a valid token from the file
+        config.access_token = None
+        config.load_access_token()
+        assert config.access_token == token
+
+        # Corrupt files are ignored
+        with open(fp.name, 'w') as corrupt:
+            corrupt.write('secret_value\nnot a number\nread\nusername')
+        config.load_access_token()
+        assert config.access_token is None
+
+        # Discard the token and delete the file
+        config.access_token = token
+        config.delete_access_token()
+        assert config.access_token is None
+        assert not os.path.exists(fp.name)
+
+        # Loading from the non-existent file should return None
+        config.access_token = token
+        config.load_access_token()
+        assert config.access_token is None
+
+        os.remove(token_fp.name)
+
+
 def test_config_history():
     "Ensure that the history can be loaded and saved"
 
@@ -140,4 +181,187 @@ def test_config_history():
 
         config.delete_history()
         assert len(config.history) == 0
-        assert not os.path.exists(fp.name)
\ No newline at end of file
+        assert not os.path.exists(fp.name)
+
+
+def test_config_history_log():
+    "Ensure that links are appended to the history file as they are visited"
+
+    with NamedTemporaryFile(delete=False) as fp:
+        # Files written by older versions don't end with a newline
+        fp.write('link1\nlink2'.encode('utf-8'))
+        fp.flush()
+
+        config = Config(history_file=fp.name, history_size=3)
+        config.load_history()
+        assert list(config.history) == ['link1', 'link2']
+
+        # Visiting a link writes it immediately, duplicates move to the end
+        config.history.add('link3')
+        config.history.add('link1')
+        assert list(config.history) == ['link2', 'link3', 'link1']
+        with open(fp.name) as log:
+            assert log.read().splitlines() == [
+                'link1', 'link2', 'link3', 'link1']
+
+        # Nothing needs to be written on exit
+        with mock.patch('rtv.config.History.save') as save:
+            config.save_history()
+            assert not save.called
+
+        # The file is compacted once it's twice the size of the history
+        config.history.add('link4')
+        config.history.add('link5')
+        assert list(config.history) == ['link2', 'link3', 'link1', 'link4',
+                                        'link5']
+        config.history.add('link6')
+        with open(fp.name) as log:
+            assert log.read().splitlines() == ['link4', 'link5', 'link6']
+        assert list(config.history) == ['link4', 'link5', 'link6']
+
+        config.load_history()
+        assert list(config.history) == ['link4', 'link5', 'link6']
+        config.delete_history()
+
+
+def test_config_history_bloom_filter():
+    "Ensure that the bloom filter remembers links between sessions"
+
+    with NamedTemporaryFile(delete=False) as fp, \
+            NamedTemporaryFile(delete=False) as bloom_fp:
+        fp.write('link1\nlink2\n'.encode('utf-8'))
+        fp.flush()
+
+        config = Config(history_file=fp.name, bloom_file=bloom_fp.name,
+                        history_size=10, history_bloom_filter=True)
+
+        # The existing history is imported when the filter is created
+        config.load_history()
+        assert 'link1' in config.history
+        assert 'link2' in config.history
+        assert 'link3' not in config.history
+
+        config.history.add('link3')
+        config.save_history()
+        config.load_history()
+        assert 'link3' in config.history
+        assert len(config.history) == 3
+
+        # Older links are dropped after two generations have been filled
+        for i in range(20):
+            config.history.add('other{0}'.format(i))
+        assert 'link1' not in config.history
+        assert 'other19' in config.history
+
+        # Changing the settings rebuilds the filter
+        config['history_error_rate'] = 0.01
+        config.load_history()
+        assert 'other19' not in config.history
+        assert 'link1' in config.history
+
+        # A truncated file is rebuilt as well
+        config.save_history()
+        length = os.path.getsize(bloom_fp.name)
+        with open(bloom_fp.name, 'r+b') as truncated:
+            truncated.truncate(length - 1)
+        config.load_history()
+        assert 'link1' in config.history
+        assert os.path.getsize(bloom_fp.name) == length
+
+        config.delete_history()
+        assert not os.path.exists(bloom_fp.name)
+        os.remove(fp.name)
+
+
+def test_config_fulltext(tmpdir):
+    "Ensure that browsed items can be searched in later sessions"
+
+    filename = tmpdir.join('browsed.db').strpath
+    config = Config(fulltext_file=filename)
+    config.load_fulltext()
+    assert config.fulltext is None
+
+    submission = {
+        'type': 'Submission', 'name': 't3_1', 'title': 'Python packaging',
+        'text': 'Wheels or eggs?', 'author': 'alice', 'subreddit': 'python',
+        'permalink': 'https://www.reddit.com/r/python/comments/1/',
+        'created_utc': 1000.0}
+    comment = {
+        'type': 'Comment', 'name': 't1_2', 'body': 'Definitely wheels',
+        'author': 'bob',
+        'permalink': 'https://www.reddit.com/r/python/comments/1/_/2',
+        'created_utc': 2000.0}
+    more = {'type': 'MoreComments', 'name': 't1_3', 'body': 'More comments'}
+
+    config = Config(fulltext_file=filename, index_browsed=True)
+    config.load_fulltext()
+    config.fulltext.add(submission)
+    config.fulltext.add(comment, submission)
+    config.fulltext.add(more)
+    config.fulltext.flush()
+
+    results = config.fulltext.search('whe')
+    assert sorted(r['name'] for r in results) == ['t1_2', 't3_1']
+    result = [r for r in results if r['name'] == 't1_2'][0]
+    assert result['title'] == 'Python packaging'
+    assert result['subreddit'] == 'python'
+    assert result['snippet'] == 'Definitely wheels'
+    assert config.fulltext.search('packaging bob')[0]['name'] == 't1_2'
+    assert config.fulltext.search('More') == []
+    # Punctuation isn't read as query syntax
+    assert config.fulltext.search('"wheels" AND (') == []
+    assert config.fulltext.search('  ') == []
+    config.save_fulltext()
+
+    # Items are kept between sessions, and edits are picked up
+    config.load_fulltext()
+    assert config.fulltext.search('wheels')
+    comment['body'] = 'Eggs are fine'
+    config.fulltext.add(comment, submission)
+    config.save_fulltext()
+    config.load_fulltext()
+    results = config.fulltext.search('eggs')
+    assert sorted(r['name'] for r in results) == ['t1_2', 't3_1']
+    assert [r['name'] for r in config.fulltext.search('definitely')] == []
+    config.save_fulltext()
+
+
+def test_config_subreddits(tmpdir):
+    "Ensure that the subreddits for the prompt are kept between sessions"
+
+    filename = tmpdir.join('subreddits.json').strpath
+    config = Config(subreddits_file=filename)
+    config.load_subreddits()
+    assert config.subreddits.names() == []
+
+    subscriptions = [
+        {'type': 'Subscription', 'name': '/r/python', 'title': 'Python',
+         'split_title': ['Python'], 'n_rows': 2},
+        {'type': 'Subscription', 'name': '/r/linux', 'title': 'Linux'}]
+    config.subreddits.set_subscriptions('alice', subscriptions)
+    config.subreddits.visit('/r/pics')
+    config.subreddits.visit('/r/python/')
+    config.subreddits.visit('r/pics')
+    assert config.subreddits.names() == ['pics', 'python', 'python', 'linux']
+    assert config.subreddits.names('bob') == ['pics', 'python']
+    config.save_subreddits()
+
+    config = Config(subreddits_file=filename)
+    config.load_subreddits()
+    assert config.subreddits.names('alice') == [
+        'pics', 'python', 'python', 'linux']
+    # Only the keys needed to list the subscriptions are saved
+    assert config.subreddits.get_subscriptions('alice')[0] == {
+        'type': 'Subscription', 'name': '/r/python', 'title': 'Python'}
+
+    # Only the newest subreddits are remembered
+    config.subreddits.size = 3
+    for name in ('a', 'b', 'c', 'd'):
+        config.subreddits.visit(name)
+    assert config.subreddits.names('bob') == ['d', 'c', 'b']
+
+    # A corrupt file is ignored
+    with open(filename, 'w') as fp:
+        fp.write('{')
+    config.load_subreddits()
+    assert config.subreddits.names() == []
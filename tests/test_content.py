@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import os
 import time
 from itertools import islice
 
@@ -9,7 +10,9 @@ import praw
 import pytest
 
 from rtv.content import (
-    Content, SubmissionContent, SubredditContent, SubscriptionContent)
+    Content, SubmissionContent, ArchiveContent, SubredditContent,
+    SubscriptionContent, LocalSource)
+from rtv.archive import ThreadArchive
 from rtv import exceptions
 
 try:
@@ -18,6 +21,53 @@ except ImportError:
     import mock
 
 
+def build_submission(fullname, title='title'):
+    "Construct a stand-in for a praw Submission object"
+
+    submission = mock.MagicMock()
+    submission.fullname = fullname
+    submission.title = title
+    submission.selftext = ''
+    submission.created_utc = time.time()
+    submission.num_comments = 0
+    submission.score = 1
+    submission.author.name = 'civilization_phaze_3'
+    submission.permalink = 'https://www.reddit.com/r/python/comments/' + title
+    submission.subreddit = 'python'
+    submission.link_flair_text = ''
+    submission.url = 'https://www.example.com'
+    submission.likes = None
+    submission.gilded = 0
+    submission.over_18 = False
+    return submission
+
+
+def build_praw_submission(reddit, comments=None, created_utc=0):
+    "Construct a praw Submission object without hitting the network"
+
+    submission = praw.objects.Submission(reddit, {
+        'id': '1', 'name': 't3_1', 'title': 'title', 'selftext': '',
+        'created_utc': created_utc, 'num_comments': 0, 'score': 1,
+        'author': 'author', 'permalink': '/r/python/comments/1/title/',
+        'subreddit': 'python', 'link_flair_text': None, 'likes': None,
+        'url': 'https://www.reddit.com/r/python/comments/1/title/',
+        'gilded': 0, 'over_18': False})
+    submission.comments = comments or []
+    return submission
+
+
+def build_praw_comment(reddit, comment_id, parent_id='t3_1', created_utc=0,
+                       replies=None):
+    "Construct a praw Comment object without hitting the network"
+
+    replies = {'data': {'children': replies}} if replies else ''
+    return praw.objects.Comment(reddit, {
+        'id': comment_id, 'name': 't1_' + comment_id, 'parent_id': parent_id,
+        'link_id': 't3_1', 'body': comment_id, 'created_utc': created_utc,
+        'score': 1, 'likes': None, 'gilded': 0, 'author': 'author',
+        'author_flair_text': None, 'replies': replies})
+
+
 def test_content_humanize_timestamp():
 
     timestamp = time.time() - 30
@@ -66,7 +116,7 @@ def test_content_submission(reddit, terminal):
     assert content.get(40)['type'] == 'Comment'
 
     for data in content.iterate(-1, 1):
-        assert all(k in data for k in ('object', 'n_rows', 'offset', 'type'))
+        assert all(k in data for k in ('name', 'n_rows', 'offset', 'type'))
         # All text should be converted to unicode by this point
         for val in data.values():
             assert not isinstance(val, six.binary_type)
@@ -94,6 +144,445 @@ def test_content_submission(reddit, terminal):
     assert len(content._comment_data) == 45
 
 
+def test_content_submission_archive(terminal, tmpdir):
+
+    filename = tmpdir.join('thread.jsonl').strpath
+    submission = {'type': 'Submission', 'name': 't3_1', 'title': 'Title',
+                  'text': 'Self text', 'permalink': 'https://reddit.com/1'}
+    comments = [{'type': 'Comment', 'name': 't1_{0}'.format(i), 'level': i % 3,
+                 'body': 'Comment ♥ {0}'.format(i), 'author': 'user',
+                 'created_utc': i}
+                for i in range(2000)]
+    comments.append({'type': 'MoreComments', 'name': 't1_more', 'level': 0,
+                     'parent_id': 't3_1', 'children': ['a', 'b'], 'count': 2,
+                     'body': 'More comments'})
+
+    # Folded comments are saved, but not the text wrapping
+    hidden = {'type': 'HiddenComment', 'level': 1, 'count': 1,
+              'cache': [comments[1]]}
+    comments[1]['split_body'] = ['Comment ♥ 1']
+    SubmissionContent.save(mock.Mock(
+        _submission_data=submission,
+        _comment_data=[comments[0], hidden] + comments[2:]), filename)
+
+    content = ArchiveContent(None, filename, terminal.loader)
+    assert content.name == 'https://reddit.com/1'
+    assert content._last_seen == 1999
+    assert len(content._comment_data) == 2001
+    assert content.get(-1)['title'] == 'Title'
+    assert content.get(1)['body'] == 'Comment ♥ 1'
+    assert content.get(2000)['children'] == ['a', 'b']
+    with pytest.raises(IndexError):
+        content.get(2001)
+
+    # There's no connection to check for new comments
+    with pytest.raises(exceptions.SubmissionError):
+        content.fetch_newer()
+
+    # Only the records that are accessed are decoded and kept
+    assert len(content._comment_data._cache) == 2
+    assert not content.index_in_background
+    content.search.build(limit=100)
+    assert len(content._comment_data._cache) == 101
+    content.search.reset()
+    for data in content.iterate(0, 1):
+        pass
+    assert len(content._comment_data._cache) == 512
+
+    # Records that drop out of the cache are decoded into new dicts, so items
+    # have to be compared by name
+    selected = content.get(100)
+    for data in content.iterate(0, 1):
+        pass
+    assert content.get(100) is not selected
+    assert content.get(100)['name'] == selected['name']
+    assert content.reveal(selected['name']) == 100
+
+    # Folding and unfolding comments works like a normal thread
+    content.toggle(1)
+    assert content.get(1)['type'] == 'HiddenComment'
+    assert content.get(2)['name'] == 't1_3'
+    assert len(content._comment_data) == 2000
+    content.toggle(1)
+    assert content.get(2)['name'] == 't1_2'
+    assert len(content._comment_data) == 2001
+
+    # Sorting keeps track of the selected comment after it has been evicted
+    for index in (100, 2000):
+        name = content.get(index)['name']
+        index = content.sort('new', index)
+        assert content.get(index)['name'] == name
+        index = content.sort(None, index)
+        assert content.get(index)['name'] == name
+
+    # A missing index is rebuilt from the data file
+    os.remove(filename + '.idx')
+    content = ArchiveContent(None, filename, terminal.loader)
+    assert content._last_seen == 1999
+    assert content.get(1000)['body'] == 'Comment ♥ 1000'
+
+
+def test_content_submission_synthetic(synthetic_thread, synthetic_submission,
+                                      terminal):
+
+    content = SubmissionContent(synthetic_thread, terminal.loader)
+    n_more = sum(1 for d in content._comment_data
+                 if d['type'] == 'MoreComments')
+    assert len(content._comment_data) == 500 + n_more
+
+    # Replies always come straight after their parents
+    levels = [d['level'] for d in content.iterate(0, 1)]
+    assert levels[0] == 0
+    assert all(b <= a + 1 for a, b in zip(levels, levels[1:]))
+
+    # Folding a comment hides all of its replies
+    index = max(range(len(levels) - 1), key=lambda i: levels[i + 1])
+    content.toggle(index)
+    assert content.get(index)['type'] == 'HiddenComment'
+    content.toggle(index)
+    assert [d['level'] for d in content.iterate(0, 1)] == levels
+
+    # The generator is reproducible
+    first = synthetic_submission(seed=1, n_comments=50, wide_rate=1.0)
+    second = synthetic_submission(seed=1, n_comments=50, wide_rate=1.0)
+    assert [c.body for c in first.comments] == [c.body for c in second.comments]
+    assert all(ord(c.body[0]) > 0x1100 for c in first.comments
+               if hasattr(c, 'body'))
+
+
+def test_content_submission_tree_index(synthetic_thread, terminal):
+
+    content = SubmissionContent(synthetic_thread, terminal.loader)
+    tree = content.tree
+
+    def check():
+        levels = [d['level'] for d in content._comment_data]
+        n = len(levels)
+        for i, level in enumerate(levels):
+            parent = next((j for j in range(i - 1, -1, -1)
+                           if levels[j] < level), -1)
+            end = next((j for j in range(i + 1, n) if levels[j] <= level), n)
+            previous = next((j for j in range(i - 1, parent, -1)
+                             if levels[j] == level), None)
+            assert tree.parent(i) == parent
+            assert tree.end(i) == end
+            assert tree.previous_sibling(i) == previous
+            if end < n and levels[end] == level:
+                assert tree.next_sibling(i) == end
+            else:
+                assert tree.next_sibling(i) is None
+            top = next(j for j in range(i, -1, -1) if levels[j] == 0)
+            assert tree.next_top(i) == (tree.end(top) if tree.end(top) < n
+                                        else None)
+
+    check()
+    assert tree.parent(-1) is None
+    assert tree.next_top(-1) == 0
+
+    # Folding a comment moves everything after it
+    index = next(i for i in range(len(content._comment_data) - 1)
+                 if tree.end(i) > i + 1)
+    content.toggle(index)
+    check()
+    content.toggle(index)
+    check()
+
+
+def test_content_submission_collapse(synthetic_thread, terminal):
+
+    content = SubmissionContent(synthetic_thread, terminal.loader)
+    original = list(content._comment_data)
+    levels = [d['level'] for d in original]
+    index = max(range(len(levels)), key=lambda i: levels[i])
+
+    # Folding a level is the same as toggling every comment on it
+    expected = SubmissionContent(synthetic_thread, terminal.loader)
+    for i in reversed(range(len(levels))):
+        if levels[i] == 1 and original[i]['type'] == 'Comment':
+            expected.toggle(i)
+
+    new_index = content.collapse(1, index)
+    assert len(content._comment_data) == len(expected._comment_data)
+    for data, other in zip(content._comment_data, expected._comment_data):
+        assert data['type'] == other['type']
+        assert data.get('count') == other.get('count')
+        assert ([d['name'] for d in data.get('cache', [])] ==
+                [d['name'] for d in other.get('cache', [])])
+    assert original[index] in content.get(new_index).get('cache', [])
+    assert max(d['level'] for d in content._comment_data) <= 1
+
+    # Nested hidden comments are all unfolded
+    content.collapse(0)
+    assert content.expand_all() == -1
+    assert content._comment_data == original
+    assert content.expand_all(index) == index
+    assert content.rows.total(70) == sum(
+        d['n_rows'] + 1 for d in content.iterate(-1, 1, 70))
+
+
+def test_content_submission_sort(synthetic_thread, terminal):
+
+    content = SubmissionContent(synthetic_thread, terminal.loader)
+    original = list(content._comment_data)
+
+    def parents():
+        comment_data, tree = content._comment_data, content.tree
+        return dict((d['name'], comment_data[tree.parent(i)]['name']
+                     if tree.parent(i) >= 0 else None)
+                    for i, d in enumerate(comment_data))
+
+    def siblings():
+        comment_data, tree = content._comment_data, content.tree
+        for i, data in enumerate(comment_data):
+            j = tree.next_sibling(i)
+            if j is not None and comment_data[j]['type'] == 'Comment':
+                yield data, comment_data[j]
+
+    def score(data):
+        return int(data['score'].split()[0])
+
+    # Replies stay underneath their parents
+    expected = parents()
+    index = len(original) // 2
+    new_index = content.sort('top', index)
+    assert content.order == 'top'
+    assert content._comment_data[new_index] is original[index]
+    assert parents() == expected
+    assert all(score(a) >= score(b) for a, b in siblings())
+
+    # Links to more comments are kept at the end of their siblings
+    for i, data in enumerate(content._comment_data):
+        if data['type'] == 'MoreComments':
+            assert content.tree.next_sibling(i) is None
+
+    # Folded comments stay folded, and are sorted inside
+    content.collapse(1)
+    n_items = len(content._comment_data)
+    content.sort('new')
+    assert len(content._comment_data) == n_items
+    content.expand_all()
+    assert parents() == expected
+    assert all(a['created_utc'] >= b['created_utc'] for a, b in siblings())
+
+    # Back to the order that the comments were downloaded in
+    content.sort(None)
+    assert content._comment_data == original
+    assert content.order is None
+
+
+def test_content_submission_search(synthetic_thread, terminal):
+
+    content = SubmissionContent(synthetic_thread, terminal.loader)
+    search = content.search
+    comments = list(content._comment_data)
+
+    # Built a few comments at a time, with folding in between
+    assert search.build(limit=100)
+    assert not search.complete
+    content.collapse(1)
+    while search.build(limit=100):
+        pass
+    assert search.complete
+    assert not search.build()
+
+    for query in ['Terminal', 'user_1', 'café', 'naïve could', 'zzz']:
+        expected = [i for i, d in enumerate(comments)
+                    if d['type'] == 'Comment' and query.lower() in
+                    '{0} {1}'.format(d['author'], d['body']).lower()]
+        assert search.search(query) == expected
+    assert search.search('') == []
+
+    # Matches are unfolded to show them
+    position = search.search('terminal')[-1]
+    assert search[position] == comments[position]['name']
+    index = content.reveal(search[position])
+    assert content.get(index) is comments[position]
+    assert content.position(index) == position
+    assert content.position(-1) == -1
+    assert content.reveal('t1_missing') is None
+    assert content.reveal(None) is None
+
+    # Sorting changes the order, so the index is built again
+    content.sort('new')
+    assert not search.complete
+    comments = list(content._walk(content._comment_data))
+    assert search.search('terminal') == [
+        i for i, d in enumerate(comments)
+        if d['type'] == 'Comment' and 'terminal' in d['body'].lower()]
+
+
+def test_content_submission_exists(synthetic_submission, terminal):
+
+    submission = synthetic_submission(n_comments=20)
+    content = SubmissionContent(submission, terminal.loader)
+
+    with mock.patch.object(content, 'wrap_text') as wrap_text:
+        assert content.exists(-1)
+        assert content.exists(content.last_index)
+        assert not content.exists(-2)
+        assert not content.exists(content.last_index + 1)
+        assert not wrap_text.called
+
+
+def test_content_submission_row_index(synthetic_submission, terminal):
+
+    submission = synthetic_submission(n_comments=300)
+    content = SubmissionContent(submission, terminal.loader)
+    rows = content.rows
+    assert content.first_index == -1
+    assert content.last_index == len(content._comment_data) - 1
+
+    def heights(n_cols):
+        return [d['n_rows'] + 1 for d in content.iterate(-1, 1, n_cols)]
+
+    # The sums match the heights of the items when they're drawn
+    expected = heights(70)
+    assert rows.total(70) == sum(expected)
+    assert rows.offset(-1, 70) == 0
+    assert rows.offset(0, 70) == expected[0]
+    assert rows.offset(10, 70) == sum(expected[:11])
+    assert rows.find(0, 70) == -1
+    assert rows.find(expected[0], 70) == 0
+    assert rows.find(expected[0] - 1, 70) == -1
+    assert rows.find(sum(expected) + 100, 70) == content.last_index
+
+    # Folding a comment only re-measures the items that changed
+    index = next(i for i in range(len(content._comment_data) - 1)
+                 if content.get(i + 1)['level'] > content.get(i)['level'])
+    content.toggle(index)
+    n_hidden = len(content.get(index)['cache'])
+    with mock.patch.object(content, 'get', wraps=content.get) as get:
+        total = rows.total(70)
+        assert get.call_count == 1
+    assert total == sum(heights(70))
+
+    content.toggle(index)
+    with mock.patch.object(content, 'get', wraps=content.get) as get:
+        total = rows.total(70)
+        assert get.call_count == n_hidden
+    assert total == sum(expected)
+
+    # Changing the width measures everything again
+    assert rows.total(40) == sum(heights(40))
+    assert rows.total(40) > sum(expected)
+
+
+def test_content_submission_fetch_newer(reddit, terminal):
+
+    child = build_praw_comment(reddit, 'b', 't1_a', created_utc=20)
+    comments = [
+        build_praw_comment(reddit, 'a', created_utc=10, replies=[child]),
+        build_praw_comment(reddit, 'c', created_utc=30)]
+    submission = build_praw_submission(reddit, comments)
+    content = SubmissionContent(submission, terminal.loader)
+    assert content._last_seen == 30
+
+    # The stream is sorted newest first and contains comments from other
+    # threads in the same subreddit
+    other = build_praw_comment(reddit, 'x', created_utc=45)
+    other.link_id = 't3_2'
+    stream = [
+        build_praw_comment(reddit, 'f', 't1_e', created_utc=50),
+        other,
+        build_praw_comment(reddit, 'e', 't1_b', created_utc=42),
+        build_praw_comment(reddit, 'd', created_utc=41),
+        build_praw_comment(reddit, 'z', 't1_missing', created_utc=40),
+        build_praw_comment(reddit, 'c', created_utc=30),
+        build_praw_comment(reddit, 'y', created_utc=5)]
+    with mock.patch.object(reddit, 'get_comments') as get_comments:
+        get_comments.return_value = iter(stream)
+        inserted = content.fetch_newer()
+        get_comments.assert_called_with('python', limit=1000)
+
+    assert inserted == [0, 3, 4]
+    names = [data['name'] for data in content._comment_data]
+    assert names == ['t1_d', 't1_a', 't1_b', 't1_e', 't1_f', 't1_c']
+    levels = [data['level'] for data in content._comment_data]
+    assert levels == [0, 0, 1, 2, 3, 0]
+    assert content._last_seen == 50
+
+    # Nothing new, comments from the same second as the last one are
+    # already loaded
+    with mock.patch.object(reddit, 'get_comments') as get_comments:
+        get_comments.return_value = iter(stream)
+        assert content.fetch_newer() == []
+    assert not content.missed_comments
+
+    # Comments posted in the same second as the newest one aren't dropped
+    stream.insert(0, build_praw_comment(reddit, 'g', created_utc=50))
+    with mock.patch.object(reddit, 'get_comments') as get_comments:
+        get_comments.return_value = iter(stream)
+        assert content.fetch_newer() == [0]
+
+    # Replies to folded comments are added to the hidden comment
+    content.toggle(3)
+    hidden = content.get(3)
+    assert hidden['count'] == 3
+    stream.insert(0, build_praw_comment(reddit, 'h', 't1_e', created_utc=60))
+    with mock.patch.object(reddit, 'get_comments') as get_comments:
+        get_comments.return_value = iter(stream)
+        assert content.fetch_newer() == []
+    assert hidden['count'] == 4
+    content.toggle(3)
+    names = [data['name'] for data in content._comment_data]
+    assert names == ['t1_g', 't1_d', 't1_a', 't1_b', 't1_e', 't1_h', 't1_f',
+                     't1_c']
+    assert content.get(5)['level'] == 3
+
+    # The stream ran out before reaching the newest loaded comment
+    stream = [build_praw_comment(reddit, str(i), created_utc=80 - i)
+              for i in range(3)]
+    with mock.patch.object(reddit, 'get_comments') as get_comments:
+        get_comments.return_value = iter(stream)
+        content.fetch_newer(limit=3)
+    assert content.missed_comments
+
+
+def test_content_submission_get_praw_object(reddit, terminal):
+
+    comments = [build_praw_comment(reddit, 'a')]
+    submission = build_praw_submission(reddit, comments)
+    content = SubmissionContent(submission, terminal.loader, order='new')
+
+    # PRAW objects are not kept around after the data has been stripped
+    for data in content.iterate(-1, 1):
+        assert not any(isinstance(val, praw.objects.RedditContentObject)
+                       for val in data.values())
+
+    # Objects are rebuilt from the stored fullname without any requests
+    with mock.patch.object(reddit, 'request_json') as request_json:
+        obj = content.get_praw_object(content.get(-1))
+        assert isinstance(obj, praw.objects.Submission)
+        assert obj.fullname == 't3_1'
+        assert obj._comment_sort == 'new'
+
+        obj = content.get_praw_object(content.get(0))
+        assert isinstance(obj, praw.objects.Comment)
+        assert obj.fullname == 't1_a'
+        assert obj.submission.fullname == 't3_1'
+        assert not request_json.called
+
+    # Comments that are loaded later are compared against the author's name
+    data = {'name': 't3_1', 'permalink': '/r/python/comments/1/title/',
+            'subreddit': 'python', 'author': 'alice'}
+    comment = build_praw_comment(reddit, 'b')
+    comment.author = 'alice'
+    comment.nested_level = 0
+    comment._update_submission(
+        SubmissionContent.build_praw_submission(reddit, data))
+    assert SubmissionContent.strip_praw_comment(comment)['is_author']
+    # PRAW converts the name to a Redditor, but a plain name also works
+    comment.submission.__dict__['author'] = 'alice'
+    assert SubmissionContent.strip_praw_comment(comment)['is_author']
+
+    # Deleted comments in a thread whose author was deleted are not marked
+    data['author'] = '[deleted]'
+    comment.author = None
+    comment._update_submission(
+        SubmissionContent.build_praw_submission(reddit, data))
+    assert not SubmissionContent.strip_praw_comment(comment)['is_author']
+
+
 def test_content_submission_load_more_comments(reddit, terminal):
 
     url = 'https://www.reddit.com/r/AskReddit/comments/2np694/'
@@ -152,7 +641,7 @@ def test_content_subreddit(reddit, terminal):
     assert content.get(0)['type'] == 'Submission'
 
     for data in content.iterate(0, 1):
-        assert all(k in data for k in ('object', 'n_rows', 'offset', 'type',
+        assert all(k in data for k in ('name', 'n_rows', 'offset', 'type',
                                        'index', 'title', 'split_title'))
         # All text should be converted to unicode by this point
         for val in data.values():
@@ -174,13 +663,155 @@ def test_content_subreddit_load_more(reddit, terminal):
     assert len(content._submission_data) == 51
 
     for data in islice(content.iterate(0, 1, 70), 0, 50):
-        assert all(k in data for k in ('object', 'n_rows', 'offset', 'type',
+        assert all(k in data for k in ('name', 'n_rows', 'offset', 'type',
                                        'index', 'title', 'split_title'))
         # All text should be converted to unicode by this point
         for val in data.values():
             assert not isinstance(val, six.binary_type)
 
 
+def test_content_subreddit_fetch_newer(terminal):
+
+    submissions = [build_submission('t3_2', 'b'), build_submission('t3_1')]
+    listing = mock.Mock()
+    content = SubredditContent('/r/python', iter(submissions),
+                               terminal.loader, 'new', listing=listing)
+    assert content.can_fetch_newer
+    assert content.get(0)['split_title'] == ['1. b']
+
+    # Newer items are fetched in pages until reddit runs out
+    listing.side_effect = [
+        iter([build_submission('t3_4', 'd'), build_submission('t3_3', 'c')]),
+        iter([build_submission('t3_5', 'e')])]
+    assert content.fetch_newer(limit=2) == 3
+    listing.assert_any_call(limit=2, params={'before': 't3_2'})
+    listing.assert_any_call(limit=2, params={'before': 't3_4'})
+
+    names = [data['name'] for data in content._submission_data]
+    assert names == ['t3_5', 't3_4', 't3_3', 't3_2']
+    assert [d['index'] for d in content._submission_data] == [0, 1, 2, 3]
+    assert content.get(1)['split_title'] == ['2. d']
+    assert content.get(3)['split_title'] == ['4. b']
+
+    # Nothing new
+    listing.side_effect = [iter([])]
+    assert content.fetch_newer() == 0
+    assert len(content._submission_data) == 4
+
+    # Search results can't be followed
+    content = SubredditContent('/r/python', iter(submissions), terminal.loader)
+    assert not content.can_fetch_newer
+    with pytest.raises(exceptions.SubredditError):
+        content.fetch_newer()
+
+
+def test_content_subreddit_window(terminal):
+
+    submissions = [build_submission('t3_{0}'.format(i), str(i))
+                   for i in range(10)]
+    reddit = mock.Mock()
+    content = SubredditContent('/r/python', iter(submissions), terminal.loader,
+                               reddit=reddit, window_size=2)
+
+    # Submissions that fall outside of the window are evicted
+    for i in range(10):
+        content.get(i)
+    assert content._loaded == set([7, 8, 9])
+    assert content._submission_data[0] == {
+        'name': 't3_0', 'index': 0, 'title': '0'}
+    assert content.peek(0) is None
+    assert content.peek(9)['title'] == '9'
+
+    # Evicted submissions are measured without re-downloading them
+    assert content.rows.total(40) == 10 * 5
+    assert content.rows.find(5, 40) == 1
+    assert not reddit.get_info.called
+    assert content._loaded == set([7, 8, 9])
+
+    # Scrolling back re-downloads the evicted submissions in one batch
+    reddit.get_info.return_value = [submissions[i] for i in (4, 3, 5, 2, 6)]
+    assert content.get(4)['split_title'] == ['5. 4']
+    fullnames = reddit.get_info.call_args[1]['thing_id']
+    assert sorted(fullnames) == ['t3_2', 't3_3', 't3_4', 't3_5', 't3_6']
+    assert content._loaded == set([2, 3, 4, 5, 6])
+    assert content.get(3)['index'] == 3
+    assert reddit.get_info.call_count == 1
+
+    # Re-downloading failed, so a stand-in is shown instead of ending the
+    # listing, and it's only requested again after a while
+    reddit.get_info.side_effect = praw.errors.HTTPException(None)
+    data = content.get(9)
+    assert data['type'] == 'Unavailable'
+    assert data['split_title'] == ['10. 9']
+    assert content.exists(9)
+    assert reddit.get_info.call_count == 2
+    assert content.get(9)['type'] == 'Unavailable'
+    assert reddit.get_info.call_count == 2
+
+    reddit.get_info.side_effect = None
+    reddit.get_info.return_value = [submissions[9]]
+    retry_time = time.time() + content.RETRY_INTERVAL
+    with mock.patch('time.time', return_value=retry_time):
+        assert content.get(9)['title'] == '9'
+    assert reddit.get_info.call_count == 3
+
+
+def test_content_local_source(terminal, tmpdir):
+
+    def build_data(i):
+        return {'type': 'Submission', 'name': 't3_{0}'.format(i),
+                'title': 'Title {0}'.format(i), 'text': '', 'index': None,
+                'permalink': 'https://www.reddit.com/r/python/comments/'
+                             '{0}/title/'.format(i)}
+
+    ThreadArchive.write_records(tmpdir.join('python.jsonl').strpath,
+                                [build_data(i) for i in range(10)])
+    ThreadArchive.write_records(tmpdir.join('python.top.jsonl').strpath,
+                                [build_data(9)])
+    ThreadArchive.write(tmpdir.join('threads', 't3_2.jsonl').strpath,
+                        build_data(2), [{'type': 'Comment', 'level': 0,
+                                         'name': 't1_a', 'body': 'Comment'}])
+    source = LocalSource(tmpdir.strpath)
+
+    # Listings are browsed like normal subreddits
+    content = SubredditContent.from_name(
+        None, '/r/python', terminal.loader, window_size=2, source=source)
+    assert content.name == '/r/python'
+    assert not content.can_fetch_newer
+    for i in range(10):
+        assert content.get(i)['title'] == 'Title {0}'.format(i)
+
+    # Evicted submissions are reloaded from the file
+    assert content.peek(0) is None
+    assert content.get(0)['title'] == 'Title 0'
+
+    content = SubredditContent.from_name(
+        None, '/r/python/top', terminal.loader, source=source)
+    assert content.get(0)['name'] == 't3_9'
+
+    with pytest.raises(exceptions.SubredditError):
+        SubredditContent.from_name(None, 'linux', terminal.loader,
+                                   source=source)
+    with pytest.raises(exceptions.SubredditError):
+        SubredditContent.from_name(None, 'python', terminal.loader,
+                                   query='search', source=source)
+
+    # Threads are opened with the permalink from the listing
+    url = content.get(0)['permalink'].replace('9', '2')
+    content = SubmissionContent.from_url(
+        None, url, terminal.loader, source=source)
+    assert content.get(-1)['title'] == 'Title 2'
+    assert content.get(0)['body'] == 'Comment'
+
+    # Without a reddit session there's nothing to load more comments from
+    with pytest.raises(exceptions.SubmissionError):
+        content.get_praw_object(content.get(0))
+
+    with pytest.raises(exceptions.SubmissionError):
+        SubmissionContent.from_url(None, url.replace('2', '3'),
+                                   terminal.loader, source=source)
+
+
 def test_content_subreddit_from_name(reddit, terminal):
 
     name = '/r/python'
@@ -270,7 +901,7 @@ def test_content_subscription(reddit, oauth, refresh_token, terminal):
 
     # Validate content
     for data in content.iterate(0, 1, 70):
-        assert all(k in data for k in ('object', 'n_rows', 'offset', 'type',
+        assert all(k in data for k in ('name', 'n_rows', 'offset', 'type',
                                        'title', 'split_title'))
         # All text should be converted to unicode by this point
         for val in data.values():
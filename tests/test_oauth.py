@@ -2,12 +2,14 @@
 from __future__ import unicode_literals
 
 import os
+import time
 
 from tornado.web import Application
 from tornado.testing import AsyncHTTPTestCase
 from praw.errors import OAuthException
 
-from rtv.oauth import OAuthHelper, OAuthHandler
+from rtv.oauth import OAuthHelper
+from rtv.oauth_server import OAuthHandler
 from rtv.config import TEMPLATE
 
 try:
@@ -73,8 +75,11 @@ def test_oauth_authorize_with_refresh_token(oauth, stdscr, refresh_token):
     oauth.config.refresh_token = refresh_token
     oauth.authorize()
     assert oauth.http_server is None
+    assert oauth.config.access_token['user'] == oauth.reddit.user.name
+    assert oauth.config.save_access_token.called
 
     # We should be able to handle an oauth failure
+    oauth.config.access_token = None
     with mock.patch.object(oauth.reddit, 'refresh_access_information'):
         exception = OAuthException('', '')
         oauth.reddit.refresh_access_information.side_effect = exception
@@ -90,8 +95,8 @@ def test_oauth_authorize(oauth, reddit, stdscr, refresh_token):
     # function in the destination oauth module and not the helpers module
     with mock.patch('uuid.UUID.hex', new_callable=mock.PropertyMock) as uuid, \
             mock.patch('rtv.terminal.Terminal.open_browser') as open_browser, \
-            mock.patch('rtv.oauth.ioloop') as ioloop,                         \
-            mock.patch('rtv.oauth.httpserver'),                               \
+            mock.patch('tornado.ioloop') as ioloop,                           \
+            mock.patch('tornado.httpserver'),                                 \
             mock.patch.object(oauth.reddit, 'user'),                          \
             mock.patch('time.sleep'):
         io = ioloop.IOLoop.current.return_value
@@ -108,6 +113,7 @@ def test_oauth_authorize(oauth, reddit, stdscr, refresh_token):
             reddit, params['code'])
         assert oauth.config.refresh_token is not None
         assert oauth.config.save_refresh_token.called
+        assert oauth.config.access_token is not None
         stdscr.reset_mock()
         oauth.reddit.get_access_information.reset_mock()
         oauth.config.save_refresh_token.reset_mock()
@@ -115,6 +121,7 @@ def test_oauth_authorize(oauth, reddit, stdscr, refresh_token):
 
         # The next authorization should skip the oauth process
         oauth.config.refresh_token = refresh_token
+        oauth.config.access_token = None
         oauth.authorize()
         assert oauth.reddit.user is not None
         assert oauth.http_server is None
@@ -155,10 +162,57 @@ def test_oauth_authorize(oauth, reddit, stdscr, refresh_token):
         stdscr.derwin().addstr.assert_called_with(1, 1, message)
         assert not oauth.config.save_refresh_token.called
 
+def test_oauth_cached_access_token(oauth, refresh_token):
+
+    token = {'access_token': 'cached', 'expires': time.time() + 3600,
+             'scope': set(['identity', 'read']), 'user': 'civilization_phaze_3'}
+    oauth.config.refresh_token = refresh_token
+    oauth.config.access_token = token
+
+    # A valid cached token is used without making any requests
+    with mock.patch.object(oauth.reddit, 'request_json') as request_json:
+        oauth.authorize()
+        assert oauth.reddit.is_oauth_session()
+        assert oauth.reddit.access_token == 'cached'
+        assert oauth.reddit.refresh_token == refresh_token
+        assert oauth.reddit.user.name == 'civilization_phaze_3'
+        assert not request_json.called
+
+    # The background refresh waits until the token is about to expire
+    with mock.patch.object(oauth.reddit, 'refresh_access_information') as ref:
+        assert not oauth.refresh_access_token(force=False)
+        assert not ref.called
+
+        token['expires'] = time.time() + 60
+        ref.return_value = {'access_token': 'new', 'scope': token['scope'],
+                            'refresh_token': refresh_token}
+        assert oauth.refresh_access_token(force=False)
+        ref.assert_called_with(refresh_token, update_session=False)
+        assert oauth.reddit.access_token == 'new'
+        assert oauth.reddit.user.name == 'civilization_phaze_3'
+        assert oauth.config.access_token['expires'] > time.time() + 3000
+
+    # Expired tokens are refreshed on start up, the user's name is taken from
+    # the cached token instead of being requested again
+    oauth.config.access_token['expires'] = time.time()
+    oauth.reddit.user = None
+    assert not oauth.has_valid_access_token
+    with mock.patch.object(oauth.reddit, 'refresh_access_information') as ref:
+        ref.return_value = {'access_token': 'newer', 'scope': token['scope'],
+                            'refresh_token': refresh_token}
+        oauth.authorize()
+        ref.assert_called_with(refresh_token, update_session=False)
+    assert oauth.reddit.user.name == 'civilization_phaze_3'
+    assert oauth.config.access_token['access_token'] == 'newer'
+    assert oauth.has_valid_access_token
+
+
 def test_oauth_clear_data(oauth):
 
     oauth.config.refresh_token = 'secrettoken'
     oauth.reddit.refresh_token = 'secrettoken'
+    oauth.config.access_token = {'access_token': 'secrettoken'}
     oauth.clear_oauth_data()
     assert oauth.config.refresh_token is None
+    assert oauth.config.access_token is None
     assert oauth.reddit.refresh_token is None
\ No newline at end of file
@@ -7,7 +7,10 @@ import curses
 import pytest
 import requests
 
-from rtv.objects import Color, Controller, Navigator, curses_session
+from rtv.objects import (
+    Color, Completer, Controller, Navigator, Poller, build_reddit,
+    curses_session)
+from rtv.config import Config
 
 try:
     from unittest import mock
@@ -248,15 +251,15 @@ def test_objects_controller():
 
 def test_objects_navigator_properties():
 
-    def valid_page_cb(_):
-        return
+    def exists_cb(_):
+        return True
 
-    nav = Navigator(valid_page_cb)
+    nav = Navigator(exists_cb)
     assert nav.step == 1
     assert nav.position == (0, 0, False)
     assert nav.absolute_index == 0
 
-    nav = Navigator(valid_page_cb, 5, 2, True)
+    nav = Navigator(exists_cb, 5, 2, True)
     assert nav.step == -1
     assert nav.position == (5, 2, True)
     assert nav.absolute_index == 3
@@ -264,11 +267,10 @@ def test_objects_navigator_properties():
 
 def test_objects_navigator_move():
 
-    def valid_page_cb(index):
-        if index < 0 or index > 3:
-            raise IndexError()
+    def exists_cb(index):
+        return 0 <= index <= 3
 
-    nav = Navigator(valid_page_cb)
+    nav = Navigator(exists_cb)
 
     # Try to scroll up past the first item
     valid, redraw = nav.move(-1, 2)
@@ -318,11 +320,10 @@ def test_objects_navigator_move():
 
 def test_objects_navigator_move_new_submission():
 
-    def valid_page_cb(index):
-        if index != -1:
-            raise IndexError()
+    def exists_cb(index):
+        return index == -1
 
-    nav = Navigator(valid_page_cb, page_index=-1)
+    nav = Navigator(exists_cb, page_index=-1)
 
     # Can't move up
     valid, redraw = nav.move(-1, 1)
@@ -343,11 +344,10 @@ def test_objects_navigator_move_new_submission():
 
 def test_objects_navigator_move_submission():
 
-    def valid_page_cb(index):
-        if index < -1 or index > 4:
-            raise IndexError()
+    def exists_cb(index):
+        return -1 <= index <= 4
 
-    nav = Navigator(valid_page_cb, page_index=-1)
+    nav = Navigator(exists_cb, page_index=-1)
 
     # Can't move up
     valid, redraw = nav.move(-1, 2)
@@ -393,11 +393,10 @@ def test_objects_navigator_move_submission():
 @pytest.mark.xfail(reason="Paging is still broken in several edge-cases")
 def test_objects_navigator_move_page():
 
-    def valid_page_cb(index):
-        if index < 0 or index > 7:
-            raise IndexError()
+    def exists_cb(index):
+        return 0 <= index <= 7
 
-    nav = Navigator(valid_page_cb, cursor_index=2)
+    nav = Navigator(exists_cb, cursor_index=2)
 
     # Can't move up
     valid, redraw = nav.move_page(-1, 5)
@@ -424,13 +423,40 @@ def test_objects_navigator_move_page():
     assert redraw
 
 
+def test_objects_navigator_move_page_bottom():
+
+    calls = []
+
+    def exists_cb(index):
+        calls.append(index)
+        return 0 <= index <= 7
+
+    nav = Navigator(exists_cb)
+
+    # A whole page only checks the new index
+    valid, redraw = nav.move_page(1, 5)
+    assert nav.page_index == 5
+    assert valid and redraw
+    assert calls == [5]
+
+    # Stop on the last item instead of going past it
+    valid, redraw = nav.move_page(1, 5)
+    assert nav.page_index == 7
+    assert valid and redraw
+    assert len(calls) < 5
+
+    # Already at the bottom
+    valid, redraw = nav.move_page(1, 5)
+    assert nav.page_index == 7
+    assert not valid
+
+
 def test_objects_navigator_flip():
 
-    def valid_page_cb(index):
-        if index < 0 or index > 10:
-            raise IndexError()
+    def exists_cb(index):
+        return 0 <= index <= 10
 
-    nav = Navigator(valid_page_cb)
+    nav = Navigator(exists_cb)
 
     nav.flip(5)
     assert nav.page_index == 5
@@ -440,4 +466,106 @@ def test_objects_navigator_flip():
     nav.flip(3)
     assert nav.page_index == 2
     assert nav.cursor_index == 3
-    assert not nav.inverted
\ No newline at end of file
+    assert not nav.inverted
+
+def test_objects_navigator_jump():
+
+    def exists_cb(index):
+        return -1 <= index <= 100
+
+    nav = Navigator(exists_cb, page_index=-1)
+
+    valid, redraw = nav.jump(100, inverted=True)
+    assert valid and redraw
+    assert nav.position == (100, 0, True)
+    assert nav.absolute_index == 100
+
+    valid, redraw = nav.jump(50)
+    assert valid and redraw
+    assert nav.position == (50, 0, False)
+
+    # Out of bounds, nothing changes
+    valid, redraw = nav.jump(101)
+    assert not valid and not redraw
+    assert nav.position == (50, 0, False)
+
+
+def test_objects_poller():
+
+    results = []
+    poller = Poller(lambda: results.pop(), 10, 35)
+    assert poller.interval == 10
+    assert 9 < poller.timeout <= 10
+    assert not poller.due
+
+    # Nothing new, back off
+    results.extend([False, False, False])
+    poller.poll()
+    assert poller.interval == 20
+    poller.poll()
+    assert poller.interval == 35
+    poller.poll()
+    assert poller.interval == 35
+
+    # New data resets the interval
+    results.append(True)
+    poller.poll()
+    assert poller.interval == 10
+
+    # The poll is due once the timeout has elapsed
+    poller.next_poll = time.time() - 1
+    assert poller.timeout == 0
+    assert poller.due
+
+    poller.interval = 20
+    poller.reset()
+    assert poller.interval == 10
+    assert not poller.due
+
+    # Without a max interval the poller never backs off
+    poller = Poller(lambda: False, 5)
+    poller.poll()
+    assert poller.interval == 5
+
+
+def test_objects_completer():
+
+    names = ['python', 'pics', 'linux', 'Python', 'learnpython', 'pythonjobs',
+             'programming', 'a[b]']
+    completer = Completer(names, limit=3)
+    assert len(completer) == 7
+
+    # Prefix matches keep the order that the names were added in
+    assert completer.complete('') == ['python', 'pics', 'linux']
+    assert completer.complete('PY')[:2] == ['python', 'pythonjobs']
+
+    # Fuzzy matches fill in the rest, closest together first
+    assert completer.complete('py')[2] == 'learnpython'
+    assert completer.complete('pi') == ['pics', 'programming']
+    assert completer.complete('pgm') == ['programming']
+    assert completer.complete('lnx') == ['linux']
+    assert completer.complete('a[]') == ['a[b]']
+    assert completer.complete('zzz') == []
+
+    # Every completion contains the characters in order
+    for text in ('p', 'pn', 'on', 'ig', 'xyz', 'nj'):
+        pattern = list(text)
+        for name in completer.complete(text):
+            key = iter(name.lower())
+            assert all(char in key for char in pattern)
+
+
+def test_objects_build_reddit():
+
+    reddit = build_reddit(Config(), 'rtv test')
+    assert reddit.config.api_url == 'https://api.reddit.com'
+    assert reddit.config.domain == 'www.reddit.com'
+
+    config = Config(api_url='http://127.0.0.1:8080/', api_request_delay=0.5)
+    reddit = build_reddit(config, 'rtv test')
+    assert reddit.config.api_url == 'http://127.0.0.1:8080'
+    assert reddit.config.permalink_url == 'http://127.0.0.1:8080'
+    assert reddit.config.oauth_url == 'http://127.0.0.1:8080'
+    assert reddit.config.domain == '127.0.0.1:8080'
+    assert reddit.config.api_request_delay == 0.5
+    assert reddit.config['info'] == 'http://127.0.0.1:8080/api/info/'
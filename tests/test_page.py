@@ -101,6 +101,93 @@ def test_page_unauthenticated(reddit, terminal, config, oauth):
             terminal.stdscr.subwin.addstr.reset_mock()
 
 
+def test_page_pollers(reddit, terminal, config, oauth):
+
+    page = Page(reddit, terminal, config, oauth)
+    page.controller = PageController(page)
+    poller = mock.Mock(timeout=0.5, due=True)
+    page.pollers['test'] = poller
+
+    with mock.patch.object(page, 'draw'), \
+            mock.patch.object(page, 'controller'):
+
+        # Waiting for input times out when the poller is due
+        def func():
+            page.active = False
+            return -1
+        terminal.stdscr.getch.side_effect = func
+        page.loop()
+        terminal.stdscr.timeout.assert_any_call(500)
+        terminal.stdscr.timeout.assert_called_with(-1)
+        assert poller.poll.called
+        assert not page.controller.trigger.called
+
+
+def test_page_oauth_poller(reddit, terminal, config, oauth):
+
+    # Logged out
+    page = Page(reddit, terminal, config, oauth)
+    assert 'oauth' not in page.pollers
+
+    config.refresh_token = 'mock_refresh_token'
+    page = Page(reddit, terminal, config, oauth)
+    assert 'oauth' in page.pollers
+
+    # Browsing offline
+    config['offline'] = True
+    page = Page(reddit, terminal, config, oauth)
+    assert 'oauth' not in page.pollers
+
+    config['offline'] = False
+    config['local_dir'] = '/tmp'
+    page = Page(reddit, terminal, config, oauth)
+    assert 'oauth' not in page.pollers
+
+
+def test_page_refresh_visible_items(reddit, terminal, config, oauth):
+
+    config['refresh_interval'] = 60
+    page = Page(reddit, terminal, config, oauth)
+    assert 'refresh' in page.pollers
+
+    # Browsing offline
+    config['offline'] = True
+    assert 'refresh' not in Page(reddit, terminal, config, oauth).pollers
+
+    config['offline'] = False
+    config['local_dir'] = '/tmp'
+    assert 'refresh' not in Page(reddit, terminal, config, oauth).pollers
+    config['local_dir'] = None
+
+    # Nothing has been drawn yet
+    assert not page.refresh_visible_items()
+
+    data = [{'type': 'Submission', 'name': 't3_{0}'.format(i),
+             'score': '1 pts', 'likes': None, 'gold': False,
+             'comments': '0 comments'} for i in range(30)]
+    page.content = mock.Mock()
+    page.content.peek.side_effect = \
+        lambda i: data[i] if 0 <= i < len(data) else None
+    page.nav = mock.Mock(page_index=10, step=1)
+    page._subwindows = [None] * 5
+
+    thing = mock.Mock(fullname='t3_10', score=42, likes=True, gilded=1,
+                      num_comments=7)
+    reddit.get_info = mock.Mock(return_value=[thing])
+    assert page.refresh_visible_items()
+
+    # One screen on either side of the visible items is requested in one batch
+    fullnames = reddit.get_info.call_args[1]['thing_id']
+    expected = ['t3_{0}'.format(i) for i in range(5, 20)]
+    assert sorted(fullnames) == sorted(expected)
+    assert reddit.get_info.call_count == 1
+    assert data[10]['score'] == '42 pts'
+    assert data[10]['likes'] is True
+    assert data[10]['gold'] is True
+    assert data[10]['comments'] == '7 comments'
+    assert data[11]['score'] == '1 pts'
+
+
 def test_page_authenticated(reddit, terminal, config, oauth, refresh_token):
 
     page = Page(reddit, terminal, config, oauth)
@@ -110,6 +197,7 @@ def test_page_authenticated(reddit, terminal, config, oauth, refresh_token):
     # Login
     page.controller.trigger('u')
     assert reddit.is_oauth_session()
+    assert 'oauth' in page.pollers
 
     # Get inbox - Call the real method
     page.controller.trigger('i')
@@ -123,4 +211,5 @@ def test_page_authenticated(reddit, terminal, config, oauth, refresh_token):
     # Logout
     terminal.stdscr.getch.return_value = ord('y')
     page.controller.trigger('u')
-    assert not reddit.is_oauth_session()
\ No newline at end of file
+    assert not reddit.is_oauth_session()
+    assert 'oauth' not in page.pollers
\ No newline at end of file
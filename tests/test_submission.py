@@ -3,7 +3,9 @@ from __future__ import unicode_literals
 
 import curses
 
+from rtv.content import SubmissionContent
 from rtv.submission import SubmissionPage
+from rtv.browsed import BrowsedPage
 
 try:
     from unittest import mock
@@ -62,6 +64,42 @@ def test_submission_refresh(submission_page):
     submission_page.refresh_content()
 
 
+def test_submission_follow(submission_page):
+
+    submission_page.controller.trigger('F')
+    poller = submission_page.pollers['follow']
+
+    # Move down to the third comment
+    submission_page.nav.page_index = 2
+    with mock.patch.object(submission_page.content, 'fetch_newer') as fetch:
+
+        # Comments inserted above the cursor shift the page down
+        fetch.return_value = [0, 1, 10]
+        poller.next_poll = 0
+        submission_page.run_pollers()
+        assert submission_page.nav.absolute_index == 4
+        assert poller.interval == poller.min_interval
+
+        # Back off when nothing has changed
+        fetch.return_value = []
+        poller.next_poll = 0
+        submission_page.run_pollers()
+        assert submission_page.nav.absolute_index == 4
+        assert poller.interval > poller.min_interval
+
+        # Warn when more comments were posted than could be fetched
+        submission_page.content.missed_comments = True
+        with mock.patch.object(submission_page.term,
+                               'show_notification') as notification:
+            poller.next_poll = 0
+            submission_page.run_pollers()
+            assert notification.called
+
+    # Toggle off
+    submission_page.controller.trigger('F')
+    assert 'follow' not in submission_page.pollers
+
+
 def test_submission_unauthenticated(submission_page, terminal):
 
     # Unauthenticated commands
@@ -210,4 +248,270 @@ def test_submission_edit(submission_page, terminal, refresh_token):
 
         submission_page.controller.trigger('e')
         assert open_editor.called
-        edit.assert_called_with('comment text')
\ No newline at end of file
+        edit.assert_called_with('comment text')
+
+
+def test_submission_jump(synthetic_page, terminal):
+
+    page = synthetic_page(n_comments=200)
+    page.draw()
+    _, n_cols = page._content_window.getmaxyx()
+    rows = page.content.rows
+
+    # Bottom of the thread
+    page.controller.trigger('G')
+    assert page.nav.absolute_index == page.content.last_index
+    assert page.nav.inverted
+    page.draw()
+
+    # Back to the submission
+    page.controller.trigger(curses.KEY_HOME)
+    assert page.nav.absolute_index == -1
+    assert not page.nav.inverted
+
+    # Half way down, measured in rows
+    with mock.patch.object(terminal, 'prompt_input') as prompt_input:
+        prompt_input.return_value = '50%'
+        page.controller.trigger('%')
+    index = page.nav.absolute_index
+    half = rows.total(n_cols - 2) // 2
+    assert rows.offset(index, n_cols - 2) <= half
+    assert rows.offset(index + 1, n_cols - 2) > half
+
+    with mock.patch.object(terminal, 'prompt_input') as prompt_input, \
+            mock.patch.object(terminal, 'show_notification') as notification:
+        prompt_input.return_value = 'half'
+        page.controller.trigger('%')
+        assert notification.called
+    assert page.nav.absolute_index == index
+
+
+def test_submission_move_bottom(synthetic_page):
+
+    # A thread without any comments stays on the submission
+    page = synthetic_page(n_comments=0)
+    page.draw()
+    page.controller.trigger('G')
+    assert page.nav.position == (-1, 0, False)
+    assert len(page._subwindows) == 1
+
+    # The whole thread fits on the screen, so only the cursor moves
+    page = synthetic_page(n_comments=3, more_rate=0, body_words=2)
+    page.draw()
+    page.controller.trigger('G')
+    assert page.nav.position == (-1, 3, False)
+    assert page.nav.absolute_index == page.content.last_index
+    assert len(page._subwindows) == 4
+
+
+def test_submission_move_tree(synthetic_page, terminal):
+
+    page = synthetic_page(n_comments=50, reply_rate=0.8, more_rate=0, seed=7)
+    page.draw()
+    levels = [d['level'] for d in page.content._comment_data]
+
+    # Jump from the submission to the first top level comment, and then over
+    # its replies to the next one
+    page.controller.trigger('T')
+    assert page.nav.absolute_index == 0
+    page.controller.trigger('T')
+    second = levels.index(0, 1)
+    assert page.nav.absolute_index == second
+
+    page.controller.trigger('K')
+    assert page.nav.absolute_index == 0
+    page.controller.trigger('J')
+    assert page.nav.absolute_index == second
+
+    # Back up from a reply to its parent
+    page.controller.trigger('K')
+    page._move_cursor(1)
+    assert levels[page.nav.absolute_index] == 1
+    page.controller.trigger('p')
+    assert page.nav.absolute_index == 0
+
+    # Nothing above the first comment
+    with mock.patch.object(terminal, 'flash') as flash:
+        page.controller.trigger('K')
+        assert flash.called
+    assert page.nav.absolute_index == 0
+
+
+def test_submission_collapse(synthetic_page):
+
+    page = synthetic_page(n_comments=50, reply_rate=0.8, seed=7)
+    page.draw()
+    original = list(page.content._comment_data)
+
+    # The cursor stays on the hidden comment that the selection is folded into
+    index = [d['level'] for d in original].index(2)
+    page.nav.jump(index)
+    page.controller.trigger('-')
+    data = page.content.get(page.nav.absolute_index)
+    assert data['type'] == 'HiddenComment'
+    assert original[index] is data['cache'][0]
+
+    page.controller.trigger('_')
+    assert all(d['level'] == 0 for d in page.content._comment_data)
+    page.draw()
+
+    # Unfolding selects the top level comment that was folded
+    page.controller.trigger('+')
+    assert page.content._comment_data == original
+    top = max(i for i in range(index) if original[i]['level'] == 0)
+    assert page.nav.absolute_index == top
+    page.draw()
+
+
+def test_submission_sort(synthetic_page):
+
+    page = synthetic_page(n_comments=50, seed=7)
+    page.draw()
+    original = list(page.content._comment_data)
+    page.nav.jump(10)
+
+    # Sorted locally, without downloading the thread again
+    with mock.patch.object(SubmissionContent, 'from_url') as from_url:
+        page.controller.trigger('2')
+        assert not from_url.called
+    assert page.content.order == 'top'
+    data = page.content.get(page.nav.absolute_index)
+    assert data is original[10]
+    page.draw()
+
+    page.controller.trigger('1')
+    assert page.content._comment_data == original
+    assert page.nav.absolute_index == 10
+
+
+def test_submission_search(synthetic_page, terminal, tmpdir):
+
+    page = synthetic_page(n_comments=200, seed=7)
+    page.draw()
+    comments = list(page.content._comment_data)
+    hits = [i for i, d in enumerate(comments)
+            if d['type'] == 'Comment' and 'python' in d['body'].lower()]
+    assert len(hits) > 2
+
+    # The index is built while waiting for input
+    assert 'search' in page.pollers
+    while page._build_search_index():
+        pass
+    assert page.content.search.complete
+    # Once it's built, waiting for input no longer times out
+    assert 'search' not in page.pollers
+
+    def prompt_input(prompt, callback=None):
+        callback('pyth')
+        assert page.nav.absolute_index == hits[0]
+        return 'python'
+
+    page.content.collapse(0)
+    with mock.patch.object(terminal, 'prompt_input') as mock_prompt:
+        mock_prompt.side_effect = prompt_input
+        page.controller.trigger('/')
+    assert page.content.get(page.nav.absolute_index) is comments[hits[0]]
+
+    page.controller.trigger(']')
+    assert page.content.get(page.nav.absolute_index) is comments[hits[1]]
+    page.controller.trigger('[')
+    page.controller.trigger('[')
+    assert page.content.get(page.nav.absolute_index) is comments[hits[-1]]
+
+    # Cancelling goes back to where the search started
+    with mock.patch.object(terminal, 'prompt_input') as mock_prompt:
+        mock_prompt.side_effect = lambda *args, **kwargs: (
+            kwargs['callback']('the'), None)[1]
+        page.controller.trigger('/')
+    assert page.content.get(page.nav.absolute_index) is comments[hits[-1]]
+
+    with mock.patch.object(terminal, 'prompt_input') as mock_prompt, \
+            mock.patch.object(terminal, 'show_notification') as notification:
+        mock_prompt.return_value = 'zzz'
+        page.controller.trigger('/')
+        assert notification.called
+
+    # Sorting throws the index away, so it's built again
+    page.controller.trigger('2')
+    assert not page.content.search.complete
+    assert 'search' in page.pollers
+
+    # Archived threads are indexed by the first search instead
+    filename = tmpdir.join('thread.jsonl').strpath
+    page.content.save(filename)
+    page = SubmissionPage(
+        page.reddit, terminal, page.config, page.oauth, url=filename)
+    assert 'search' not in page.pollers
+    page.draw()
+    with mock.patch.object(terminal, 'prompt_input') as mock_prompt:
+        mock_prompt.return_value = 'python'
+        page.controller.trigger('/')
+    assert page.content.search.complete
+    data = page.content.get(page.nav.absolute_index)
+    assert 'python' in data['body'].lower()
+
+
+def test_submission_draw_inverted(synthetic_page):
+
+    page = synthetic_page(n_comments=3, more_rate=0, body_words=2)
+
+    # The comments don't fill the screen from the bottom, so the page is
+    # flipped and drawn from the top, once
+    page.nav.jump(1, inverted=True)
+    with mock.patch.object(page, '_draw_item') as draw_item, \
+            mock.patch.object(page.content, 'get',
+                              wraps=page.content.get) as get:
+        page.draw()
+        # Each comment is wrapped once, plus a look past the last comment
+        assert get.call_count == 4
+    drawn = [call[0][1]['name'] for call in draw_item.call_args_list]
+    assert drawn == [page.content.get(i)['name'] for i in range(3)]
+    assert not page.nav.inverted
+    assert page.nav.absolute_index == 1
+
+
+def test_submission_record_browsed(synthetic_page, terminal, config, tmpdir):
+
+    config['index_browsed'] = True
+    config.fulltext_file = tmpdir.join('browsed.db').strpath
+    config.load_fulltext()
+
+    page = synthetic_page(n_comments=200, seed=7)
+    page.draw()
+    config.fulltext.flush()
+
+    # Only the items that were drawn are recorded
+    cursor = config.fulltext._db.execute('SELECT name FROM items')
+    recorded = set(row[0] for row in cursor)
+    comment = page.content.get(0)
+    assert page.content.get(-1)['name'] in recorded
+    assert comment['name'] in recorded
+    assert page.content.get(199)['name'] not in recorded
+
+    query = comment['body'].split()[-1]
+    results = config.fulltext.search(query)
+    assert comment['name'] in [r['name'] for r in results]
+
+    title = page.content.get(-1)['title']
+    page = BrowsedPage(page.reddit, terminal, config, page.oauth, query)
+    page.draw()
+    data = page.content.get(page.nav.absolute_index)
+    assert data['title'] == title
+    assert data['type'] in ('Comment', 'Submission')
+
+    with mock.patch('rtv.browsed.SubmissionPage') as submission_page:
+        page.controller.trigger('l')
+        assert submission_page.call_args[1]['url'] == data['permalink']
+        assert submission_page.return_value.loop.called
+
+    # The author line goes directly under the title when no text matched
+    data = {'type': 'Submission', 'split_title': ['Title'], 'split_text': [],
+            'n_rows': 2, 'author': 'author', 'subreddit': 'python',
+            'created': '1hour'}
+    win = mock.Mock()
+    win.getmaxyx.return_value = (2, 40)
+    with mock.patch.object(terminal, 'add_line') as add_line:
+        page._draw_item(win, data)
+        assert add_line.call_args_list[1][0][1:3] == ('author', 1)
+
+    config.save_fulltext()
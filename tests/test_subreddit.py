@@ -70,15 +70,96 @@ def test_subreddit_search(subreddit_page, terminal):
         assert not terminal.loader.exception
 
 
-def test_subreddit_prompt(subreddit_page, terminal):
+def test_subreddit_prompt(subreddit_page, terminal, config):
+
+    # The page that's open was visited
+    assert config.subreddits.names() == ['python']
+    config.subreddits.visit('pics')
+
+    def prompt_input(prompt, callback, complete):
+        # Completions are drawn above the prompt as the name is typed
+        window = terminal.stdscr.subwin
+        window.addstr.reset_mock()
+        callback('pyth')
+        text = [args[2] for args, _ in window.addstr.call_args_list]
+        assert '/r/python'.encode('utf-8') in text
+        assert '/r/pics'.encode('utf-8') not in text
+        assert complete('pyth') == 'python'
+        assert complete('p') == 'pics'
+        assert complete('fr') == 'front'
+        assert complete('python/n') is None
+        assert complete('zzz') is None
+        return 'front/top'
 
     # Prompt for a different subreddit
     with mock.patch.object(terminal, 'prompt_input'):
-        terminal.prompt_input.return_value = 'front/top'
+        terminal.prompt_input.side_effect = prompt_input
         subreddit_page.controller.trigger('/')
         assert subreddit_page.content.name == '/r/front'
         assert subreddit_page.content.order == 'top'
         assert not terminal.loader.exception
+    assert config.subreddits.names()[0] == 'front'
+
+
+def test_subreddit_follow(subreddit_page, terminal):
+
+    # Following switches the listing over to the newest submissions
+    with mock.patch.object(subreddit_page, 'refresh_content'):
+        subreddit_page.controller.trigger('F')
+        subreddit_page.refresh_content.assert_called_with(order='new')
+    poller = subreddit_page.pollers['follow']
+
+    # New submissions push the page down so that the cursor doesn't move
+    with mock.patch.object(subreddit_page.content, 'fetch_newer') as fetch:
+        fetch.return_value = 3
+        poller.next_poll = 0
+        subreddit_page.run_pollers()
+        assert subreddit_page.nav.page_index == 3
+        assert poller.interval == poller.min_interval
+
+        # Back off when nothing has changed
+        fetch.return_value = 0
+        poller.next_poll = 0
+        subreddit_page.run_pollers()
+        assert subreddit_page.nav.page_index == 3
+        assert poller.interval > poller.min_interval
+
+    # Toggle off
+    subreddit_page.controller.trigger('F')
+    assert 'follow' not in subreddit_page.pollers
+
+    # Search results can't be followed
+    with mock.patch.object(subreddit_page.content, '_listing', None):
+        subreddit_page.controller.trigger('F')
+        assert 'follow' not in subreddit_page.pollers
+
+    # Downloading the same listing again keeps following it
+    name = subreddit_page.content.name
+    subreddit_page.pollers['follow'] = poller
+    listing = mock.Mock(order='new', can_fetch_newer=True)
+    listing.name = name
+    with mock.patch('rtv.subreddit.SubredditContent.from_name') as from_name:
+        from_name.return_value = listing
+        subreddit_page.refresh_content()
+    assert subreddit_page.pollers['follow'] is poller
+
+    # Search results and other subreddits replace the listing, which stops
+    # following it
+    results = mock.Mock(order=None, can_fetch_newer=False)
+    results.name = name
+    with mock.patch('rtv.subreddit.SubredditContent.from_name') as from_name, \
+            mock.patch.object(terminal, 'prompt_input') as prompt_input:
+        from_name.return_value = results
+        prompt_input.return_value = 'query'
+        subreddit_page.controller.trigger('f')
+    assert 'follow' not in subreddit_page.pollers
+
+    subreddit_page.pollers['follow'] = poller
+    listing.name = '/r/linux'
+    with mock.patch('rtv.subreddit.SubredditContent.from_name') as from_name:
+        from_name.return_value = listing
+        subreddit_page.refresh_content(name='linux')
+    assert 'follow' not in subreddit_page.pollers
 
 
 def test_subreddit_open(subreddit_page, terminal, config):
@@ -45,11 +45,19 @@ def test_subscription_page_construct(reddit, terminal, config, oauth,
     window.subwin.chgat.assert_any_call(0, 0, 1, 262144)
     window.subwin.chgat.assert_any_call(1, 0, 1, 262144)
 
-    # Reload with a smaller terminal window
+    # Every subscription was saved for the subreddit prompt
+    cached = config.subreddits.get_subscriptions(reddit.user.name)
+    assert [d['name'] for d in cached] == [
+        d['name'] for d in page.content.load_all()]
+    assert config.subreddits.get_subscriptions('other_user') == []
+
+    # Reload with a smaller terminal window, from the saved subscriptions
     terminal.stdscr.ncols = 20
     terminal.stdscr.nlines = 10
-    with terminal.loader():
-        page = SubscriptionPage(reddit, terminal, config, oauth)
+    with mock.patch.object(reddit, 'get_my_subreddits') as get_my_subreddits:
+        with terminal.loader():
+            page = SubscriptionPage(reddit, terminal, config, oauth)
+        assert not get_my_subreddits.called
     assert terminal.loader.exception is None
 
     page.draw()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import shutil
+import tempfile
+import threading
+from functools import partial
+
+import pytest
+import requests
+
+from rtv import exceptions
+from rtv.config import Config
+from rtv.sync import DiskCacheHandler, RequestPacer, sync
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+@pytest.yield_fixture()
+def cache_dir():
+    path = tempfile.mkdtemp()
+    yield path
+    shutil.rmtree(path)
+
+
+def send(handler, url):
+    request = requests.Request('GET', url).prepare()
+    return handler.request(
+        request=request, proxies={}, timeout=None, verify=True,
+        _rate_domain='reddit.com', _rate_delay=2, _cache_key=(url, ()),
+        _cache_ignore=False, _cache_timeout=30)
+
+
+def test_sync_disk_cache_handler(cache_dir):
+
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = 'application/json; charset=UTF-8'
+    response._content = '{"title": "Über"}'.encode('utf-8')
+    response.url = 'https://www.reddit.com/r/python/.json?limit=100&after=a'
+
+    with mock.patch('praw.handlers.DefaultHandler.request') as request:
+        request.return_value = response
+
+        # Responses are saved when syncing
+        handler = DiskCacheHandler(cache_dir, max_age=0, store=True)
+        send(handler, response.url)
+        assert handler.bytes_downloaded == len(response.content)
+
+        # The domain and the order of the parameters don't matter
+        handler = DiskCacheHandler(cache_dir, offline=True)
+        url = 'https://oauth.reddit.com/r/python?after=a&limit=100'
+        assert send(handler, url).json() == {'title': 'Über'}
+        assert send(handler, url).json() == {'title': 'Über'}
+
+        # Pages that weren't synced can't be opened offline
+        with pytest.raises(requests.ConnectionError):
+            send(handler, 'https://oauth.reddit.com/r/linux')
+        assert request.call_count == 1
+
+        # Online, the cached copy is only used once
+        handler = DiskCacheHandler(cache_dir, max_age=3600)
+        assert send(handler, url).json() == {'title': 'Über'}
+        assert request.call_count == 1
+        send(handler, url)
+        assert request.call_count == 2
+
+        # Unless it's too old
+        handler = DiskCacheHandler(cache_dir, max_age=0)
+        send(handler, url)
+        assert request.call_count == 3
+
+
+def test_sync_request_pacer(cache_dir):
+
+    # Requests are spaced out across handlers
+    pacer = RequestPacer()
+    with mock.patch('time.sleep') as sleep:
+        pacer.wait('reddit.com', 2)
+        assert not sleep.called
+        pacer.wait('reddit.com', 2)
+        assert 1.5 < sleep.call_args[0][0] <= 2
+        pacer.wait('oauth.reddit.com', 2)
+        assert sleep.call_count == 1
+
+    # But both handlers can wait on a response at the same time, which would
+    # time out if PRAW's lock was held for the whole request
+    in_flight = [threading.Event(), threading.Event()]
+    response = requests.Response()
+    response.status_code = 404
+    response._content = b''
+
+    def send_request(index, *args, **kwargs):
+        in_flight[index].set()
+        return in_flight[1 - index].wait(5) and response
+
+    def run(handler, url):
+        results.append(send(handler, url))
+
+    pacer = RequestPacer()
+    handlers = [DiskCacheHandler(cache_dir, pacer=pacer) for _ in range(2)]
+    results, threads = [], []
+    for index, handler in enumerate(handlers):
+        handler.http = mock.Mock()
+        handler.http.send.side_effect = partial(send_request, index)
+        url = 'https://www.reddit.com/{0}'.format(index)
+        threads.append(threading.Thread(target=run, args=(handler, url)))
+    with mock.patch('time.sleep'):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert results == [response, response]
+
+
+def test_sync(cache_dir):
+
+    config = Config(cache_dir=cache_dir, sync_limit=2)
+    out = mock.Mock()
+
+    # Nothing to do
+    assert sync(config, 'rtv test', out=out) == 1
+    assert 'Nothing to sync' in out.call_args[0][0]
+
+    def from_name(reddit, name, loader):
+        if name == 'me':
+            raise exceptions.AccountError('Could not access user account')
+        content = mock.Mock()
+        content.get.side_effect = lambda i: {'permalink': name + str(i)}
+        return content
+
+    config['sync_subreddits'] = 'python, linux me'
+    with mock.patch('praw.Reddit'), \
+            mock.patch('rtv.sync.SubredditContent.from_name') as from_name_, \
+            mock.patch('rtv.sync.SubmissionContent.from_url') as from_url:
+        from_name_.side_effect = from_name
+
+        assert sync(config, 'rtv test', out=out) == 1
+        urls = sorted(call[0][1] for call in from_url.call_args_list)
+        assert urls == ['linux0', 'linux1', 'python0', 'python1']
+
+        lines = [call[0][0] for call in out.call_args_list]
+        assert 'python: 2 threads' in lines
+        assert 'me: failed (Could not access user account)' in lines
+        assert lines[-2].startswith('Synced 4 threads in ')
+        assert lines[-1] == '1 downloads failed'
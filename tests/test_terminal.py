@@ -202,6 +202,36 @@ def test_text_input(terminal, stdscr, ascii):
     assert terminal.text_input(stdscr, allow_resize=False) is None
 
 
+def test_text_input_callback(terminal, stdscr):
+
+    stdscr.nlines = 1
+    callback = mock.Mock()
+
+    # The text can't be read back from the mock window, but the callback is
+    # still run once it changes
+    stdscr.getch.side_effect = [ord('h'), ord('i'), terminal.RETURN]
+    with mock.patch.object(terminal, 'strip_textpad') as strip_textpad:
+        strip_textpad.side_effect = ['h', 'hi', 'hi', 'hi']
+        assert terminal.text_input(stdscr, callback=callback) == 'hi'
+    assert callback.call_args_list == [mock.call('h'), mock.call('hi')]
+
+    stdscr.getch.side_effect = [ord('b'), terminal.ESCAPE]
+    assert terminal.text_input(stdscr, callback=callback) is None
+
+    # Tab replaces the text with the completion, which is written to the
+    # window so that the textbox picks it up
+    callback.reset_mock()
+    complete = mock.Mock(return_value='python')
+    stdscr.getch.side_effect = [ord('p'), terminal.TAB, terminal.RETURN]
+    with mock.patch.object(terminal, 'strip_textpad') as strip_textpad:
+        strip_textpad.side_effect = ['p', 'python', 'python', 'python']
+        out = terminal.text_input(stdscr, callback=callback, complete=complete)
+    assert out == 'python'
+    complete.assert_called_once_with('p')
+    stdscr.addstr.assert_any_call(0, 0, 'python'.encode('ascii'))
+    assert callback.call_args_list == [mock.call('p'), mock.call('python')]
+
+
 @pytest.mark.parametrize('ascii', [True, False])
 def test_prompt_input(terminal, stdscr, ascii):
 